@@ -0,0 +1,152 @@
+"""
+    time every phase of the conversion on synthetic files
+
+    python -m benchmarks [--tiers small medium] [--shapes wide deep] [--baseline FILE] [--save FILE]
+
+    results are compared to the baseline (benchmarks/baseline.json by default),
+    a phase slower than the baseline by more than --tolerance is reported as a regression
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+from xmltree2xml.main import main as xmltree2xml_main
+from xmltree2xml.main import parse_line, parse_xml, sanitize_android_value
+from xmltree2xml.resources import ResourceTable
+
+from .generate import SHAPES, resources
+
+# tier -> number of elements
+TIERS = {
+    "small": 1000,
+    "medium": 10000,
+    "large": 100000,
+}
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def best(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(shape, elements, repeat, tmp_dir):
+    value = SHAPES[shape](elements)
+    dump = resources(elements)
+    table = ResourceTable.parse(dump)
+
+    # attribute values only, for the resolution phase
+    values = []
+    for line in value.split("\n"):
+        if line:
+            _, el_type, groups = parse_line(line)
+            if el_type == "A":
+                values.append(groups[1])
+
+    root = parse_xml(value, table)
+
+    input_path = os.path.join(tmp_dir, f"{shape}.xmltree")
+    resources_path = os.path.join(tmp_dir, "resources.txt")
+    with open(input_path, "w") as f:
+        f.write(value)
+    with open(resources_path, "w") as f:
+        f.write(dump)
+
+    argv = ["-o", os.path.join(tmp_dir, "output"), "-r", resources_path, "--cache-dir", os.path.join(tmp_dir, "cache"), input_path]
+
+    def end_to_end():
+        with contextlib.redirect_stdout(io.StringIO()):
+            xmltree2xml_main(argv)
+
+    phases = {
+        "resources": best(lambda: ResourceTable.parse(dump), repeat),
+        "parse": best(lambda: parse_xml(value, table), repeat),
+        "resolve": best(lambda: [sanitize_android_value(val, table) for val in values], repeat),
+        "serialize": best(root.to_str, repeat),
+        "end_to_end": best(end_to_end, repeat),
+    }
+
+    lines = value.count("\n")
+    size = len(value.encode()) / 1e6
+    return {
+        "elements": elements,
+        "lines": lines,
+        "mb": round(size, 3),
+        "phases": {name: round(seconds, 6) for name, seconds in phases.items()},
+        "parse_lines_per_s": round(lines / phases["parse"]),
+        "end_to_end_mb_per_s": round(size / phases["end_to_end"], 2),
+        "peak_mb": round(peak_memory(lambda: parse_xml(value, table).to_str()) / 1e6, 2),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """ print the results against the baseline, return the regressions """
+    regressions = []
+    for case, result in results.items():
+        print(f"{case}: {result['lines']} lines, {result['mb']} MB, "
+              f"{result['parse_lines_per_s']} lines/s parsed, {result['end_to_end_mb_per_s']} MB/s end to end, {result['peak_mb']} MB peak")
+        base = baseline.get(case, {}).get("phases", {})
+        for phase, seconds in result["phases"].items():
+            line = f"    {phase:<12} {seconds * 1000:10.2f} ms"
+            if phase in base and base[phase]:
+                ratio = seconds / base[phase]
+                line += f"  x{ratio:.2f} baseline"
+                if ratio > 1 + tolerance:
+                    line += "  REGRESSION"
+                    regressions.append(f"{case} {phase}")
+            print(line)
+    return regressions
+
+
+def main():
+    p = argparse.ArgumentParser("benchmarks", description="benchmark xmltree2xml on synthetic files.")
+    p.add_argument("--tiers", nargs="+", choices=TIERS, default=["small", "medium"])
+    p.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    p.add_argument("--repeat", type=int, default=5, help="runs by phase, the best is kept.")
+    p.add_argument("--baseline", default=BASELINE, help="baseline results to compare with.")
+    p.add_argument("--tolerance", type=float, default=0.5, help="slowdown ratio reported as a regression.")
+    p.add_argument("--save", help="write the results as json (use the baseline path to update it).")
+    flags = p.parse_args()
+
+    baseline = {}
+    if os.path.exists(flags.baseline):
+        with open(flags.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for tier in flags.tiers:
+            for shape in flags.shapes:
+                start = time.perf_counter()
+                results[f"{shape}/{tier}"] = run_case(shape, TIERS[tier], flags.repeat, tmp_dir)
+                print(f"{shape}/{tier} done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    regressions = compare(results, baseline, flags.tolerance)
+
+    if flags.save:
+        with open(flags.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if regressions:
+        sys.exit(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+    synthetic `aapt2 dump xmltree` and `aapt2 dump resources` files
+
+    every references (@0x7f0a.... ids and ?0x7f01.... attributes) used by the xmltree
+    generators exist in the resources generated with the same size
+"""
+
+ANDROID = "http://schemas.android.com/apk/res/android"
+RES_AUTO = "http://schemas.android.com/apk/res-auto"
+
+# xmltree shapes -> generator(elements)
+SHAPES = {}
+
+
+def shape(func):
+    SHAPES[func.__name__] = func
+    return func
+
+
+def _indent(depth, namespaces=0):
+    return " " * (depth * 4 + namespaces * 2)
+
+
+@shape
+def deep(elements, depth=500):
+    """ branches of `depth` nested elements under a root (indentation grows with the depth) """
+    lines = ["E: FrameLayout (line=1)"]
+    for i in range(elements - 1):
+        ind = _indent(i % depth + 1)
+        lines.append(f"{ind}E: FrameLayout (line={i + 2})")
+        lines.append(f"{ind}  A: {ANDROID}:id(0x010100d0)=@0x7f0a{i % 0x10000:04x}")
+    return "\n".join(lines) + "\n"
+
+
+@shape
+def wide(elements):
+    """ a root with `elements - 1` children """
+    lines = ["E: list (line=1)", '  A: name="list" (Raw: "list")']
+    for i in range(elements - 1):
+        lines.append(f"    E: item (line={i + 2})")
+        lines.append(f"      A: value={i}")
+    return "\n".join(lines) + "\n"
+
+
+# real android attributes names (digits are not handled by `sanitize_android_key`)
+ATTRIBUTES = [
+    "id", "layout_width", "layout_height", "enabled", "text", "textAppearance",
+    "textSize", "textColor", "gravity", "alpha", "contentDescription", "clickable",
+]
+
+
+@shape
+def attributes(elements, per_element=12):
+    """ layout like document, every element has `per_element` attributes """
+    values = [
+        "@0x7f0a{:04x}", "-1", "-2", "true", '"text{}" (Raw: "text{}")', "?0x7f01{:04x}",
+        "16.0dp", "#ff000000", "0x00000011", "1.5", '"@string/s{}" (Raw: "@string/s{}")', "false",
+    ]
+    lines = ["E: LinearLayout (line=1)"]
+    for i in range(elements - 1):
+        lines.append(f"    E: TextView (line={i + 2})")
+        for j in range(per_element):
+            value = values[j % len(values)].format(i % 0x10000, i % 0x10000)
+            lines.append(f"      A: {ANDROID}:{ATTRIBUTES[j % len(ATTRIBUTES)]}(0x0101{j:04x})={value}")
+    return "\n".join(lines) + "\n"
+
+
+@shape
+def namespaces(elements, count=1):
+    """ namespaced (android and res-auto) attributes on every element, the parser only handle one namespace line """
+    prefixes = [("android", ANDROID), ("app", RES_AUTO), ("tools", "http://schemas.android.com/tools")]
+    lines = [f"{' ' * (i * 2)}N: {prefix}={uri} (line=1)" for i, (prefix, uri) in enumerate(prefixes[:count])]
+    lines.append(f"{_indent(0, count)}E: androidx.constraintlayout.widget.ConstraintLayout (line=1)")
+    for i in range(elements - 1):
+        ind = _indent(1, count)
+        lines.append(f"{ind}E: com.google.android.material.button.MaterialButton (line={i + 2})")
+        lines.append(f"{ind}  A: {RES_AUTO}:layout_constraintTop_toTopOf(0x7f01{i % 0x10000:04x})=@0x7f0a{i % 0x10000:04x}")
+        lines.append(f"{ind}  A: {RES_AUTO}:cornerRadius(0x7f010001)=?0x7f01{i % 0x10000:04x}")
+        lines.append(f"{ind}  A: {ANDROID}:text(0x0101014f)=\"button\" (Raw: \"button\")")
+    return "\n".join(lines) + "\n"
+
+
+def resources(entries):
+    """ `aapt2 dump resources` like file, with `entries` resources of each type (id, attr, style, xml) """
+    entries = min(entries, 0x10000)
+    lines = ["Binary APK", "Package name=com.example.benchmark id=7f"]
+
+    lines.append(f"  type attr id=01 entryCount={entries}")
+    for i in range(entries):
+        lines.append(f"    resource 0x7f01{i:04x} attr/attr_{i}")
+        lines.append("      () (attr) type=reference")
+
+    lines.append(f"  type id id=0a entryCount={entries}")
+    for i in range(entries):
+        lines.append(f"    resource 0x7f0a{i:04x} id/view_{i}")
+        lines.append("      () (id)")
+
+    lines.append(f"  type style id=10 entryCount={entries}")
+    for i in range(entries):
+        lines.append(f"    resource 0x7f10{i:04x} style/Style_{i}")
+        lines.append(f"      () (style) size=2 parent=0x7f01{i:04x}")
+        lines.append(f"        [0x01010098] = #ff000000")
+
+    lines.append(f"  type xml id=18 entryCount={entries}")
+    for i in range(entries):
+        lines.append(f"    resource 0x7f18{i:04x} xml/file_{i}")
+        lines.append(f"      () (file) res/{i:x}.xml type=XML")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,83 @@
+"""
+    memory used by the parsed tree, in bytes per element
+
+    python -m benchmarks.memory [ELEMENTS]
+"""
+import sys
+import tracemalloc
+
+from xmltree2xml.main import END, START, TEXT, iter_events, parse_xml
+
+from .generate import attributes
+
+
+class LegacyXmlTreeElement:
+    """ XmlTreeElement before the slots (one __dict__ and six containers by element) """
+    def __init__(self, tag, text=None, child=[], attrs={}, extra={}):
+        self.tag = tag
+        self.text = text
+        self.attributes = {**attrs}
+        self.extra_attrs = {}
+        self.extra = {**extra}
+        self.childrens = [*child]
+        self.namespaces = {}
+        self.parent = None
+
+    def add_child(self, child):
+        self.childrens.append(child)
+        child.parent = self
+
+    def add_attr(self, key, value, extra={}):
+        self.extra_attrs[key] = extra
+        self.attributes[key] = value
+
+
+def build_legacy(events):
+    """ build the tree like the old parse_xml """
+    tree = []
+    root = None
+    for event in events:
+        if event[0] == START:
+            _, tag, attrs, extra_attrs, namespaces, extra = event
+            el = LegacyXmlTreeElement(tag, extra=extra)
+            for key, value in attrs.items():
+                el.add_attr(key, value, extra={**extra_attrs[key]} if key in extra_attrs else {})
+            if root is None:
+                root = el
+            else:
+                tree[-1].add_child(el)
+            tree.append(el)
+        elif event[0] == TEXT:
+            tree[-1].text = event[1]
+        elif event[0] == END:
+            tree.pop()
+    return root
+
+
+def parse_legacy(value):
+    return build_legacy(iter_events(value))
+
+
+def measure(parse, value):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    root = parse(value)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del root
+    return size
+
+
+def main():
+    elements = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    value = attributes(elements, per_element=3)
+
+    legacy = measure(parse_legacy, value) / elements
+    current = measure(parse_xml, value) / elements
+    print(f"elements: {elements}")
+    print(f"before: {legacy:.0f} bytes/element")
+    print(f"after:  {current:.0f} bytes/element ({100 - current * 100 / legacy:.0f}% less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+    speed of `parse_line` against the old sequential regex tokenizer
+
+    python -m benchmarks.parse_line [ELEMENTS]
+"""
+import sys
+import timeit
+
+from xmltree2xml.main import elements, parse_line
+
+from .generate import attributes
+
+
+def legacy_parse_line(line):
+    """ `parse_line` before the dispatch on the record tag """
+    for el_type, reg in elements.items():
+        mat = reg.search(line)
+        if mat:
+            result = mat.groups()
+            return len(result[0]), el_type, result[1:]
+    raise ValueError("match nothing")
+
+
+def measure(parse, lines):
+    return min(timeit.repeat(lambda: [parse(line) for line in lines], number=3, repeat=5)) / 3
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    lines = [line for line in attributes(count, per_element=3).split("\n") if line]
+
+    legacy = measure(legacy_parse_line, lines)
+    current = measure(parse_line, lines)
+    print(f"lines: {len(lines)}")
+    print(f"before: {legacy:.3f}s ({len(lines) / legacy:.0f} lines/s)")
+    print(f"after:  {current:.3f}s ({len(lines) / current:.0f} lines/s, x{legacy / current:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -48,14 +48,14 @@ setuptools.setup(
         'License :: OSI Approved :: BSD License',
         'Operating System :: OS Independent',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 3.6',
-        'Programming Language :: Python :: 3.7',
-        'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
         'Programming Language :: Python :: 3 :: Only',
     ],
     packages=["xmltree2xml"],
-    python_requires=">=3.6",
+    python_requires=">=3.9",
     entry_points={
         "entry_points": "xmltree2xml=xmltree2xml.main:main",
         "console_scripts": "xmltree2xml=xmltree2xml.main:main"
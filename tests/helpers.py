@@ -0,0 +1,26 @@
+import os
+import tempfile
+import unittest
+
+
+class FilesTestCase(unittest.TestCase):
+    """ test case with a temporary directory `self.tmp`, removed after every test """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write_input(self, name, value):
+        """ write `value` (a string or bytes) to the file `name` of the temporary directory, return its path """
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb" if isinstance(value, bytes) else "w") as f:
+            f.write(value)
+        return path
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def read_outputs(self, directory):
+        """ name -> content of the files of `directory` """
+        return {name: self.read(os.path.join(directory, name)) for name in sorted(os.listdir(directory))}
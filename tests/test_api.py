@@ -0,0 +1,115 @@
+import asyncio
+import os
+import pickle
+from unittest import mock
+
+from ..xmltree2xml import api
+from ..xmltree2xml.api import Result, aconvert, aconvert_many, convert, convert_file, convert_many, load_resources
+from ..xmltree2xml.main import XML_HEADER, ConversionError
+from ..xmltree2xml.resources import ResourceTable
+from .helpers import FilesTestCase
+
+RESOURCES = """Package name=com.android.dialer id=7f
+  type drawable id=08 entryCount=1
+    resource 0x7f08013f drawable/ic_shortcut_add_contact
+"""
+
+VALUE = "E: div (line=1)\n  A: icon=@0x7f08013f"
+XML = XML_HEADER + '<div icon="@drawable/ic_shortcut_add_contact" />'
+
+
+class TestApi(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.resources = ResourceTable.parse(RESOURCES)
+
+    def test_convert(self):
+        self.assertEqual(XML, convert(VALUE, self.resources))
+        self.assertEqual(XML.encode(), convert(VALUE.encode(), self.resources, encoding="utf-8"))
+        self.assertEqual('<div icon="@0x7f08013f" />', convert(VALUE.split("\n"), no_header=True))
+        with self.assertRaises(ValueError):
+            convert("")
+
+    def test_convert_resources_path(self):
+        path = self.write_input("resources.txt", RESOURCES)
+        os.environ["XDG_CACHE_HOME"] = os.path.join(self.tmp.name, "cache")
+        try:
+            self.assertEqual(XML, convert(VALUE, path))
+        finally:
+            del os.environ["XDG_CACHE_HOME"]
+
+    def test_load_resources_layers(self):
+        paths = [self.write_input("framework.txt", "    resource 0x01080000 drawable/ic_menu\n"), self.write_input("resources.txt", RESOURCES)]
+        os.environ["XDG_CACHE_HOME"] = os.path.join(self.tmp.name, "cache")
+        try:
+            table = load_resources(paths)
+            self.assertIs(table, load_resources(paths))
+            self.assertEqual("drawable/ic_menu", table.reference("0x01080000"))
+            self.assertEqual(XML, convert(VALUE, [paths[0], self.resources]))
+
+            # only the last used tables are kept
+            with mock.patch.object(api, "LAYERS_SIZE", 3):
+                others = [self.write_input(f"other{i}.txt", f"    resource 0x7f08000{i} drawable/other{i}\n") for i in range(2)]
+                load_resources(others)
+                self.assertEqual(3, len(api._layers))
+                self.assertIs(load_resources(others), load_resources(others))
+                self.assertIsNot(table, load_resources(paths))
+                self.assertEqual(3, len(api._layers))
+
+            # a layer dropped before its merged table is loaded again
+            api._layers.clear()
+            with mock.patch.object(api, "LAYERS_SIZE", 4):
+                load_resources(paths)
+                load_resources(others[:1])
+                self.assertNotIn(api.cache_key(paths[0]), api._layers)
+                self.assertIn(tuple(api.cache_key(path) for path in paths), api._layers)
+                for _ in range(2):
+                    self.assertEqual("drawable/ic_menu", load_resources(paths).reference("0x01080000"))
+                self.assertLessEqual(len(api._layers), 4)
+        finally:
+            del os.environ["XDG_CACHE_HOME"]
+
+    def test_convert_file(self):
+        filename = self.write_input("file", VALUE)
+        out_path = os.path.join(self.tmp.name, "out.xml")
+        self.assertEqual(out_path, convert_file(filename, out_path, self.resources))
+        with open(out_path) as f:
+            self.assertEqual(XML, f.read())
+
+    def test_convert_file_error(self):
+        filename = self.write_input("file", "E: div (line=1)\n  X: nothing")
+        with self.assertRaises(ConversionError) as ctx:
+            convert_file(filename, os.path.join(self.tmp.name, "out.xml"))
+        self.assertEqual(filename, ctx.exception.filename)
+        self.assertIsInstance(ctx.exception.__cause__, ValueError)
+        error = pickle.loads(pickle.dumps(ctx.exception))
+        self.assertEqual(str(ctx.exception), str(error))
+
+    def test_convert_many(self):
+        good = self.write_input("good", VALUE)
+        bad = self.write_input("bad", "")
+        results = list(convert_many([good, bad, good], resources=self.resources))
+        self.assertEqual([Result(good, XML, None), Result(bad, None, f"from '{bad}': file is empty..."), Result(good, XML, None)], results)
+
+    def test_convert_many_output_dir(self):
+        filenames = [self.write_input(f"file{i}", VALUE) for i in range(3)]
+        output_dir = os.path.join(self.tmp.name, "output")
+        for jobs in (1, 2):
+            results = list(convert_many(filenames, output_dir, self.resources, jobs=jobs))
+            self.assertEqual([os.path.join(output_dir, f"file{i}.xml") for i in range(3)], [result.output for result in results])
+            self.assertEqual([None] * 3, [result.error for result in results])
+
+    def test_aconvert_many(self):
+        filenames = [self.write_input(f"file{i}", VALUE if i % 3 else "") for i in range(10)]
+
+        async def collect():
+            return [result async for result in aconvert_many(filenames, resources=self.resources, concurrency=3)]
+
+        results = asyncio.run(collect())
+        self.assertEqual(filenames, [result.filename for result in results])
+        self.assertEqual([None if i % 3 == 0 else XML for i in range(10)], [result.output for result in results])
+        self.assertEqual(4, len([result for result in results if result.error]))
+
+    def test_aconvert(self):
+        self.assertEqual(XML, asyncio.run(aconvert(VALUE, self.resources)))
@@ -0,0 +1,74 @@
+import io
+import os
+import tarfile
+import zipfile
+from unittest import mock
+
+from ..xmltree2xml.archive import OutputArchive, archive_format
+from ..xmltree2xml.main import XML_HEADER, main
+from .helpers import FilesTestCase
+
+
+class TestArchive(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.filenames = []
+        for name in ("first", "second"):
+            self.filenames.append(self.write_input(name, f"E: {name} (line=1)\n  A: value=true\n"))
+
+    def run_main(self, *argv):
+        with mock.patch("sys.stdout", io.StringIO()) as stdout:
+            main(list(argv))
+        return stdout.getvalue()
+
+    def test_format(self):
+        self.assertEqual("zip", archive_format("out.zip"))
+        self.assertEqual("tar.gz", archive_format("out.tgz"))
+        self.assertEqual("tar.gz", archive_format("out.tar.gz"))
+        self.assertEqual("tar", archive_format("-"))
+        with self.assertRaises(ValueError):
+            archive_format("out.rar")
+
+    def test_zip(self):
+        path = os.path.join(self.tmp.name, "out.zip")
+        for jobs in ("1", "2"):
+            output = self.run_main("-a", path, "-j", jobs, "--compression-level", "1", *self.filenames)
+            self.assertEqual(f"writing '{path}' (2 file(s)) ...\n", output)
+            self.assertFalse(os.path.exists("output"))
+            with zipfile.ZipFile(path) as archive:
+                self.assertEqual(["first.xml", "second.xml"], archive.namelist())
+                self.assertEqual(XML_HEADER + '<first value="true" />', archive.read("first.xml").decode())
+
+    def test_tar_gz_documents(self):
+        filename = self.write_input("dump", "res/layout/main.xml:\nE: main (line=1)\nres/xml/other.xml:\nE: other (line=1)\n")
+        path = os.path.join(self.tmp.name, "out.tar.gz")
+        self.run_main("-m", "-n", "-a", path, filename)
+        with tarfile.open(path) as archive:
+            self.assertEqual(["layout/main.xml", "xml/other.xml"], archive.getnames())
+            self.assertEqual(b"<main />", archive.extractfile("layout/main.xml").read())
+
+    def test_stdout(self):
+        stdout = io.TextIOWrapper(io.BytesIO())
+        with mock.patch("sys.stdout", stdout):
+            main(["-a", "-", "-n", *self.filenames])
+        with tarfile.open(fileobj=io.BytesIO(stdout.buffer.getvalue())) as archive:
+            self.assertEqual(["first.xml", "second.xml"], archive.getnames())
+            self.assertEqual(b'<second value="true" />', archive.extractfile("second.xml").read())
+
+    def test_failed_document(self):
+        filename = self.write_input("empty", "")
+        path = os.path.join(self.tmp.name, "out.zip")
+        with self.assertRaises(ValueError):
+            self.run_main("-a", path, self.filenames[0], filename)
+        # documents converted before the error are kept
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(["first.xml"], archive.namelist())
+
+    def test_write(self):
+        buf = io.BytesIO()
+        with mock.patch("sys.stdout", mock.Mock(buffer=buf)):
+            with OutputArchive("-", "zip", 0) as archive:
+                self.assertEqual(3, archive.write("dir/file.xml", b"xml"))
+        with zipfile.ZipFile(io.BytesIO(buf.getvalue())) as archive:
+            self.assertEqual(zipfile.ZIP_STORED, archive.getinfo("dir/file.xml").compress_type)
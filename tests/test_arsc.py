@@ -0,0 +1,117 @@
+import os
+import struct
+import zipfile
+
+from ..xmltree2xml import arsc, axml
+from ..xmltree2xml.resources import ResourceTable
+from .helpers import FilesTestCase
+from .test_axml import string_pool
+
+VALUES = ["res/drawable/ic_launcher.xml", "res/file.xml", "res/file-fr.xml", "res/aa.xml", "hello", "bye"]
+KEYS = ["ic_launcher", "Theme", "file_final", "other", "hello", "bye"]
+TYPES = ["drawable", "style", "xml", "string"]
+
+
+def entry(kind, key, *args):
+    if kind == "value":
+        data_type, data = args
+        return struct.pack("<HHIHBBI", 8, 0, KEYS.index(key), 8, 0, data_type, data)
+    elif kind == "map":
+        return struct.pack("<HHIII", 16, arsc.FLAG_COMPLEX, KEYS.index(key), args[0], 0)
+    data_type, data = args
+    return struct.pack("<HHI", KEYS.index(key), arsc.FLAG_COMPACT | (data_type << 8), data)
+
+
+def string(key, value):
+    return entry("value", key, axml.TYPE_STRING, VALUES.index(value))
+
+
+def type_chunk(type_id, entries, language=b"", flags=0):
+    """ `entries` is a list of entries (None when missing) """
+    config = struct.pack("<I4s2s", 64, b"", language).ljust(64, b"\0")
+    header_size = 20 + len(config)
+    data, offsets = b"", []
+    for index, value in enumerate(entries):
+        if value is None:
+            continue
+        offsets.append((index, len(data)))
+        data += value
+
+    if flags & arsc.FLAG_SPARSE:
+        table = b"".join(struct.pack("<HH", index, offset // 4) for index, offset in offsets)
+    else:
+        positions = dict(offsets)
+        missing, fmt = (arsc.NO_ENTRY16, "H") if flags & arsc.FLAG_OFFSET16 else (arsc.NO_ENTRY, "I")
+        values = [positions[index] // (4 if fmt == "H" else 1) if index in positions else missing for index in range(len(entries))]
+        table = struct.pack(f"<{len(values)}{fmt}", *values)
+        table += b"\0" * (-len(table) % 4)
+    count = len(offsets) if flags & arsc.FLAG_SPARSE else len(entries)
+    header = struct.pack("<HHIBBHII", arsc.RES_TABLE_TYPE_TYPE, header_size, header_size + len(table) + len(data), type_id, flags, 0, count, header_size + len(table))
+    return header + config + table + data
+
+
+def build_table():
+    chunks = [
+        # type spec, not used
+        struct.pack("<HHIBBHII", 0x0202, 16, 20, 1, 0, 0, 1, 0),
+        type_chunk(1, [string("ic_launcher", "res/drawable/ic_launcher.xml")]),
+        type_chunk(2, [entry("map", "Theme", 0x01030005)]),
+        type_chunk(2, [entry("map", "Theme", 0x01030006)], b"fr"),
+        type_chunk(3, [string("file_final", "res/file.xml"), entry("compact", "other", axml.TYPE_STRING, VALUES.index("res/aa.xml"))]),
+        type_chunk(3, [string("file_final", "res/file-fr.xml")], b"fr"),
+        type_chunk(4, [None, string("hello", "hello")]),
+        type_chunk(4, [string("bye", "bye"), None], b"fr", arsc.FLAG_SPARSE),
+        type_chunk(4, [string("bye", "bye"), string("hello", "hello")], b"de", arsc.FLAG_OFFSET16),
+    ]
+    types = string_pool(TYPES, False)
+    keys = string_pool(KEYS, True)
+    header_size = 8 + arsc.PACKAGE_HEADER.size + 4
+    name = "com.example".encode("utf-16-le").ljust(256, b"\0")
+    body = types + keys + b"".join(chunks)
+    package = struct.pack("<HHII256sIIIII", arsc.RES_TABLE_PACKAGE_TYPE, header_size, header_size + len(body), 0x7f, name,
+                          header_size, len(TYPES), header_size + len(types), len(KEYS), 0) + body
+
+    values = string_pool(VALUES, True)
+    return struct.pack("<HHII", arsc.RES_TABLE_TYPE, 12, 12 + len(values) + len(package), 1) + values + package
+
+
+class TestArsc(FilesTestCase):
+
+    def check(self, table):
+        self.assertEqual({
+            "0x7f010000": "drawable/ic_launcher",
+            "0x7f020000": "style/Theme",
+            "0x7f030000": "xml/file_final",
+            "0x7f030001": "xml/other",
+            "0x7f040001": "string/hello",
+            "0x7f040000": "string/bye",
+        }, table.ids)
+        # only the default configuration, like the dump
+        self.assertEqual({"0x01030005": "style/Theme"}, table.styles)
+        self.assertEqual({"file.xml": "file_final", "aa.xml": "other"}, table.files)
+
+    def test_parse(self):
+        self.check(ResourceTable.from_arsc(build_table()))
+
+    def test_from_file(self):
+        path = self.write_input("resources.arsc", build_table())
+        self.check(ResourceTable.from_file(path))
+        self.check(ResourceTable.load(path, os.path.join(self.tmp.name, "cache")))
+        self.check(ResourceTable.load(path, os.path.join(self.tmp.name, "cache")))
+
+    def test_apk(self):
+        path = os.path.join(self.tmp.name, "app.apk")
+        with zipfile.ZipFile(path, "w") as apk:
+            apk.writestr("resources.arsc", build_table())
+        self.check(ResourceTable.from_file(path))
+
+        with zipfile.ZipFile(path, "w") as apk:
+            apk.writestr("classes.dex", b"dex\n")
+        with self.assertRaises(ValueError):
+            ResourceTable.from_file(path)
+
+    def test_wrong_file(self):
+        with self.assertRaises(ValueError):
+            arsc.parse(b"\x03\x00\x08\x00\x08\x00\x00\x00\x00\x00\x00\x00")
+        with self.assertRaises(ValueError):
+            arsc.parse(build_table()[:-30])
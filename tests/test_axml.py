@@ -0,0 +1,162 @@
+import io
+import os
+import struct
+import zipfile
+from contextlib import redirect_stdout
+
+from ..xmltree2xml import axml
+from ..xmltree2xml.main import convert_documents, convert_file, input_format, iter_events, main, parse_xml
+from ..xmltree2xml.resources import ResourceTable
+from .helpers import FilesTestCase
+
+ANDROID = "http://schemas.android.com/apk/res/android"
+APP = "http://schemas.android.com/apk/res-auto"
+
+RESOURCES = """Package name=com.example id=7f
+  type drawable id=08 entryCount=1
+    resource 0x7f08013f drawable/ic_launcher
+"""
+
+# `aapt2 dump xmltree` of the document build by `build_document`
+XMLTREE = """N: android=http://schemas.android.com/apk/res/android (line=2)
+  E: manifest (line=2)
+    A: http://schemas.android.com/apk/res/android:versionCode(0x0101021b)=12
+    A: http://schemas.android.com/apk/res/android:versionName(0x0101021c)="1.0" (Raw: "1.0")
+    A: package="com.example" (Raw: "com.example")
+      E: application (line=5)
+        A: http://schemas.android.com/apk/res/android:icon(0x01010002)=@0x7f08013f
+        A: http://schemas.android.com/apk/res/android:enabled(0x0101000e)=false
+        A: http://schemas.android.com/apk/res-auto:elevation(0x7f040001)=16.5dp
+        A: http://schemas.android.com/apk/res/android:textColor(0x01010098)=#ff00ff00
+        A: http://schemas.android.com/apk/res/android:alpha(0x0101031f)=0.5
+          E: label (line=6)
+              T: 'hello'
+          E: label (line=7)
+"""
+
+
+def string_pool(strings, utf8):
+    data, offsets = b"", []
+    for value in strings:
+        offsets.append(len(data))
+        if utf8:
+            encoded = value.encode()
+            data += bytes([len(value), len(encoded)]) + encoded + b"\0"
+        else:
+            data += struct.pack("<H", len(value)) + value.encode("utf-16-le") + b"\0\0"
+    data += b"\0" * (-len(data) % 4)
+    header_size = 28
+    start = header_size + 4 * len(strings)
+    header = struct.pack("<HHI5I", axml.RES_STRING_POOL_TYPE, header_size, start + len(data), len(strings), 0, axml.UTF8_FLAG if utf8 else 0, start, 0)
+    return header + struct.pack(f"<{len(strings)}I", *offsets) + data
+
+
+def node(chunk_type, line, ext):
+    return struct.pack("<HHIII", chunk_type, 16, 16 + len(ext), line, axml.NO_ENTRY) + ext
+
+
+def build_document(utf8=True):
+    """ compiled xml of `XMLTREE` """
+    # attributes names with a resource id first, like aapt2
+    strings = ["versionCode", "versionName", "icon", "enabled", "elevation", "textColor", "alpha", "android", ANDROID, APP, "manifest", "package",
+               "1.0", "com.example", "application", "label", "hello", "  \n  "]
+    ids = [0x0101021b, 0x0101021c, 0x01010002, 0x0101000e, 0x7f040001, 0x01010098, 0x0101031f]
+    index = {value: pos for pos, value in enumerate(strings)}
+
+    def element(line, name, attrs):
+        ext = struct.pack("<IIHHHHHH", axml.NO_ENTRY, index[name], 20, 20, len(attrs), 0, 0, 0)
+        for ns, attr, raw, data_type, data in attrs:
+            ext += struct.pack("<IIIHBBI", index[ns] if ns else axml.NO_ENTRY, index[attr], index[raw] if raw else axml.NO_ENTRY, 8, 0, data_type, data)
+        return node(axml.RES_XML_START_ELEMENT_TYPE, line, ext)
+
+    def end(line, name):
+        return node(axml.RES_XML_END_ELEMENT_TYPE, line, struct.pack("<II", axml.NO_ENTRY, index[name]))
+
+    def text(line, value):
+        return node(axml.RES_XML_CDATA_TYPE, line, struct.pack("<IHBBI", index[value], 8, 0, axml.TYPE_STRING, index[value]))
+
+    chunks = [
+        string_pool(strings, utf8),
+        struct.pack(f"<HHI{len(ids)}I", axml.RES_XML_RESOURCE_MAP_TYPE, 8, 8 + 4 * len(ids), *ids),
+        node(axml.RES_XML_START_NAMESPACE_TYPE, 2, struct.pack("<II", index["android"], index[ANDROID])),
+        element(2, "manifest", [
+            (ANDROID, "versionCode", None, axml.TYPE_INT_DEC, 12),
+            (ANDROID, "versionName", "1.0", axml.TYPE_STRING, index["1.0"]),
+            (None, "package", "com.example", axml.TYPE_STRING, index["com.example"]),
+        ]),
+        element(5, "application", [
+            (ANDROID, "icon", None, axml.TYPE_REFERENCE, 0x7f08013f),
+            (ANDROID, "enabled", None, axml.TYPE_INT_BOOLEAN, 0),
+            # 16.5 with the radix 16p7 in dp
+            (APP, "elevation", None, axml.TYPE_DIMENSION, (int(16.5 * 128) << 8) | (1 << 4) | 1),
+            (ANDROID, "textColor", None, axml.TYPE_INT_COLOR_ARGB8, 0xff00ff00),
+            (ANDROID, "alpha", None, axml.TYPE_FLOAT, struct.unpack("<I", struct.pack("<f", 0.5))[0]),
+        ]),
+        element(6, "label", []),
+        text(6, "hello"),
+        end(6, "label"),
+        text(6, "  \n  "),
+        element(7, "label", []),
+        end(7, "label"),
+        end(8, "application"),
+        end(9, "manifest"),
+        node(axml.RES_XML_END_NAMESPACE_TYPE, 9, struct.pack("<II", index["android"], index[ANDROID])),
+    ]
+    body = b"".join(chunks)
+    return struct.pack("<HHI", axml.RES_XML_TYPE, 8, 8 + len(body)) + body
+
+
+class TestAxml(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.resources = ResourceTable.parse(RESOURCES)
+
+    def test_same_as_xmltree(self):
+        for utf8 in (True, False):
+            data = build_document(utf8)
+            self.assertEqual(list(iter_events(XMLTREE, self.resources)), list(iter_events(data, self.resources)))
+            self.assertEqual(parse_xml(XMLTREE, self.resources).to_str(), parse_xml(data, self.resources).to_str())
+
+    def test_format_value(self):
+        self.assertEqual("-1", axml.format_value(axml.TYPE_INT_DEC, 0xffffffff, None))
+        self.assertEqual("0x00000011", axml.format_value(axml.TYPE_INT_HEX, 0x11, None))
+        self.assertEqual("?0x7f040001", axml.format_value(axml.TYPE_ATTRIBUTE, 0x7f040001, None))
+        self.assertEqual("@null", axml.format_value(axml.TYPE_REFERENCE, 0, None))
+        self.assertEqual("@empty", axml.format_value(axml.TYPE_NULL, axml.DATA_NULL_EMPTY, None))
+        self.assertEqual("50%p", axml.format_value(axml.TYPE_FRACTION, (int(0.5 * 128) << 8) | (1 << 4) | 1, None))
+        self.assertEqual("-2px", axml.format_value(axml.TYPE_DIMENSION, (-2 << 8) & 0xffffffff, None))
+
+    def test_wrong_file(self):
+        with self.assertRaises(ValueError):
+            list(iter_events(b"\x01\x00\x08\x00\x08\x00\x00\x00"))
+        with self.assertRaises(ValueError):
+            list(iter_events(build_document()[:-40]))
+
+    def test_convert_file(self):
+        filename = self.write_input("main.xml", build_document())
+        self.assertEqual("axml", input_format(filename))
+        output_dir = os.path.join(self.tmp.name, "output")
+        os.mkdir(output_dir)
+        path = convert_file(filename, output_dir, self.resources)
+        self.assertEqual(os.path.join(output_dir, "main.xml"), path)
+        with open(path) as f:
+            self.assertIn('android:icon="@drawable/ic_launcher"', f.read())
+
+    def test_apk(self):
+        filename = os.path.join(self.tmp.name, "app.apk")
+        with zipfile.ZipFile(filename, "w") as apk:
+            apk.writestr("AndroidManifest.xml", build_document())
+            apk.writestr("res/layout/main.xml", build_document())
+            apk.writestr("res/raw/data.xml", "<data />")
+            apk.writestr("classes.dex", b"dex\n")
+        self.assertEqual("apk", input_format(filename))
+
+        output_dir = os.path.join(self.tmp.name, "output")
+        results = list(convert_documents(filename, output_dir, self.resources))
+        self.assertEqual([(os.path.join(output_dir, "AndroidManifest.xml"), None), (os.path.join(output_dir, "layout", "main.xml"), None)], results)
+
+        output_dir = os.path.join(self.tmp.name, "cli")
+        with redirect_stdout(io.StringIO()):
+            main(["-o", output_dir, filename])
+        self.assertEqual(["AndroidManifest.xml", "layout"], sorted(os.listdir(output_dir)))
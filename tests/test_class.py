@@ -1,3 +1,4 @@
+import io
 from ..xmltree2xml.main import XmlTreeElement, parse_xml
 import unittest
 
@@ -75,3 +76,68 @@ class TestXmlClass(unittest.TestCase):
         c.add_child(chil)
         v = c.to_str(0, 4)
         self.assertEqual(v, '<tag>\n    <div>\n        <lol />\n    </div>\n</tag>')
+
+    def test_format_text_with_attr(self):
+        c = XmlTreeElement("tag")
+        c.add_attr("key", True)
+        c.set_text("text")
+        self.assertEqual(c.to_str(0, 0), '<tag key="true">text</tag>')
+
+    def test_format_deep(self):
+        root = c = XmlTreeElement("tag")
+        for _ in range(5000):
+            chil = XmlTreeElement("tag")
+            c.add_child(chil)
+            c = chil
+        v = root.to_str(0, 0)
+        self.assertEqual(v, "<tag>\n" * 5000 + "<tag />" + "\n</tag>" * 5000)
+
+    def test_write_to(self):
+        c = XmlTreeElement("tag")
+        chil = XmlTreeElement("div")
+        chil.add_child(XmlTreeElement("lol"))
+        c.add_child(chil)
+        c.add_child(XmlTreeElement("lol"))
+
+        buf = io.StringIO()
+        c.write_to(buf, 2)
+        self.assertEqual(buf.getvalue(), c.to_str(0, 2))
+        self.assertEqual("".join(c.iter_chunks(1, 2)), c.to_str(1, 2))
+
+    def test_slots(self):
+        c = XmlTreeElement("tag")
+        with self.assertRaises(AttributeError):
+            c.unknown = 1
+
+    def test_lazy_containers(self):
+        c = XmlTreeElement("tag")
+        self.assertEqual(c.attributes, {})
+        self.assertEqual(c.extra_attrs, {})
+        self.assertEqual(c.extra, {})
+        self.assertEqual(c.namespaces, {})
+        self.assertEqual(len(c.childrens), 0)
+        self.assertIs(c.attributes, XmlTreeElement("other").attributes)
+
+    def test_no_shared_default(self):
+        c = XmlTreeElement("tag")
+        c.add_attr("key", "value")
+        c.add_child(XmlTreeElement("div"))
+        other = XmlTreeElement("tag")
+        self.assertEqual(other.attributes, {})
+        self.assertEqual(len(other.childrens), 0)
+
+    def test_extra_attrs_only_with_extra(self):
+        c = XmlTreeElement("tag")
+        c.add_attr("key", "value")
+        c.add_attr("raw", "value", extra={"Raw": "value"})
+        self.assertEqual(c.extra_attrs, {"raw": {"Raw": "value"}})
+
+    def test_read_only_views(self):
+        # empty or not, the containers are changed with the add_* methods only
+        for c in (XmlTreeElement("tag"), XmlTreeElement("tag", attrs={"key": "value"}, child=[XmlTreeElement("div")])):
+            with self.assertRaises(TypeError):
+                c.attributes["other"] = "value"
+            with self.assertRaises(AttributeError):
+                c.childrens.append(XmlTreeElement("span"))
+        c.attributes = {"key": "other"}
+        self.assertEqual({"key": "other"}, c.attributes)
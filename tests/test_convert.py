@@ -0,0 +1,78 @@
+import io
+import os
+from unittest import mock
+
+from ..xmltree2xml.main import STDIO, convert_file
+from ..xmltree2xml.parallel import convert_files_parallel
+from ..xmltree2xml.resources import ResourceTable
+from .helpers import FilesTestCase
+
+RESOURCES = """Package name=com.android.dialer id=7f
+  type drawable id=08 entryCount=1
+    resource 0x7f08013f drawable/ic_shortcut_add_contact
+      () (file) res/drawable/ic_shortcut_add_contact.xml type=XML
+"""
+
+
+class TestConvertFile(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.output_dir = os.path.join(self.tmp.name, "output")
+        os.mkdir(self.output_dir)
+
+    def test_convert_file(self):
+        filename = self.write_input("file", "E: div (line=1)\n  A: icon=@0x7f08013f")
+        path = convert_file(filename, self.output_dir)
+        self.assertEqual(os.path.join(self.output_dir, "file.xml"), path)
+        self.assertEqual('<?xml version="1.0" encoding="utf-8"?>\n<div icon="@0x7f08013f" />', self.read(path))
+
+    def test_convert_file_resources_no_header(self):
+        filename = self.write_input("file", "E: div (line=1)\n  A: icon=@0x7f08013f")
+        path = convert_file(filename, self.output_dir, ResourceTable.parse(RESOURCES), no_header=True)
+        self.assertEqual('<div icon="@drawable/ic_shortcut_add_contact" />', self.read(path))
+
+    def test_convert_file_error(self):
+        filename = self.write_input("file", "")
+        with self.assertRaisesRegex(ValueError, "from '.*file': file is empty"):
+            convert_file(filename, self.output_dir)
+
+    def test_convert_stdin(self):
+        with mock.patch("sys.stdin", io.StringIO("E: div (line=1)\n  A: icon=@0x7f08013f\n")):
+            path = convert_file("-", self.output_dir, no_header=True)
+        self.assertEqual(os.path.join(self.output_dir, "stdin.xml"), path)
+        self.assertEqual('<div icon="@0x7f08013f" />', self.read(path))
+
+    def test_convert_stdout(self):
+        filename = self.write_input("file", "E: div (line=1)\n  A: icon=@0x7f08013f")
+        with mock.patch("sys.stdout", io.StringIO()) as stdout:
+            self.assertEqual("-", convert_file(filename, "-", ResourceTable.parse(RESOURCES)))
+            self.assertEqual('<?xml version="1.0" encoding="utf-8"?>\n<div icon="@drawable/ic_shortcut_add_contact" />\n', stdout.getvalue())
+
+    def test_convert_stdin_stdout(self):
+        with mock.patch("sys.stdin", io.StringIO("E: div (line=1)\n    E: span (line=2)\n")), mock.patch("sys.stdout", io.StringIO()) as stdout:
+            convert_file("-", "-", no_header=True)
+            self.assertEqual('<div>\n    <span />\n</div>\n', stdout.getvalue())
+
+    def test_convert_files_parallel(self):
+        filenames = [self.write_input(f"file{i}", f"E: div{i} (line=1)\n  A: icon=@0x7f08013f") for i in range(10)]
+        filenames.insert(3, self.write_input("wrong", " E: div (line=1)"))
+
+        results = list(convert_files_parallel(filenames, 3, ResourceTable.parse(RESOURCES), output_dir=self.output_dir))
+        self.assertEqual(11, len(results))
+
+        path, error = results.pop(3)
+        self.assertIsNone(path)
+        self.assertRegex(error, "from '.*wrong': wrong indentation in line 1")
+
+        for i, (path, error) in enumerate(results):
+            self.assertIsNone(error)
+            self.assertEqual(os.path.join(self.output_dir, f"file{i}.xml"), path)
+            self.assertEqual(f'<?xml version="1.0" encoding="utf-8"?>\n<div{i} icon="@drawable/ic_shortcut_add_contact" />', self.read(path))
+
+    def test_convert_files_parallel_stdin(self):
+        filename = self.write_input("file", "E: div (line=1)")
+        with mock.patch("sys.stdin", io.StringIO("E: span (line=1)\n")):
+            results = list(convert_files_parallel([STDIO, filename], 2, output_dir=self.output_dir))
+        self.assertEqual([(os.path.join(self.output_dir, "stdin.xml"), None), (os.path.join(self.output_dir, "file.xml"), None)], results)
+        self.assertEqual('<?xml version="1.0" encoding="utf-8"?>\n<span />', self.read(results[0][0]))
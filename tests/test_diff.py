@@ -0,0 +1,105 @@
+import io
+import os
+from unittest import mock
+
+from ..xmltree2xml.diff import CHANGED, INSERTED, MOVED, REMOVED, diff_documents, diff_trees, increasing, tree_hashes
+from ..xmltree2xml.main import main, parse_xml
+from .helpers import FilesTestCase
+
+OLD = """E: manifest (line=1)
+  A: package="com.example" (Raw: "com.example")
+    E: application (line=2)
+      A: label="old" (Raw: "old")
+        E: activity (line=3)
+          A: name="First" (Raw: "First")
+        E: activity (line=4)
+          A: name="Second" (Raw: "Second")
+        E: service (line=5)
+          A: name="Sync" (Raw: "Sync")
+    E: uses-sdk (line=6)
+      A: minSdk=21
+"""
+
+NEW = """E: manifest (line=1)
+  A: package="com.example" (Raw: "com.example")
+    E: application (line=2)
+      A: label="new" (Raw: "new")
+        E: activity (line=3)
+          A: name="Second" (Raw: "Second")
+        E: activity (line=4)
+          A: name="First" (Raw: "First")
+        E: receiver (line=5)
+          A: name="Boot" (Raw: "Boot")
+    E: uses-sdk (line=6)
+      A: minSdk=21
+"""
+
+
+def kinds(changes):
+    return [(change.kind, change.path) for change in changes]
+
+
+class TestDiff(FilesTestCase):
+
+    def test_hashes(self):
+        old, new = parse_xml(OLD), parse_xml(NEW)
+        old_hashes, new_hashes = tree_hashes(old), tree_hashes(new)
+        self.assertEqual(old_hashes[id(old.childrens[1])], new_hashes[id(new.childrens[1])])
+        self.assertNotEqual(old_hashes[id(old)], new_hashes[id(new)])
+        other = parse_xml(OLD)
+        self.assertEqual(old_hashes[id(old)], tree_hashes(other)[id(other)])
+
+    def test_same(self):
+        self.assertEqual([], list(diff_trees(parse_xml(OLD), parse_xml(OLD))))
+
+    def test_changes(self):
+        changes = list(diff_trees(parse_xml(OLD), parse_xml(NEW)))
+        self.assertEqual([
+            (CHANGED, "manifest/application"),
+            (MOVED, "manifest/application/activity[1]"),
+            (INSERTED, "manifest/application/receiver"),
+            (REMOVED, "manifest/application/service"),
+        ], kinds(changes))
+        self.assertEqual([("label", "old", "new")], changes[0].details)
+        self.assertEqual((4, 3), (changes[1].old.extra["line"], changes[1].new.extra["line"]))
+
+    def test_changed_child(self):
+        new = NEW.replace('name="Boot" (Raw: "Boot")', 'name="Sync" (Raw: "Sync")').replace("receiver", "service").replace("minSdk=21", "minSdk=23")
+        changes = list(diff_trees(parse_xml(OLD), parse_xml(new)))
+        self.assertEqual([
+            (CHANGED, "manifest/application"),
+            (MOVED, "manifest/application/activity[1]"),
+            (CHANGED, "manifest/uses-sdk"),
+        ], kinds(changes))
+        self.assertEqual([("minSdk", 21, 23)], changes[-1].details)
+
+    def test_other_root(self):
+        changes = list(diff_trees(parse_xml(OLD), parse_xml("E: other (line=1)")))
+        self.assertEqual([(REMOVED, "manifest"), (INSERTED, "other")], kinds(changes))
+
+    def test_increasing(self):
+        self.assertEqual({0, 2, 3}, increasing([1, 3, 2, 4]))
+        self.assertEqual(set(), increasing([]))
+
+    def test_directories(self):
+        tmp = self.tmp.name
+        for name, files in (("old", {"a.txt": OLD, "same.txt": OLD, "gone.txt": OLD}), ("new", {"a.txt": NEW, "same.txt": OLD, "added.txt": OLD})):
+            os.mkdir(os.path.join(tmp, name))
+            for filename, value in files.items():
+                self.write_input(os.path.join(name, filename), value)
+
+        results = dict(diff_documents(os.path.join(tmp, "old"), os.path.join(tmp, "new")))
+        self.assertEqual(["a.txt", "added.txt", "gone.txt"], sorted(results))
+        self.assertEqual([(INSERTED, "manifest")], kinds(results["added.txt"]))
+        self.assertEqual([(REMOVED, "manifest")], kinds(results["gone.txt"]))
+
+        with mock.patch("sys.stdout", io.StringIO()) as stdout:
+            with self.assertRaises(SystemExit) as ctx:
+                main(["diff", os.path.join(tmp, "old", "a.txt"), os.path.join(tmp, "new", "a.txt")])
+        self.assertEqual(1, ctx.exception.code)
+        self.assertIn("changed manifest/application (line 2 -> 2)\n    label: \"old\" -> \"new\"\n", stdout.getvalue())
+        self.assertIn("removed manifest/application/service (line 5)\n", stdout.getvalue())
+
+        with mock.patch("sys.stdout", io.StringIO()) as stdout:
+            main(["diff", os.path.join(tmp, "old", "same.txt"), os.path.join(tmp, "new", "same.txt")])
+        self.assertEqual("", stdout.getvalue())
@@ -0,0 +1,67 @@
+import os
+import re
+
+from ..xmltree2xml.main import convert_documents, generate_document_path, split_documents
+from ..xmltree2xml.resources import ResourceTable
+from .helpers import FilesTestCase
+
+DUMP = """res/layout/main.xml:
+E: LinearLayout (line=1)
+    E: TextView (line=2)
+res/Ab.xml:
+E: shortcuts (line=1)
+  A: name="shortcuts" (Raw: "shortcuts")
+res/layout/wrong.xml:
+ E: list (line=1)
+res/xml/empty.xml:
+
+res/layout-land/main.xml:
+E: FrameLayout (line=1)
+"""
+
+RESOURCES = """    resource 0x7f180012 xml/shortcuts
+      () (file) res/Ab.xml type=XML
+"""
+
+
+class TestDocuments(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.output_dir = os.path.join(self.tmp.name, "output")
+        self.filename = self.write_input("dump.txt", DUMP)
+
+    def test_split_documents(self):
+        documents = list(split_documents(DUMP))
+        self.assertEqual(["res/layout/main.xml", "res/Ab.xml", "res/layout/wrong.xml", "res/xml/empty.xml", "res/layout-land/main.xml"],
+                         [name for name, _, _ in documents])
+        self.assertEqual((2, ["E: LinearLayout (line=1)", "    E: TextView (line=2)"]), documents[0][1:])
+        self.assertEqual(12, documents[-1][1])
+
+    def test_split_documents_delimiter(self):
+        documents = list(split_documents("E: a (line=1)\n---\nE: b (line=1)\n", re.compile("^---$")))
+        self.assertEqual([(None, 1, ["E: a (line=1)"]), (None, 3, ["E: b (line=1)", ""])], documents)
+
+    def test_generate_document_path(self):
+        self.assertEqual("out/layout/main.xml", generate_document_path("out", "res/layout/main.xml"))
+        self.assertEqual("out/main.xml", generate_document_path("out", "../../main.xml"))
+        self.assertEqual("out/etc/main.xml", generate_document_path("out", "/etc/main.xml"))
+
+    def test_convert_documents(self):
+        results = list(convert_documents(self.filename, self.output_dir, ResourceTable.parse(RESOURCES), rename_file=True))
+        self.assertEqual([
+            (os.path.join(self.output_dir, "layout/main.xml"), None),
+            (os.path.join(self.output_dir, "shortcuts.xml"), None),
+            (None, f"from 'res/layout/wrong.xml' in '{self.filename}': wrong indentation in line 8"),
+            (None, f"from 'res/xml/empty.xml' in '{self.filename}': file is empty..."),
+            (os.path.join(self.output_dir, "layout-land/main.xml"), None),
+        ], results)
+
+        self.assertEqual('<?xml version="1.0" encoding="utf-8"?>\n<LinearLayout>\n    <TextView />\n</LinearLayout>', self.read(os.path.join(self.output_dir, "layout/main.xml")))
+
+    def test_convert_documents_stream(self):
+        results = list(convert_documents(self.filename, self.output_dir, no_header=True, stream=True))
+        self.assertEqual([None, None, "wrong indentation in line 8", "file is empty...", None],
+                         [error and error.split(": ", 1)[1] for _, error in results])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, "layout/wrong.xml")))
+        self.assertEqual('<shortcuts name="shortcuts" />', self.read(os.path.join(self.output_dir, "Ab.xml")))
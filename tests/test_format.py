@@ -0,0 +1,78 @@
+import io
+import json
+import os
+from unittest import mock
+
+from ..xmltree2xml.api import convert
+from ..xmltree2xml.formats import iter_json, iter_ndjson_elements
+from ..xmltree2xml.main import iter_events, main, output_path, parse_xml
+from .helpers import FilesTestCase
+from .test_stream import VALUE
+
+SIMPLE = "E: div (line=1)\n  A: value=true\n  A: name=\"n\" (Raw: \"n\")\n    E: span (line=2)\n        T: 'text'\n    E: br (line=3)"
+
+
+def to_dict(element):
+    """ json object of an element of `parse_xml` """
+    return {
+        "tag": element.tag,
+        "line": element.extra.get("line"),
+        "namespaces": dict(element.namespaces),
+        "attributes": element.attributes,
+        "raw": {key: val.get("Raw") for key, val in element.extra_attrs.items()},
+        "text": element.text[1:-1] if element.text else None,
+        "children": [to_dict(child) for child in element.childrens],
+    }
+
+
+class TestFormat(FilesTestCase):
+
+    def test_json(self):
+        value = json.loads("".join(iter_json(iter_events(SIMPLE))))
+        self.assertEqual({
+            "tag": "div", "line": 1, "namespaces": {}, "attributes": {"value": True, "name": "n"}, "raw": {"name": "n"}, "text": None,
+            "children": [
+                {"tag": "span", "line": 2, "namespaces": {}, "attributes": {}, "raw": {}, "text": "text", "children": []},
+                {"tag": "br", "line": 3, "namespaces": {}, "attributes": {}, "raw": {}, "text": None, "children": []},
+            ],
+        }, value)
+
+    def test_same_as_tree(self):
+        self.assertEqual(to_dict(parse_xml(VALUE)), json.loads("".join(iter_json(iter_events(VALUE)))))
+
+    def test_document(self):
+        value = json.loads("".join(iter_json(iter_events(SIMPLE), "res/xml/a.xml")))
+        self.assertEqual("res/xml/a.xml", value["document"])
+        self.assertEqual("div", value["root"]["tag"])
+        self.assertEqual("", "".join(iter_json(iter_events(""), "empty")))
+
+    def test_ndjson_elements(self):
+        lines = "".join(iter_ndjson_elements(iter_events(SIMPLE), "a")).splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([(0, None, "div"), (1, 0, "span"), (2, 0, "br")], [(rec["id"], rec["parent"], rec["tag"]) for rec in records])
+        self.assertEqual("text", records[1]["text"])
+        self.assertEqual({"a"}, {rec["document"] for rec in records})
+
+    def test_output_path(self):
+        self.assertEqual("out/a.json", output_path("out/a.xml", "json"))
+        self.assertEqual("out/a.ndjson", output_path("out/a.xml", "ndjson-elements"))
+        self.assertEqual("out/a.xml", output_path("out/a.xml", "xml"))
+        self.assertEqual("-", output_path("-", "json"))
+
+    def test_api(self):
+        self.assertEqual(json.loads("".join(iter_json(iter_events(SIMPLE)))), json.loads(convert(SIMPLE, fmt="json")))
+
+    def test_cli(self):
+        dump = self.write_input("dump", "res/layout/main.xml:\nE: main (line=1)\nres/xml/other.xml:\nE: other (line=1)\n")
+
+        with mock.patch("sys.stdout", io.StringIO()) as stdout:
+            main(["-m", "--format", "ndjson", "-o", "-", dump])
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(["res/layout/main.xml", "res/xml/other.xml"], [rec["document"] for rec in records])
+        self.assertEqual(["main", "other"], [rec["root"]["tag"] for rec in records])
+
+        output = os.path.join(self.tmp.name, "output")
+        with mock.patch("sys.stdout", io.StringIO()):
+            main(["-m", "--format", "json", "-o", output, dump])
+        with open(os.path.join(output, "xml", "other.json")) as f:
+            self.assertEqual("other", json.load(f)["tag"])
@@ -0,0 +1,67 @@
+import hashlib
+import io
+import os
+from unittest import mock
+
+from ..xmltree2xml.main import main
+from ..xmltree2xml.manifest import Manifest, file_digest
+from .helpers import FilesTestCase
+
+
+class TestIncremental(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.output_dir = os.path.join(self.tmp.name, "output")
+        self.files = [self.write_input(f"file{i}", f"E: div{i} (line=1)") for i in range(3)]
+
+    def run_main(self, *args):
+        with mock.patch("sys.stdout", io.StringIO()) as stdout:
+            main(["-o", self.output_dir, "--incremental", *args])
+        return stdout.getvalue().splitlines()
+
+    def output(self, name):
+        return os.path.join(self.output_dir, name)
+
+    def test_skip_unchanged(self):
+        self.assertEqual(3, len(self.run_main(*self.files)))
+        self.assertEqual([], self.run_main(*self.files))
+
+        self.write_input("file1", "E: span (line=1)")
+        self.assertEqual([f"writing '{self.output('file1.xml')}' ..."], self.run_main(*self.files))
+        with open(self.output("file1.xml")) as f:
+            self.assertIn("<span />", f.read())
+
+    def test_options_changed(self):
+        self.run_main(*self.files)
+        self.assertEqual(3, len(self.run_main("--no-header", *self.files)))
+
+    def test_output_removed(self):
+        self.run_main(*self.files)
+        os.remove(self.output("file2.xml"))
+        self.assertEqual([f"writing '{self.output('file2.xml')}' ..."], self.run_main(*self.files))
+
+    def test_prune(self):
+        self.run_main(*self.files)
+        os.remove(self.files[0])
+        self.assertEqual([f"removing '{self.output('file0.xml')}' ..."], self.run_main("--prune", *self.files[1:]))
+        self.assertFalse(os.path.exists(self.output("file0.xml")))
+
+    def test_error_not_recorded(self):
+        wrong = self.write_input("wrong", " E: div (line=1)")
+        with mock.patch("sys.stderr", io.StringIO()), self.assertRaises(SystemExit):
+            self.run_main("-j", "2", wrong, *self.files)
+        self.assertEqual(3, len(Manifest.load(self.output_dir).entries))
+
+        self.write_input("wrong", "E: div (line=1)")
+        self.assertEqual([f"writing '{self.output('wrong.xml')}' ..."], self.run_main(wrong, *self.files))
+
+    def test_corrupted_manifest(self):
+        self.run_main(*self.files)
+        with open(Manifest(self.output_dir).path, "w") as f:
+            f.write("{")
+        self.assertEqual(3, len(self.run_main(*self.files)))
+
+    def test_file_digest(self):
+        self.assertEqual(hashlib.sha1(b"E: div0 (line=1)").hexdigest(), file_digest(self.files[0]))
+        self.assertNotEqual(file_digest(self.files[0]), file_digest(self.files[1]))
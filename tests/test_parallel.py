@@ -0,0 +1,77 @@
+import io
+import os
+from unittest import mock
+
+from ..xmltree2xml import api
+from ..xmltree2xml import parallel
+from ..xmltree2xml.main import main, stream_xml
+from ..xmltree2xml.parallel import split_children
+from ..xmltree2xml.resources import ResourceTable
+from ..xmltree2xml.stats import FileStats
+from .helpers import FilesTestCase
+from .test_convert import RESOURCES
+from .test_stream import VALUE
+
+WIDE = "E: list (line=1)\n  A: name=\"list\" (Raw: \"list\")\n" + "".join(
+    f"    E: item (line={i + 2})\n      A: icon=@0x7f08013f\n      A: value={i}\n        E: text (line={i + 2})\n            T: 'item {i}'\n"
+    for i in range(40)
+)
+
+
+def convert(value, jobs, resources=None, stats=None):
+    buf = io.StringIO()
+    stream_xml(value, buf, resources, stats=stats, jobs=jobs)
+    return buf.getvalue()
+
+
+@mock.patch.object(parallel, "PARALLEL_MIN_SIZE", 0)
+class TestParallel(FilesTestCase):
+
+    def test_split(self):
+        header, chunks, indent = split_children(VALUE)
+        self.assertEqual(VALUE[:VALUE.index("      E: pbundle_as_map")], header)
+        self.assertEqual([4, 9, 16], [line for line, _ in chunks])
+        self.assertEqual(6, indent)
+        self.assertEqual([4], [line for line, _ in split_children("E: a1 (line=1)\n\n    E: b1 (line=2)", 2)[1]])
+        # nothing to split, or a line out of the children
+        self.assertIsNone(split_children("E: a1 (line=1)\n  A: b=1"))
+        self.assertIsNone(split_children("E: a1 (line=1)\n    E: b1 (line=2)\n  A: b=1"))
+
+    def test_same_as_serial(self):
+        resources = ResourceTable.parse(RESOURCES)
+        for value in (VALUE, WIDE):
+            serial, parallel = FileStats("serial"), FileStats("parallel")
+            resources.counters = serial.lookups
+            expected = convert(value, 1, resources, serial)
+            resources.counters = parallel.lookups
+            self.assertEqual(expected, convert(value, 3, resources, parallel))
+            self.assertEqual(serial.records, parallel.records)
+
+    def test_error(self):
+        # out of the children (converted in one piece) and in a child (converted by a worker)
+        for value in (WIDE.replace("    E: item (line=30)", "   E: item (line=30)"), WIDE.replace("'item 33'", "'item 33'\n  A: late=1"), WIDE.replace("      A: value=33", "        A: value=33")):
+            with self.assertRaises(ValueError) as serial:
+                convert(value, 1)
+            with self.assertRaises(ValueError) as parallel:
+                convert(value, 3)
+            self.assertEqual(str(serial.exception), str(parallel.exception))
+        self.assertIn(f"in line {value.splitlines().index('        A: value=33') + 1}", str(parallel.exception))
+
+    def test_errors_loop(self):
+        # the pool is closed after every failing conversion, nothing is left running
+        value = WIDE.replace("      A: value=33", "        A: value=33")
+        for _ in range(50):
+            with self.assertRaises(ValueError):
+                convert(value, 4)
+
+    def test_api(self):
+        self.assertEqual(api.convert(WIDE, ResourceTable.parse(RESOURCES)), api.convert(WIDE, ResourceTable.parse(RESOURCES), jobs=2))
+
+    def test_cli(self):
+        filename = self.write_input("wide", WIDE)
+        serial, parallel = os.path.join(self.tmp.name, "serial"), os.path.join(self.tmp.name, "parallel")
+        with mock.patch("sys.stdout", io.StringIO()):
+            main(["-o", serial, filename])
+            main(["-j", "2", "-o", parallel, filename])
+        self.assertEqual(["wide.xml"], list(self.read_outputs(serial)))
+        self.assertEqual(self.read_outputs(serial), self.read_outputs(parallel))
@@ -9,3 +9,23 @@ class TestParseLine(unittest.TestCase):
         self.assertEqual(len("        "), result[0])
         self.assertEqual("A", result[1])
         self.assertEqual(("http://schemas.android.com/apk/res/android:title(0x010101e1)", "\"Load current\"", "\"Load current\""), result[2])
+
+    def test_parse_line_attribute(self):
+        self.assertEqual((2, "A", ("value", "20601", None)), parse_line("  A: value=20601"))
+        self.assertEqual((2, "A", ("value", "20601", None)), parse_line("  A: value=20601   "))
+        self.assertEqual((0, "A", ("key", "a=b", None)), parse_line("A: key=a=b"))
+        self.assertEqual((0, "A", ("=key", "b", None)), parse_line("A: =key=b"))
+        self.assertEqual((0, "A", ("key", "\"a (Raw: b)\"", None)), parse_line("A: key=\"a (Raw: b)\""))
+        self.assertEqual((0, "A", ("key", "\"a\"", "\"a (b)\"")), parse_line("A: key=\"a\" (Raw: \"a (b)\")"))
+        self.assertEqual((0, "A", ("key", " (Raw: )", None)), parse_line("A: key= (Raw: )"))
+
+    def test_parse_line_element(self):
+        self.assertEqual((4, "E", ("string-array", "19")), parse_line("    E: string-array (line=19)"))
+        self.assertEqual((0, "N", ("android", "http://schemas.android.com/apk/res/android", "15")),
+                         parse_line("N: android=http://schemas.android.com/apk/res/android (line=15)"))
+        self.assertEqual((6, "T", ("'8860'",)), parse_line("      T: '8860'"))
+
+    def test_parse_line_error(self):
+        for line in ["A: key=", "A: =", "E: div", "E: d (line=1", "X: div", "T: ", "  ", "E:div (line=1)"]:
+            with self.assertRaisesRegex(ValueError, "match nothing"):
+                parse_line(line)
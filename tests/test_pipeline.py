@@ -0,0 +1,51 @@
+import io
+import os
+from unittest import mock
+
+from ..xmltree2xml.main import ConversionError, main
+from ..xmltree2xml.parallel import convert_files_pipelined
+from ..xmltree2xml.stats import Stats
+from .helpers import FilesTestCase
+
+
+class TestPipeline(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.filenames = [self.write_input(f"file{pos}", f"E: tag{pos} (line=1)\n  A: value={pos}\n") for pos in range(7)]
+
+    def run_main(self, *argv):
+        with mock.patch("sys.stdout", io.StringIO()) as stdout, mock.patch("sys.stderr", io.StringIO()):
+            try:
+                main(list(argv))
+            except (SystemExit, ConversionError) as e:
+                return stdout.getvalue(), e
+        return stdout.getvalue(), None
+
+    def test_same_as_sequential(self):
+        sequential, pipelined = os.path.join(self.tmp.name, "sequential"), os.path.join(self.tmp.name, "pipelined")
+        log, error = self.run_main("-o", sequential, *self.filenames)
+        self.assertIsNone(error)
+        for depth in ("1", "3", "16"):
+            self.assertEqual((log.replace(sequential, pipelined), None), self.run_main("-p", depth, "-o", pipelined, *self.filenames))
+            self.assertEqual(self.read_outputs(sequential), self.read_outputs(pipelined))
+
+    def test_error(self):
+        filenames = self.filenames[:3] + [self.write_input("wrong", " E: wrong (line=1)\n")] + self.filenames[3:]
+        sequential, pipelined = os.path.join(self.tmp.name, "sequential"), os.path.join(self.tmp.name, "pipelined")
+        log, error = self.run_main("-o", sequential, *filenames)
+        pipelined_log, pipelined_error = self.run_main("-p", "2", "-o", pipelined, *filenames)
+        self.assertEqual(log.replace(sequential, pipelined), pipelined_log)
+        self.assertEqual(str(error), str(pipelined_error))
+        self.assertEqual(3, pipelined_log.count("writing"))
+
+    def test_stats(self):
+        output = os.path.join(self.tmp.name, "output")
+        os.mkdir(output)
+        stats = Stats()
+        paths = list(convert_files_pipelined(self.filenames, 2, stats=stats, output_dir=output))
+        self.assertEqual([os.path.join(output, f"file{pos}.xml") for pos in range(7)], paths)
+        self.assertEqual([f"file{pos}.xml" for pos in range(7)], [os.path.basename(file_stats["output"]) for file_stats in stats.files])
+
+    def test_stream(self):
+        self.assertIsInstance(self.run_main("-p", "2", "-s", *self.filenames)[1], SystemExit)
@@ -0,0 +1,86 @@
+import unittest
+
+from ..xmltree2xml.main import XmlTreeElement, parse_xml
+from ..xmltree2xml.query import TreeIndex, parse_path
+
+MANIFEST = """N: android=http://schemas.android.com/apk/res/android (line=2)
+  E: manifest (line=2)
+    A: package="com.example" (Raw: "com.example")
+      E: application (line=5)
+        A: http://schemas.android.com/apk/res/android:icon(0x01010002)=@drawable/icon
+          E: activity (line=6)
+            A: http://schemas.android.com/apk/res/android:name(0x01010003)=".Main" (Raw: ".Main")
+            A: http://schemas.android.com/apk/res/android:exported(0x01010010)=true
+              E: intent-filter (line=7)
+                  E: action (line=8)
+                    A: http://schemas.android.com/apk/res/android:name(0x01010003)="android.intent.action.MAIN" (Raw: "android.intent.action.MAIN")
+          E: activity (line=10)
+            A: http://schemas.android.com/apk/res/android:name(0x01010003)=".Settings" (Raw: ".Settings")
+            A: http://schemas.android.com/apk/res/android:icon(0x01010002)=@drawable/settings
+            A: http://schemas.android.com/apk/res/android:exported(0x01010010)=1
+"""
+
+LAYOUT = """E: LinearLayout (line=1)
+  A: background=@drawable/background
+    E: activity (line=2)
+"""
+
+
+class TestTreeIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TreeIndex()
+        self.manifest = parse_xml(MANIFEST, index=self.index, document="AndroidManifest.xml")
+        self.layout = parse_xml(LAYOUT, index=self.index, document="main.xml")
+
+    def tags(self, elements):
+        return [(element.tag, element.extra["line"]) for element in elements]
+
+    def test_find_all(self):
+        self.assertEqual(8, len(self.index))
+        self.assertEqual([("activity", 6), ("activity", 10), ("activity", 2)], self.tags(self.index.find_all(tag="activity")))
+        self.assertEqual([("activity", 6), ("action", 8), ("activity", 10)], self.tags(self.index.find_all(attr="android:name")))
+        self.assertEqual([("activity", 10)], self.tags(self.index.find_all(attr="android:name", value=".Settings")))
+        self.assertEqual([("activity", 6)], self.tags(self.index.find_all(value=True)))
+        self.assertEqual([("activity", 10)], self.tags(self.index.find_all(value=1)))
+        self.assertEqual([("activity", 2)], self.tags(self.index.find_all(tag="activity", document="main.xml")))
+        self.assertEqual([], self.index.find_all(tag="service"))
+
+    def test_prefix(self):
+        self.assertEqual([("application", 5), ("activity", 10), ("LinearLayout", 1)], self.tags(self.index.find_all(prefix="@drawable/")))
+        self.assertEqual([("activity", 10)], self.tags(self.index.find_all(attr="android:icon", prefix="@drawable/s")))
+        self.assertEqual([], self.index.find_all(prefix="@string/"))
+
+    def test_lines(self):
+        self.assertEqual("action", self.index.at_line(8, "AndroidManifest.xml").tag)
+        self.assertEqual("LinearLayout", self.index.at_line(1, "main.xml").tag)
+        self.assertIsNone(self.index.at_line(3, "main.xml"))
+        self.assertIs(self.manifest, self.index.documents["AndroidManifest.xml"])
+        self.assertEqual("main.xml", self.index.document(self.layout.childrens[0]))
+
+    def test_select(self):
+        self.assertEqual([("activity", 6), ("activity", 10)], self.tags(self.index.select("manifest/application/activity")))
+        self.assertEqual([("activity", 6), ("activity", 10)], self.tags(self.index.select("/manifest//activity")))
+        self.assertEqual([("activity", 2)], self.tags(self.index.select("/LinearLayout/activity")))
+        self.assertEqual([("activity", 6), ("activity", 10), ("activity", 2)], self.tags(self.index.select("//activity")))
+        self.assertEqual([("activity", 6)], self.tags(self.index.select("activity[@android:exported=true]")))
+        self.assertEqual([("action", 8)], self.tags(self.index.select("activity[@android:name='.Main']//action")))
+        self.assertEqual([("intent-filter", 7)], self.tags(self.index.select("*[@android:exported]/*")))
+        self.assertEqual([("activity", 2)], self.tags(self.index.select("activity", document="main.xml")))
+        self.assertEqual([], self.index.select("/application"))
+
+    def test_parse_path(self):
+        self.assertEqual([("/", "a", []), ("//", "b", [("key", "v w"), ("other", None)])], parse_path('/a//b[@key="v w"][@other]'))
+        with self.assertRaises(ValueError):
+            parse_path("a[key]")
+        with self.assertRaises(ValueError):
+            parse_path("")
+
+    def test_add_tree(self):
+        root = XmlTreeElement("root")
+        child = XmlTreeElement("child", attrs={"key": "value"})
+        root.add_child(child)
+        index = TreeIndex()
+        index.add_tree(root)
+        self.assertEqual([child], index.find_all(value="value"))
+        self.assertEqual([child], index.select("/root/child"))
@@ -0,0 +1,158 @@
+import io
+import os
+import unittest
+from unittest import mock
+
+from ..xmltree2xml.main import main, parse_xml, sanitize_android_value
+from ..xmltree2xml.resources import ResourceTable, clear_cache
+from .helpers import FilesTestCase
+
+RESOURCES = """Binary APK
+Package name=com.android.dialer id=7f
+  type drawable id=08 entryCount=1
+    resource 0x7f08013f drawable/ic_shortcut_add_contact
+      () (file) res/drawable/ic_shortcut_add_contact.xml type=XML
+  type string id=15 entryCount=1
+    resource 0x7f150287 string/dialer_shortcut_add_contact_short
+      () "Create contact"
+  type style id=16 entryCount=1
+    resource 0x7f160001 style/DialerTheme
+      () (style) size=3 parent=0x01030005
+  type xml id=18 entryCount=2
+    resource 0x7f180012 xml/file_final
+      () (file) res/file.xml type=XML
+    resource 0x7f180013 xml/other_final
+      (v21) (file) res/other.xml type=XML
+"""
+
+
+class TestResourceTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = ResourceTable.parse(RESOURCES)
+
+    def test_reference(self):
+        self.assertEqual("drawable/ic_shortcut_add_contact", self.table.reference("0x7f08013f"))
+        self.assertEqual("string/dialer_shortcut_add_contact_short", self.table.reference("0x7f150287"))
+        self.assertIsNone(self.table.reference("0x7f000000"))
+
+    def test_style(self):
+        self.assertEqual("style/DialerTheme", self.table.style("0x01030005"))
+        self.assertIsNone(self.table.style("0x0103000"))
+
+    def test_file(self):
+        self.assertEqual("file_final", self.table.file("file.xml"))
+        # only default configuration
+        self.assertIsNone(self.table.file("other.xml"))
+        # only xml type
+        self.assertIsNone(self.table.file("drawable/ic_shortcut_add_contact.xml"))
+
+    def test_parse_lines(self):
+        table = ResourceTable.parse(line + "\n" for line in RESOURCES.split("\n"))
+        self.assertEqual(self.table.ids, table.ids)
+        self.assertEqual(self.table.styles, table.styles)
+        self.assertEqual(self.table.files, table.files)
+
+    def test_sanitize_android_value(self):
+        self.assertEqual("@drawable/ic_shortcut_add_contact", sanitize_android_value("@0x7f08013f", self.table))
+        self.assertEqual("?android:style/DialerTheme", sanitize_android_value("?0x01030005", self.table))
+        self.assertEqual("@0x7f000000", sanitize_android_value("@0x7f000000", self.table))
+        self.assertEqual("@0x7f08013f", sanitize_android_value("@0x7f08013f", None))
+
+    def test_parse_xml(self):
+        value = """N: android=http://schemas.android.com/apk/res/android (line=2)
+  E: shortcuts (line=2)
+      E: shortcut (line=3)
+        A: http://schemas.android.com/apk/res/android:icon(0x01010002)=@0x7f08013f
+        A: http://schemas.android.com/apk/res/android:shortcutShortLabel(0x0101048c)=@0x7f150287"""
+        expected = """<shortcuts xmlns:android="http://schemas.android.com/apk/res/android">
+    <shortcut android:icon="@drawable/ic_shortcut_add_contact" android:shortcutShortLabel="@string/dialer_shortcut_add_contact_short" />
+</shortcuts>"""
+        self.assertEqual(expected, parse_xml(value, self.table).to_str())
+
+
+class TestResourceCache(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.path = self.write_input("resources.txt", RESOURCES)
+
+    def test_load_create_cache(self):
+        table = ResourceTable.load(self.path, self.cache_dir)
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+        cached = ResourceTable.load(self.path, self.cache_dir)
+        self.assertEqual(table.ids, cached.ids)
+        self.assertEqual(table.styles, cached.styles)
+        self.assertEqual(table.files, cached.files)
+
+    def test_load_without_cache(self):
+        ResourceTable.load(self.path)
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_cache_invalidate(self):
+        ResourceTable.load(self.path, self.cache_dir)
+        with open(self.path, "a") as f:
+            f.write("    resource 0x7f190000 xml/new_file\n")
+        table = ResourceTable.load(self.path, self.cache_dir)
+        self.assertEqual("xml/new_file", table.reference("0x7f190000"))
+
+    def test_corrupted_cache(self):
+        ResourceTable.load(self.path, self.cache_dir)
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), "wb") as f:
+                f.write(b"garbage")
+        table = ResourceTable.load(self.path, self.cache_dir)
+        self.assertEqual("file_final", table.file("file.xml"))
+
+    def test_clear_cache(self):
+        ResourceTable.load(self.path, self.cache_dir)
+        self.assertEqual(1, clear_cache(self.cache_dir))
+        self.assertEqual([], os.listdir(self.cache_dir))
+        self.assertEqual(0, clear_cache(os.path.join(self.tmp.name, "nothing")))
+
+
+FRAMEWORK = """Package name=android id=01
+  type style id=03 entryCount=1
+    resource 0x01030005 style/Theme
+  type drawable id=08 entryCount=1
+    resource 0x01080000 drawable/ic_menu
+"""
+
+SPLIT = """Package name=com.android.dialer id=7f
+  type drawable id=08 entryCount=1
+    resource 0x7f08013f drawable/ic_split
+"""
+
+
+class TestLayers(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.paths = [self.write_input(name, value) for name, value in (("framework.txt", FRAMEWORK), ("app.txt", RESOURCES), ("split.txt", SPLIT))]
+
+    def test_merge(self):
+        table = ResourceTable.merge([ResourceTable.parse(value) for value in (FRAMEWORK, RESOURCES, SPLIT)])
+        self.assertEqual("drawable/ic_menu", table.reference("0x01080000"))
+        self.assertEqual("string/dialer_shortcut_add_contact_short", table.reference("0x7f150287"))
+        # the last layer win
+        self.assertEqual("drawable/ic_split", table.reference("0x7f08013f"))
+        self.assertEqual("style/DialerTheme", table.style("0x01030005"))
+
+    def test_load_layers(self):
+        loaded = {}
+        first = ResourceTable.load_layers(self.paths[:2], loaded=loaded)
+        second = ResourceTable.load_layers([self.paths[0], self.paths[2]], loaded=loaded)
+        # the framework is loaded once
+        self.assertEqual(3, len(loaded))
+        self.assertEqual("drawable/ic_shortcut_add_contact", first.reference("0x7f08013f"))
+        self.assertEqual("drawable/ic_split", second.reference("0x7f08013f"))
+        self.assertIsNone(ResourceTable.load_layers([]))
+
+    def test_cli(self):
+        filename = self.write_input("dump", "E: div (line=1)\n  A: icon=@0x7f08013f\n  A: menu=@0x01080000\n")
+        output = os.path.join(self.tmp.name, "output")
+        with mock.patch("sys.stdout", io.StringIO()):
+            main(["-r", self.paths[0], "-r", self.paths[1], "--no-cache", "-n", "-o", output, filename])
+        self.assertEqual('<div icon="@drawable/ic_shortcut_add_contact" menu="@drawable/ic_menu" />', self.read(os.path.join(output, "dump.xml")))
@@ -0,0 +1,113 @@
+import io
+import json
+import os
+from unittest import mock
+
+from ..xmltree2xml.api import convert
+from ..xmltree2xml.main import END, START, TEXT, iter_events, main, parse_xml, select_events
+from ..xmltree2xml.query import Selector, TreeIndex
+from ..xmltree2xml.stats import FileStats
+from .helpers import FilesTestCase
+from .test_stream import VALUE
+
+PATHS = [
+    "/list",
+    "/list/pbundle_as_map",
+    "pbundle_as_map/string",
+    "//item[@value=TEST]",
+    "/list/*/*[@name]",
+    "//string-array//item",
+    "/list//int[@value=5499]",
+    "/list/pbundle_as_map/string[@name=feature_flag_name]",
+    "/other",
+    "int[@value=1]",
+]
+
+
+def roots(events):
+    """ (tag, line) of the first level elements """
+    depth = 0
+    result = []
+    for event in events:
+        if event[0] == START:
+            if depth == 0:
+                result.append((event[1], event[5].get("line")))
+            depth += 1
+        elif event[0] == END:
+            depth -= 1
+    return result
+
+
+class TestSelect(FilesTestCase):
+
+    def test_same_as_index(self):
+        index = TreeIndex()
+        parse_xml(VALUE, index=index)
+        for path in PATHS:
+            selected = index.select(path)
+            # nested matches are written in the subtree of the outer one
+            outer = [(element.tag, element.extra["line"]) for element in selected if not any(_is_ancestor(other, element) for other in selected)]
+            self.assertEqual(outer, roots(iter_events(VALUE, select=Selector(path))), path)
+
+    def test_same_as_filter(self):
+        for path in PATHS:
+            events = list(iter_events(VALUE, select=Selector(path)))
+            self.assertEqual(list(select_events(iter_events(VALUE), Selector(path))), events, path)
+
+    def test_subtree(self):
+        events = list(iter_events(VALUE, select=Selector("pbundle_as_map/string")))
+        self.assertEqual([START, TEXT, END], [event[0] for event in events])
+        self.assertEqual("'vvm_carrier_flag_el_telecom'", events[1][1])
+        # the namespaces of the root are kept
+        self.assertEqual({"xmlns:android": "http://schemas.android.com/apk/res/android"}, events[0][4])
+
+    def test_skip(self):
+        stats, selected = FileStats("all"), FileStats("selected")
+        list(iter_events(VALUE, stats=stats))
+        list(iter_events(VALUE, stats=selected, select=Selector("/list/pbundle_as_map/string-array")))
+        # the attributes of the other elements are not read
+        self.assertLess(selected.records["A"], stats.records["A"])
+
+    def test_root(self):
+        xml = convert(VALUE, no_header=True, select=Selector("//item", "items"))
+        self.assertEqual('<items>\n    <item xmlns:android="http://schemas.android.com/apk/res/android" value="TEST" />\n</items>', xml)
+        self.assertEqual("<items />", convert(VALUE, no_header=True, select=Selector("/other", "items")))
+        with self.assertRaises(ValueError):
+            convert(VALUE, select="/other")
+        with self.assertRaises(ValueError):
+            Selector("list[@name")
+
+    def test_fragments(self):
+        xml = convert(VALUE, no_header=True, select="/list/pbundle_as_map")
+        self.assertEqual(3, xml.count("<pbundle_as_map "))
+        self.assertTrue(xml.startswith("<pbundle_as_map "))
+
+    def test_json(self):
+        # a json file with many matches and no root is an array of them
+        value = json.loads(convert(VALUE, fmt="json", select="/list/pbundle_as_map"))
+        self.assertEqual(["pbundle_as_map"] * 3, [element["tag"] for element in value])
+        self.assertEqual(["int"], [element["tag"] for element in json.loads(convert(VALUE, fmt="json", select="//int"))])
+        self.assertEqual("items", json.loads(convert(VALUE, fmt="json", select=Selector("/list/pbundle_as_map", "items")))["tag"])
+
+    def test_cli(self):
+        filename = self.write_input("dump", VALUE)
+        with mock.patch("sys.stdout", io.StringIO()) as stdout:
+            main(["-n", "--select", "//int", "--select-root", "values", "-o", "-", filename])
+        self.assertEqual(
+            '<values>\n    <int xmlns:android="http://schemas.android.com/apk/res/android" name="vvm_port_number_int" value="5499" />\n</values>\n',
+            stdout.getvalue(),
+        )
+        with mock.patch("sys.stdout", io.StringIO()) as stdout:
+            main(["--format", "json", "--select", "/list/pbundle_as_map", "-o", "-", filename])
+        self.assertEqual(3, len(json.loads(stdout.getvalue())))
+        with self.assertRaises(SystemExit):
+            main(["--select", "a[", "-o", os.path.join(self.tmp.name, "output"), filename])
+
+
+def _is_ancestor(ancestor, element):
+    parent = element.parent
+    while parent is not None:
+        if parent is ancestor:
+            return True
+        parent = parent.parent
+    return False
@@ -0,0 +1,123 @@
+import io
+import os
+import socket
+import threading
+from contextlib import redirect_stdout
+
+from ..xmltree2xml.main import XML_HEADER, main
+from ..xmltree2xml.resources import ResourceTable
+from ..xmltree2xml.server import Client, ResourceCache, make_server, table_size
+from .helpers import FilesTestCase
+
+RESOURCES = """Package name=com.android.dialer id=7f
+  type drawable id=08 entryCount=1
+    resource 0x7f08013f drawable/ic_shortcut_add_contact
+"""
+
+VALUE = "E: div (line=1)\n  A: icon=@0x7f08013f"
+
+
+class TestServer(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.resources = self.write_input("resources.txt", RESOURCES)
+
+    def start(self, **options):
+        server = make_server(**options)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        self.addCleanup(stop)
+        return server
+
+    def test_unix_socket(self):
+        path = os.path.join(self.tmp.name, "server.sock")
+        self.start(socket_path=path)
+        with Client(path) as client:
+            self.assertEqual(XML_HEADER + '<div icon="@drawable/ic_shortcut_add_contact" />', client.convert(VALUE, self.resources))
+            self.assertEqual('<div icon="@0x7f08013f" />', client.convert(VALUE, no_header=True))
+            with self.assertRaises(ValueError):
+                client.convert("E: div (line=1)\n  X: nothing")
+            # the connection is still usable after an error
+            self.assertEqual('<div icon="@0x7f08013f" />', client.convert(VALUE, no_header=True))
+
+    def test_unix_socket_in_use(self):
+        path = os.path.join(self.tmp.name, "server.sock")
+        self.start(socket_path=path)
+        # a live server keep its socket
+        with self.assertRaises(FileExistsError):
+            make_server(socket_path=path)
+        with Client(path) as client:
+            self.assertEqual('<div icon="@0x7f08013f" />', client.convert(VALUE, no_header=True))
+
+        # a regular file is never removed
+        with self.assertRaises(SystemExit):
+            main(["serve", "--socket", self.resources])
+        with open(self.resources) as f:
+            self.assertEqual(RESOURCES, f.read())
+
+    def test_unix_socket_stale(self):
+        path = os.path.join(self.tmp.name, "server.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(path)
+        self.start(socket_path=path)
+        with Client(path) as client:
+            self.assertEqual('<div icon="@0x7f08013f" />', client.convert(VALUE, no_header=True))
+
+    def test_tcp_concurrent(self):
+        server = self.start(port=0)
+        port = server.server_address[1]
+        results = []
+
+        def convert():
+            with Client(port=port) as client:
+                results.append(client.convert(VALUE, self.resources, no_header=True))
+        threads = [threading.Thread(target=convert) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(['<div icon="@drawable/ic_shortcut_add_contact" />'] * 8, results)
+        # loaded once, then reused
+        self.assertEqual(1, len(server.resources.tables))
+
+    def test_resource_cache_lru(self):
+        paths = [self.write_input(f"resources{i}.txt", RESOURCES) for i in range(3)]
+        size = table_size(ResourceTable.parse(RESOURCES))
+        cache = ResourceCache(max_bytes=size * 2)
+
+        first = cache.get(paths[0])
+        self.assertIs(first, cache.get(paths[0]))
+        cache.get(paths[1])
+        cache.get(paths[0])
+        cache.get(paths[2])
+        # paths[1] is the least recently used
+        self.assertEqual(2, len(cache.tables))
+        self.assertEqual(size * 2, cache.size)
+        self.assertIs(first, cache.get(paths[0]))
+
+    def test_resource_cache_layers(self):
+        paths = [self.write_input(f"resources{i}.txt", RESOURCES) for i in range(3)]
+        cache = ResourceCache()
+        first = cache.get_layers(paths[:2])
+        self.assertIs(first, cache.get_layers(paths[:2]))
+        cache.get_layers([paths[0], paths[2]])
+        # every layer once, and the two merged tables
+        self.assertEqual(5, len(cache.tables))
+        self.assertIs(cache.get(paths[0]), cache.get_layers(paths[:1]))
+
+    def test_client_main(self):
+        path = os.path.join(self.tmp.name, "server.sock")
+        self.start(socket_path=path)
+        filename = self.write_input("file", VALUE)
+        output_dir = os.path.join(self.tmp.name, "output")
+        with redirect_stdout(io.StringIO()):
+            main(["client", "--socket", path, "-r", self.resources, "-o", output_dir, filename])
+        with open(os.path.join(output_dir, "file.xml")) as f:
+            self.assertEqual(XML_HEADER + '<div icon="@drawable/ic_shortcut_add_contact" />', f.read())
@@ -0,0 +1,91 @@
+import io
+import json
+import os
+from unittest import mock
+
+from ..xmltree2xml.main import clear_caches, convert_file, main, parse_xml
+from ..xmltree2xml.resources import ResourceTable
+from ..xmltree2xml.stats import FileStats, Stats
+from .helpers import FilesTestCase
+
+VALUE = """N: android=http://schemas.android.com/apk/res/android (line=1)
+  E: LinearLayout (line=2)
+      E: TextView (line=3)
+        A: http://schemas.android.com/apk/res/android:id(0x010100d0)=@0x7f0a0001
+        A: http://schemas.android.com/apk/res/android:text(0x0101014f)=@0x7f0a0002
+          T: 'text'
+"""
+
+RESOURCES = """    resource 0x7f0a0001 id/title
+      () (id)
+"""
+
+
+class TestStats(FilesTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.filename = self.write_input("file", VALUE)
+
+    def test_parse_records(self):
+        stats = FileStats("file")
+        parse_xml(VALUE, stats=stats)
+        self.assertEqual({"E": 2, "A": 2, "T": 1, "N": 1}, stats.records)
+
+    def test_convert_file(self):
+        clear_caches()
+        resources = ResourceTable.parse(RESOURCES)
+        for stream in (False, True):
+            stats = FileStats(self.filename)
+            path = convert_file(self.filename, self.tmp.name, resources, stream=stream, stats=stats)
+
+            # cached references are lookups too
+            self.assertEqual({"hit": 1, "miss": 1}, stats.lookups)
+            if stream:
+                self.assertEqual({"hits": 2, "misses": 0}, stats.caches["references"])
+            else:
+                self.assertEqual({"hits": 0, "misses": 2}, stats.caches["references"])
+            self.assertEqual(os.path.getsize(path), stats.output_bytes)
+            self.assertEqual(path, stats.output)
+            self.assertGreater(stats.phases["stream" if stream else "parse"], 0)
+            self.assertIsNone(resources.counters)
+
+    def test_total(self):
+        stats = Stats()
+        for i in range(2):
+            file_stats = FileStats(f"file{i}")
+            parse_xml(VALUE, stats=file_stats)
+            file_stats.output_bytes = 10
+            stats.add(file_stats)
+
+        total = stats.total()
+        self.assertEqual(2, total["files"])
+        self.assertEqual({"E": 4, "A": 4, "T": 2, "N": 2}, total["records"])
+        self.assertEqual(20, total["output_bytes"])
+
+    def test_main_stats(self):
+        stats_path = os.path.join(self.tmp.name, "stats.json")
+        profile_path = os.path.join(self.tmp.name, "out.pstats")
+        with mock.patch("sys.stdout", io.StringIO()):
+            main(["-o", self.tmp.name, "--stats-json", stats_path, "--profile", profile_path, "--trace-memory", self.filename])
+
+        with open(stats_path) as f:
+            data = json.load(f)
+        self.assertEqual(1, data["total"]["files"])
+        self.assertEqual(self.filename, data["files"][0]["file"])
+        self.assertGreater(data["total"]["peak_memory"], 0)
+        self.assertTrue(os.path.exists(profile_path))
+
+    def test_main_stats_report(self):
+        with mock.patch("sys.stdout", io.StringIO()), mock.patch("sys.stderr", io.StringIO()) as stderr:
+            main(["-o", self.tmp.name, "--stats", "-j", "2", self.filename, self.filename])
+        self.assertIn("files: 2\n", stderr.getvalue())
+        self.assertIn("lines: E 4, A 4, T 2, N 2\n", stderr.getvalue())
+
+    def test_main_stats_before_file(self):
+        # --stats take no value, the next word is an input
+        with mock.patch("sys.stdout", io.StringIO()), mock.patch("sys.stderr", io.StringIO()) as stderr:
+            main(["-o", self.tmp.name, "--stats", self.filename])
+        self.assertIn("files: 1\n", stderr.getvalue())
+        self.assertEqual(VALUE, self.read(self.filename))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "file.xml")))
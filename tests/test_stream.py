@@ -0,0 +1,57 @@
+import io
+import unittest
+
+from ..xmltree2xml.main import END, START, TEXT, XML_HEADER, iter_events, parse_xml, stream_xml
+
+VALUE = """N: android=http://schemas.android.com/apk/res/android (line=1)
+  E: list (line=16)
+    A: name="carrier_config_list" (Raw: "carrier_config_list")
+      E: pbundle_as_map (line=17)
+          E: string-array (line=19)
+            A: name="mccmnc" (Raw: "mccmnc")
+              E: item (line=20)
+                A: value="TEST" (Raw: "TEST")
+      E: pbundle_as_map (line=24)
+          E: string (line=33)
+            A: name="feature_flag_name" (Raw: "feature_flag_name")
+              T: 'vvm_carrier_flag_el_telecom'
+          E: int (line=34)
+            A: name="vvm_port_number_int" (Raw: "vvm_port_number_int")
+            A: value=5499
+      E: pbundle_as_map (line=41)
+"""
+
+
+class TestStream(unittest.TestCase):
+
+    def test_events(self):
+        events = list(iter_events("E: div (line=1)\n  A: value=true\n    E: span (line=2)\n        T: 'text'"))
+        self.assertEqual([
+            (START, "div", {"value": True}, {}, {}, {"line": 1}),
+            (START, "span", {}, {}, {}, {"line": 2}),
+            (TEXT, "'text'"),
+            (END, "span"),
+            (END, "div"),
+        ], events)
+
+    def test_same_as_tree(self):
+        buf = io.StringIO()
+        self.assertTrue(stream_xml(VALUE, buf))
+        self.assertEqual(XML_HEADER + parse_xml(VALUE).to_str(), buf.getvalue())
+
+    def test_lines(self):
+        buf = io.StringIO()
+        self.assertTrue(stream_xml(io.StringIO(VALUE), buf, no_header=True))
+        self.assertEqual(parse_xml(VALUE).to_str(), buf.getvalue())
+
+    def test_empty(self):
+        buf = io.StringIO()
+        self.assertFalse(stream_xml("\n\n", buf))
+        self.assertEqual("", buf.getvalue())
+
+    def test_errors(self):
+        with self.assertRaisesRegex(ValueError, "multiple root element in line 2"):
+            stream_xml("E: div (line=1)\nE: div (line=2)", io.StringIO())
+
+        with self.assertRaisesRegex(ValueError, "can't add children text is set"):
+            stream_xml("E: div (line=1)\n    T: 'text'\n    E: div (line=2)", io.StringIO())
@@ -1,4 +1,6 @@
-from ..xmltree2xml.main import sanitize_value, generate_path
+from ..xmltree2xml.main import (cache_info, clear_caches, configure_caches, generate_path, sanitize_android_key, sanitize_android_value,
+                                 sanitize_value)
+from ..xmltree2xml.resources import ResourceTable
 import unittest
 
 
@@ -41,5 +43,45 @@ class TestSanitizeFunction(unittest.TestCase):
     resource 0x7f180512 xml/other_file
       () (file) res/other_file.xml type=XML
         """
+        resources = ResourceTable.parse(resources)
         self.assertEqual("dir/file_final.xml", generate_path("dir/", "file.xml", resources))
         self.assertEqual("dir/nofile.xml", generate_path("dir/", "nofile.xml", resources))
+
+
+class TestMemoCaches(unittest.TestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def tearDown(self):
+        configure_caches()
+
+    def test_interned_keys(self):
+        key = "http://schemas.android.com/apk/res/android:title(0x010101e1)"
+        first = sanitize_android_key(key, None)
+        second = sanitize_android_key("".join(key), None)
+        self.assertEqual("android:title", first)
+        self.assertIs(first, second)
+        self.assertEqual({"hits": 1, "misses": 1}, cache_info()["keys"])
+
+    def test_references_reset_with_resources(self):
+        first = ResourceTable.parse("    resource 0x7f010001 id/first\n")
+        second = ResourceTable.parse("    resource 0x7f010001 id/second\n")
+        self.assertEqual("@id/first", sanitize_android_value("@0x7f010001", first))
+        self.assertEqual("@id/first", sanitize_android_value("@0x7f010001", first))
+        self.assertEqual({"hits": 1, "misses": 1}, cache_info()["references"])
+        # a new table drop the references of the previous one
+        self.assertEqual("@id/second", sanitize_android_value("@0x7f010001", second))
+        self.assertEqual({"hits": 0, "misses": 1}, cache_info()["references"])
+
+    def test_quoted_reference(self):
+        resources = ResourceTable.parse("    resource 0x7f010001 id/first\n")
+        self.assertEqual("@id/first", sanitize_android_value('"@0x7f010001"', resources))
+        self.assertEqual('"@0x7f010001', sanitize_android_value('"@0x7f010001', resources))
+        self.assertEqual("text", sanitize_android_value('"text"', resources))
+
+    def test_disabled(self):
+        configure_caches(0)
+        self.assertEqual(554, sanitize_value("554"))
+        self.assertEqual(554, sanitize_value("554"))
+        self.assertEqual({"hits": 0, "misses": 2}, cache_info()["values"])
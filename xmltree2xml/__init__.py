@@ -0,0 +1,5 @@
+from .api import Result, aconvert, aconvert_many, convert, convert_file, convert_many, load_resources
+from .diff import Change, diff_documents, diff_trees
+from .main import ConversionError
+from .query import TreeIndex
+from .resources import ResourceTable
@@ -0,0 +1,181 @@
+import asyncio
+import collections
+import functools
+import io
+import os
+import threading
+
+from . import axml
+from .main import STDIO, ConversionError, convert_file as _convert_file, input_format, open_input, stream_output, stream_xml, write_file
+from .parallel import convert_files_parallel
+from .query import Selector
+from .resources import ResourceTable, cache_key, default_cache_dir
+
+"""
+    library entry points, nothing is printed and `sys.exit` is never called
+
+        from xmltree2xml import convert, convert_many
+
+        xml = convert(dump, resources=ResourceTable.from_file("resources.txt"))
+        for result in convert_many(["a.txt", "b.txt"], output_dir="out"):
+            ...
+"""
+
+# result of a conversion by `convert_many`, `output` is the path written (or the xml when there is no output_dir)
+Result = collections.namedtuple("Result", ("filename", "output", "error"))
+
+
+# tables kept by `load_resources` (layers and merged tables), the least recently used are dropped
+LAYERS_SIZE = 16
+
+# tables loaded from a list of paths by `load_resources`, by `cache_key` (and tuple of them for the merged tables),
+# the most recently used at the end
+_layers = collections.OrderedDict()
+_layers_lock = threading.Lock()
+
+
+def load_resources(resources):
+    """
+        `resources` as a `ResourceTable`, a path is loaded (with the resources cache),
+        a list of paths or tables is merged, a table override the ones before it (see `ResourceTable.merge`),
+        the layers and the merged table of a list of paths are kept for the next calls (the last `LAYERS_SIZE` used)
+    """
+    if resources is None or isinstance(resources, ResourceTable):
+        return resources
+    if not isinstance(resources, (list, tuple)):
+        return ResourceTable.load(os.fspath(resources), default_cache_dir())
+
+    if resources and not any(isinstance(layer, ResourceTable) for layer in resources):
+        paths = [os.fspath(layer) for layer in resources]
+        key = tuple(cache_key(path) for path in paths)
+        with _layers_lock:
+            # a layer can be dropped before its merged table, the table is merged again
+            if key not in _layers or any(used not in _layers for used in key):
+                _layers[key] = ResourceTable.load_layers(paths, default_cache_dir(), _layers)
+            for used in key + (key,):
+                _layers.move_to_end(used)
+            table = _layers[key]
+            while len(_layers) > LAYERS_SIZE:
+                _layers.popitem(last=False)
+        return table
+
+    tables = [layer if isinstance(layer, ResourceTable) else load_resources([layer]) for layer in resources]
+    return ResourceTable.merge(tables) if tables else None
+
+
+def selector(select, root=None):
+    """ `select` as a `Selector`, a path is compiled (with the synthetic `root` tag) """
+    if select is None or isinstance(select, Selector):
+        return select
+    return Selector(select, root)
+
+
+def convert(value, resources=None, no_header=False, indentation=4, encoding=None, fmt="xml", select=None, jobs=1):
+    """
+        convert xmltree `value` (a string, bytes or an iterable of lines) or a compiled binary xml (bytes) to xml,
+        or to one of the other output formats `fmt` (see `FORMATS`),
+        `select` (a path or a `Selector`) keep only the matching elements,
+        `jobs` > 1 convert the children of the root of a large document with a pool of processes (see `iter_xml_parallel`),
+        return bytes encoded with `encoding` when it is set, else a string
+    """
+    if isinstance(value, (bytes, bytearray)) and not axml.is_axml(value):
+        value = value.decode("utf-8")
+
+    buf = io.StringIO()
+    if fmt == "xml":
+        empty = not stream_xml(value, buf, load_resources(resources), no_header, indentation, select=selector(select), jobs=jobs)
+    else:
+        empty = not stream_output(value, buf, fmt, load_resources(resources), select=selector(select))
+    if empty:
+        raise ValueError("file is empty...")
+    return buf.getvalue().encode(encoding) if encoding else buf.getvalue()
+
+
+def convert_file(filename, out_path, resources=None, no_header=False, stream=False):
+    """
+        convert the xmltree file `filename` into `out_path` and return it,
+        raise `ConversionError` with the filename and the original error as `__cause__`
+    """
+    binary = input_format(filename) == "axml"
+    with open_input(filename, binary) as f:
+        try:
+            write_file(os.fspath(out_path), f if stream and not binary else f.read(), load_resources(resources), no_header, stream)
+        except Exception as e:
+            raise ConversionError(filename, e) from e
+    return out_path
+
+
+def _convert_one(filename, output_dir, resources, options):
+    """ convert `filename`, never raise (a wrong file does not stop the others) """
+    try:
+        if output_dir is None:
+            binary = input_format(filename) == "axml"
+            with open_input(filename, binary) as f:
+                try:
+                    output = convert(f.read() if binary else f, resources, options.get("no_header", False), fmt=options.get("fmt", "xml"), select=options.get("select"))
+                except Exception as e:
+                    raise ConversionError(filename, e) from e
+        else:
+            output = _convert_file(filename, output_dir, resources=resources, **options)
+    except Exception as e:
+        return Result(filename, None, str(e))
+    return Result(filename, output, None)
+
+
+def convert_many(filenames, output_dir=None, resources=None, jobs=1, **options):
+    """
+        convert `filenames`, yield a `Result` by file in the same order,
+        without `output_dir` the xml is returned in `Result.output` instead of written,
+        `jobs` > 1 convert with a pool of processes (only with an `output_dir`),
+        `options` are the ones of `main.convert_file` (no_header, rename_file, stream, fmt, select)
+    """
+    resources = load_resources(resources)
+    if "select" in options:
+        options["select"] = selector(options["select"])
+    filenames = list(filenames)
+    if jobs > 1 and output_dir is not None and output_dir != STDIO:
+        os.makedirs(output_dir, exist_ok=True)
+        for filename, (path, error) in zip(filenames, convert_files_parallel(filenames, jobs, resources, output_dir=output_dir, **options)):
+            yield Result(filename, path, error)
+        return
+
+    if output_dir is not None and output_dir != STDIO:
+        os.makedirs(output_dir, exist_ok=True)
+    for filename in filenames:
+        yield _convert_one(filename, output_dir, resources, options)
+
+
+async def aconvert(value, resources=None, no_header=False, indentation=4, encoding=None, executor=None):
+    """ `convert` run in `executor` (the default one of the loop when None) """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(convert, value, load_resources(resources), no_header, indentation, encoding))
+
+
+async def aconvert_many(filenames, output_dir=None, resources=None, concurrency=4, executor=None, **options):
+    """
+        `convert_many` for asyncio, files are converted in `executor` (the default one of the loop when None),
+        at most `concurrency` at a time, results are yielded in the same order than `filenames`
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    loop = asyncio.get_running_loop()
+    resources = load_resources(resources)
+    if "select" in options:
+        options["select"] = selector(options["select"])
+    if output_dir is not None and output_dir != STDIO:
+        os.makedirs(output_dir, exist_ok=True)
+
+    pending = collections.deque()
+    try:
+        for filename in filenames:
+            if len(pending) >= concurrency:
+                yield await pending.popleft()
+            pending.append(loop.run_in_executor(executor, _convert_one, filename, output_dir, resources, options))
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # the consumer stopped early, do not leave conversions behind
+        for future in pending:
+            future.cancel()
+
@@ -0,0 +1,110 @@
+import bz2
+import gzip
+import io
+import lzma
+import sys
+import tarfile
+import time
+import zipfile
+
+"""
+    archive receiving every converted documents, written sequentially in one file (or the standard output)
+    instead of a file by document in the output directory
+"""
+
+# suffix -> format
+ARCHIVE_FORMATS = {
+    ".zip": "zip",
+    ".tar": "tar",
+    ".tar.gz": "tar.gz",
+    ".tgz": "tar.gz",
+    ".tar.bz2": "tar.bz2",
+    ".tar.xz": "tar.xz",
+}
+# format of an archive written to the standard output
+DEFAULT_FORMAT = "tar"
+BUFFER_SIZE = 1 << 20
+
+
+def archive_format(path):
+    """ format of the archive `path` from its suffix """
+    if path == "-":
+        return DEFAULT_FORMAT
+    for suffix, fmt in sorted(ARCHIVE_FORMATS.items(), key=lambda item: -len(item[0])):
+        if path.endswith(suffix):
+            return fmt
+    raise ValueError(f"unknown archive format of '{path}', use one of {', '.join(ARCHIVE_FORMATS)}")
+
+
+class OutputArchive:
+    """ zip or tar (optionally compressed) archive, `compression_level` is the level of zlib, bz2 or lzma """
+
+    def __init__(self, path, fmt=None, compression_level=None):
+        self.path = path
+        self.format = fmt or archive_format(path)
+        # number of documents written
+        self.count = 0
+
+        if path == "-":
+            self.fp, self.owned = sys.stdout.buffer, False
+        else:
+            self.fp, self.owned = open(path, "wb", buffering=BUFFER_SIZE), True
+
+        # compressor of a tar
+        self.stream = None
+        if self.format == "zip":
+            compression = zipfile.ZIP_STORED if compression_level == 0 else zipfile.ZIP_DEFLATED
+            self.archive = zipfile.ZipFile(self.fp, "w", compression, compresslevel=compression_level)
+            return
+
+        if self.format == "tar.gz":
+            self.stream = gzip.GzipFile(fileobj=self.fp, mode="wb", compresslevel=9 if compression_level is None else compression_level)
+        elif self.format == "tar.bz2":
+            self.stream = bz2.BZ2File(self.fp, "wb", compresslevel=9 if compression_level is None else compression_level)
+        elif self.format == "tar.xz":
+            self.stream = lzma.LZMAFile(self.fp, "wb", preset=compression_level)
+        elif self.format != "tar":
+            raise ValueError(f"unknown archive format '{self.format}'")
+        self.archive = tarfile.open(fileobj=self.stream or self.fp, mode="w|", bufsize=BUFFER_SIZE)
+
+    def write(self, name, data):
+        """ add the document `name` with the content `data` (bytes), return its size """
+        if self.format == "zip":
+            info = zipfile.ZipInfo(name, time.localtime()[:6])
+            info.compress_type = self.archive.compression
+            info.external_attr = 0o644 << 16
+            self.archive.writestr(info, data, compresslevel=self.archive.compresslevel)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            info.mode = 0o644
+            self.archive.addfile(info, io.BytesIO(data))
+        self.count += 1
+        return len(data)
+
+    def close(self):
+        self.archive.close()
+        if self.stream is not None:
+            self.stream.close()
+        if self.owned:
+            self.fp.close()
+        else:
+            self.fp.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class MemoryArchive:
+    """ documents kept in memory, to send them from a worker process to the archive """
+
+    def __init__(self):
+        self.entries = []
+
+    def write(self, name, data):
+        self.entries.append((name, data))
+        return len(data)
@@ -0,0 +1,148 @@
+import struct
+
+from .axml import CHUNK_HEADER, RES_STRING_POOL_TYPE, TYPE_STRING, U32, StringPool, iter_chunks
+
+"""
+    decoder of `resources.arsc`, the compiled resource table of an apk
+
+        table header (package count)
+        string pool of the values
+        package (id, name, type names and key names string pools)
+            type spec (by type)
+            type (by type and configuration): offsets of the entries, then the entries
+                entry: size, flags, key (index in the key names), then a value or a map (style...)
+
+    only what `ResourceTable` use is decoded, every strings are read lazily from the memory of the file.
+"""
+
+ARSC_MAGIC = b"\x02\x00\x0c\x00"
+
+RES_TABLE_TYPE = 0x0002
+RES_TABLE_PACKAGE_TYPE = 0x0200
+RES_TABLE_TYPE_TYPE = 0x0201
+
+# ResTable_type flags
+FLAG_SPARSE = 0x01
+FLAG_OFFSET16 = 0x02
+# ResTable_entry flags
+FLAG_COMPLEX = 0x0001
+FLAG_COMPACT = 0x0008
+
+NO_ENTRY = 0xFFFFFFFF
+NO_ENTRY16 = 0xFFFF
+
+# id, name (128 char16), typeStrings, lastPublicType, keyStrings, lastPublicKey
+PACKAGE_HEADER = struct.Struct("<I256sIIII")
+# id, flags, reserved, entryCount, entriesStart
+TYPE_HEADER = struct.Struct("<BBHII")
+# size, flags, key
+ENTRY = struct.Struct("<HHI")
+# Res_value: size, res0, dataType, data
+VALUE = struct.Struct("<HBBI")
+
+
+def is_arsc(magic):
+    return magic[:4] == ARSC_MAGIC
+
+
+def iter_entry_offsets(data, offset, header_size, flags, count):
+    """ yield `(index, offset)` of the entries of a type chunk, offsets are relative to entriesStart """
+    start = offset + header_size
+    if flags & FLAG_SPARSE:
+        # (index, offset / 4) only for the defined entries
+        pairs = struct.unpack_from(f"<{count * 2}H", data, start)
+        for pos in range(0, len(pairs), 2):
+            yield pairs[pos], pairs[pos + 1] * 4
+    elif flags & FLAG_OFFSET16:
+        for index, entry in enumerate(struct.unpack_from(f"<{count}H", data, start)):
+            if entry != NO_ENTRY16:
+                yield index, entry * 4
+    else:
+        for index, entry in enumerate(struct.unpack_from(f"<{count}I", data, start)):
+            if entry != NO_ENTRY:
+                yield index, entry
+
+
+def parse(value):
+    """
+        decode the `resources.arsc` `value` (bytes-like), return the `ids`, `styles` and `files` of a `ResourceTable`,
+        except that files are named with their full name ("xml/name")
+    """
+    data = memoryview(value)
+    if len(data) < 12 or not is_arsc(data[:4]):
+        raise ValueError("not a resources.arsc file")
+    _, header_size, size = CHUNK_HEADER.unpack_from(data, 0)
+
+    ids, styles, files = {}, {}, {}
+    # (style id, parent id), named once every entries are known
+    parents = []
+    values = None
+    for chunk_type, offset, _, size in iter_chunks(data, header_size, min(size, len(data))):
+        if chunk_type == RES_STRING_POOL_TYPE:
+            values = StringPool(data, offset)
+        elif chunk_type == RES_TABLE_PACKAGE_TYPE:
+            parse_package(data, offset, size, values, ids, files, parents)
+
+    for res_id, parent in parents:
+        # parents are looked up by their hexa id (see `sanitize_android_value`)
+        styles.setdefault(f"0x{parent:08x}", ids[f"0x{res_id:08x}"])
+    return ids, styles, files
+
+
+def parse_package(data, offset, size, values, ids, files, parents):
+    _, header_size, _ = CHUNK_HEADER.unpack_from(data, offset)
+    package_id, _, type_strings, _, key_strings, _ = PACKAGE_HEADER.unpack_from(data, offset + CHUNK_HEADER.size)
+    type_id_offset = 0
+    if header_size >= CHUNK_HEADER.size + PACKAGE_HEADER.size + 4:
+        # not in old tables
+        type_id_offset = U32.unpack_from(data, offset + CHUNK_HEADER.size + PACKAGE_HEADER.size)[0]
+
+    types = StringPool(data, offset + type_strings)
+    keys = StringPool(data, offset + key_strings)
+
+    # entries with a name, by type id
+    named = {}
+    for chunk_type, chunk, chunk_header_size, _ in iter_chunks(data, offset + header_size, offset + size):
+        if chunk_type != RES_TABLE_TYPE_TYPE:
+            continue
+
+        type_id, flags, _, count, entries_start = TYPE_HEADER.unpack_from(data, chunk + 8)
+        type_name = types[type_id - 1 - type_id_offset]
+        seen = named.setdefault(type_id, set())
+        base = (package_id << 24) | (type_id << 16)
+        entries = chunk + entries_start
+        # like the dump, files and styles parents only come from the default configuration ("()")
+        config = chunk + 8 + TYPE_HEADER.size
+        default = type_name in ("xml", "style") and not any(data[config + 4:config + U32.unpack_from(data, config)[0]])
+
+        for index, entry in iter_entry_offsets(data, chunk, chunk_header_size, flags, count):
+            # the first configuration name the entry, the others have the same key
+            first = index not in seen
+            if not first and not default:
+                continue
+            seen.add(index)
+
+            pos = entries + entry
+            entry_size, entry_flags, key = ENTRY.unpack_from(data, pos)
+            if entry_flags & FLAG_COMPACT:
+                # key in the size field, the type in the high byte of the flags and the data in the key field
+                name = f"{type_name}/{keys[entry_size]}"
+                data_type, value = entry_flags >> 8, key
+            else:
+                name = f"{type_name}/{keys[key]}"
+                data_type, value = None, None
+                if entry_flags & FLAG_COMPLEX:
+                    # ResTable_map_entry: parent and count after the entry
+                    parent = U32.unpack_from(data, pos + ENTRY.size)[0]
+                    if parent and default and type_name == "style":
+                        parents.append((base | index, parent))
+                else:
+                    _, _, data_type, value = VALUE.unpack_from(data, pos + entry_size)
+            if first:
+                ids[f"0x{base | index:08x}"] = name
+
+            if default and type_name == "xml" and data_type == TYPE_STRING and values is not None:
+                path = values[value]
+                if path.startswith("res/") and path.endswith(".xml"):
+                    files.setdefault(path[len("res/"):], name)
+
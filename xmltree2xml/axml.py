@@ -0,0 +1,235 @@
+import struct
+import zipfile
+
+"""
+    decoder of android compiled binary xml (AXML), the format of `res/*.xml` and `AndroidManifest.xml` in an apk
+
+    the file is a tree of chunks, each one start with a header (type, header size, size),
+    a string pool hold every names and strings, the resource map give the attribute id of the first names.
+
+    `iter_records` yield the records printed by `aapt2 dump xmltree`, values are formatted the same way
+
+        ("N", (prefix, uri, line))
+        ("E", (tag, line, [(key, value, raw or None), ...]))
+        ("T", (text,))
+        ("/", ())                   end of the last element
+"""
+
+AXML_MAGIC = b"\x03\x00\x08\x00"
+ZIP_MAGIC = b"PK\x03\x04"
+
+# chunk types
+RES_STRING_POOL_TYPE = 0x0001
+RES_XML_TYPE = 0x0003
+RES_XML_START_NAMESPACE_TYPE = 0x0100
+RES_XML_END_NAMESPACE_TYPE = 0x0101
+RES_XML_START_ELEMENT_TYPE = 0x0102
+RES_XML_END_ELEMENT_TYPE = 0x0103
+RES_XML_CDATA_TYPE = 0x0104
+RES_XML_RESOURCE_MAP_TYPE = 0x0180
+
+# value types (Res_value::dataType)
+TYPE_NULL = 0x00
+TYPE_REFERENCE = 0x01
+TYPE_ATTRIBUTE = 0x02
+TYPE_STRING = 0x03
+TYPE_FLOAT = 0x04
+TYPE_DIMENSION = 0x05
+TYPE_FRACTION = 0x06
+TYPE_DYNAMIC_REFERENCE = 0x07
+TYPE_DYNAMIC_ATTRIBUTE = 0x08
+TYPE_INT_DEC = 0x10
+TYPE_INT_HEX = 0x11
+TYPE_INT_BOOLEAN = 0x12
+TYPE_INT_COLOR_ARGB8 = 0x1c
+TYPE_INT_COLOR_RGB4 = 0x1f
+
+DATA_NULL_EMPTY = 1
+# string index of a missing string
+NO_ENTRY = 0xFFFFFFFF
+UTF8_FLAG = 0x100
+
+CHUNK_HEADER = struct.Struct("<HHI")
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+# ns, name, attributeStart, attributeSize, attributeCount
+ELEMENT_EXT = struct.Struct("<IIHHH")
+# ns, name, rawValue, Res_value (size, res0, dataType, data)
+ATTRIBUTE = struct.Struct("<IIIHBBI")
+
+DIMENSION_UNITS = ("px", "dp", "sp", "pt", "in", "mm")
+FRACTION_UNITS = ("%", "%p")
+RADIX_MULTIPLIERS = (1.0 / (1 << 8), 1.0 / (1 << 15), 1.0 / (1 << 23), 1.0 / (1 << 31))
+
+
+class StringPool:
+    """ strings of a string pool chunk, decoded on access without copying the chunk """
+
+    def __init__(self, data, offset):
+        _, header_size, size = CHUNK_HEADER.unpack_from(data, offset)
+        count, _, flags, strings_start, _ = struct.unpack_from("<5I", data, offset + 8)
+        self.data = data
+        self.offsets = struct.unpack_from(f"<{count}I", data, offset + header_size)
+        self.base = offset + strings_start
+        self.utf8 = bool(flags & UTF8_FLAG)
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        try:
+            return self.cache[index]
+        except KeyError:
+            pass
+        if index >= len(self.offsets):
+            raise ValueError(f"string {index} out of the string pool")
+        value = self.cache[index] = self._decode(self.base + self.offsets[index])
+        return value
+
+    def get(self, index):
+        """ string `index`, None for a missing string """
+        return None if index == NO_ENTRY else self[index]
+
+    def _decode(self, pos):
+        data = self.data
+        if self.utf8:
+            # length in utf-16 then in utf-8, one or two bytes each
+            pos += 2 if data[pos] & 0x80 else 1
+            size = data[pos]
+            if size & 0x80:
+                size = ((size & 0x7f) << 8) | data[pos + 1]
+                pos += 1
+            pos += 1
+            return str(data[pos:pos + size], "utf-8", "replace")
+
+        size = U16.unpack_from(data, pos)[0]
+        pos += 2
+        if size & 0x8000:
+            size = ((size & 0x7fff) << 16) | U16.unpack_from(data, pos)[0]
+            pos += 2
+        return str(data[pos:pos + size * 2], "utf-16-le", "replace")
+
+
+def iter_chunks(data, start, end):
+    """ yield `(type, offset, header_size, size)` of the chunks between `start` and `end` """
+    while start + CHUNK_HEADER.size <= end:
+        chunk_type, header_size, size = CHUNK_HEADER.unpack_from(data, start)
+        if size < CHUNK_HEADER.size or header_size > size or start + size > end:
+            raise ValueError(f"wrong chunk at offset {start}")
+        yield chunk_type, start, header_size, size
+        start += size
+
+
+def complex_to_float(value):
+    """ value of a dimension or a fraction """
+    mantissa = struct.unpack("<i", struct.pack("<I", value & 0xffffff00))[0]
+    return mantissa * RADIX_MULTIPLIERS[(value >> 4) & 0x3]
+
+
+def format_complex(value, units, scale=1):
+    # printed like aapt2, "%f" without the useless zeros
+    number = f"{complex_to_float(value) * scale:f}".rstrip("0").rstrip(".")
+    unit = value & 0xf
+    return number + (units[unit] if unit < len(units) else f"(unit {unit})")
+
+
+def format_value(data_type, data, strings):
+    """ typed value printed like `aapt2 dump xmltree` """
+    if data_type == TYPE_STRING:
+        return f"\"{strings[data]}\""
+    elif data_type in (TYPE_REFERENCE, TYPE_DYNAMIC_REFERENCE):
+        return f"@0x{data:08x}" if data else "@null"
+    elif data_type in (TYPE_ATTRIBUTE, TYPE_DYNAMIC_ATTRIBUTE):
+        return f"?0x{data:08x}"
+    elif data_type == TYPE_NULL:
+        return "@empty" if data == DATA_NULL_EMPTY else "@null"
+    elif data_type == TYPE_INT_DEC:
+        return str(struct.unpack("<i", struct.pack("<I", data))[0])
+    elif data_type == TYPE_INT_HEX:
+        return f"0x{data:08x}"
+    elif data_type == TYPE_INT_BOOLEAN:
+        return "true" if data else "false"
+    elif TYPE_INT_COLOR_ARGB8 <= data_type <= TYPE_INT_COLOR_RGB4:
+        return f"#{data:08x}"
+    elif data_type == TYPE_FLOAT:
+        return f"{struct.unpack('<f', struct.pack('<I', data))[0]:g}"
+    elif data_type == TYPE_DIMENSION:
+        return format_complex(data, DIMENSION_UNITS)
+    elif data_type == TYPE_FRACTION:
+        return format_complex(data, FRACTION_UNITS, 100)
+    return f"(unknown 0x{data_type:02x}) 0x{data:08x}"
+
+
+def is_axml(magic):
+    return magic[:4] == AXML_MAGIC
+
+
+def iter_records(value):
+    """ decode the compiled xml `value` (bytes-like) and yield its records (see above) """
+    data = memoryview(value)
+    if len(data) < CHUNK_HEADER.size or CHUNK_HEADER.unpack_from(data, 0)[0] != RES_XML_TYPE:
+        raise ValueError("not a compiled xml file")
+    _, header_size, size = CHUNK_HEADER.unpack_from(data, 0)
+
+    strings = None
+    resource_ids = ()
+    # namespace uri -> prefix
+    prefixes = {}
+    for chunk_type, offset, header_size, size in iter_chunks(data, header_size, min(size, len(data))):
+        if chunk_type == RES_STRING_POOL_TYPE:
+            strings = StringPool(data, offset)
+            continue
+        elif chunk_type == RES_XML_RESOURCE_MAP_TYPE:
+            resource_ids = struct.unpack_from(f"<{(size - header_size) // 4}I", data, offset + header_size)
+            continue
+        elif chunk_type < RES_XML_START_NAMESPACE_TYPE or chunk_type > RES_XML_CDATA_TYPE:
+            # unknown chunk
+            continue
+        elif strings is None:
+            raise ValueError(f"missing string pool before offset {offset}")
+
+        line = U32.unpack_from(data, offset + 8)[0]
+        ext = offset + header_size
+
+        if chunk_type == RES_XML_START_NAMESPACE_TYPE:
+            prefix, uri = struct.unpack_from("<II", data, ext)
+            prefixes[strings.get(uri)] = strings.get(prefix)
+            yield "N", (strings.get(prefix), strings.get(uri), line)
+
+        elif chunk_type == RES_XML_START_ELEMENT_TYPE:
+            ns, name, attr_start, attr_size, attr_count = ELEMENT_EXT.unpack_from(data, ext)
+            tag = strings[name]
+            if ns != NO_ENTRY:
+                tag = f"{prefixes.get(strings[ns], strings[ns])}:{tag}"
+
+            attrs = []
+            for pos in range(ext + attr_start, ext + attr_start + attr_count * attr_size, attr_size):
+                ns, name, raw, _, _, data_type, val = ATTRIBUTE.unpack_from(data, pos)
+                key = strings[name]
+                if name < len(resource_ids) and resource_ids[name]:
+                    key = f"{key}(0x{resource_ids[name]:08x})"
+                if ns != NO_ENTRY:
+                    key = f"{strings[ns]}:{key}"
+                raw = strings.get(raw)
+                attrs.append((key, format_value(data_type, val, strings), f"\"{raw}\"" if raw else None))
+            yield "E", (tag, line, attrs)
+
+        elif chunk_type == RES_XML_END_ELEMENT_TYPE:
+            yield "/", ()
+
+        elif chunk_type == RES_XML_CDATA_TYPE:
+            yield "T", (f"'{strings[U32.unpack_from(data, ext)[0]]}'",)
+
+
+def iter_apk_documents(path):
+    """ yield `(name, data)` of every compiled xml of the apk `path` (AndroidManifest.xml, res/**.xml) """
+    with zipfile.ZipFile(path) as apk:
+        for info in apk.infolist():
+            name = info.filename
+            if name != "AndroidManifest.xml" and not (name.startswith("res/") and name.endswith(".xml")):
+                continue
+            data = apk.read(info)
+            # raw xml files (res/raw, assets...) are not compiled
+            if is_axml(data):
+                yield name, data
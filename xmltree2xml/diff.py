@@ -0,0 +1,288 @@
+import argparse
+import collections
+import hashlib
+import os
+import sys
+import zipfile
+
+from . import axml
+from .main import STDIO, parse_xml, to_val
+from .resources import ResourceTable, default_cache_dir
+
+"""
+    structural diff of xmltree documents, `xmltree2xml diff old new`
+
+    every subtree has a hash of its tag, namespaces, attributes, text and of the hashes of its children (a merkle tree),
+    an identical subtree is skipped with one comparison, the cost follow the size of the changes, not of the documents.
+
+        inserted  element only in the new document
+        removed   element only in the old document
+        moved     element at another place among its siblings
+        changed   element with other namespaces, attributes or text (its children are compared on their own)
+
+    the inputs are files (xmltree dumps or compiled xml), directories of files or apks, compared by document name.
+"""
+
+# change between two documents, `old` and `new` are the elements (None for an inserted or removed element),
+# `path` is the path of the element in its document and `details` a list of `(key, old value, new value)`,
+# the key of the text is "#text", a missing value is None
+Change = collections.namedtuple("Change", ("kind", "path", "old", "new", "details"))
+
+INSERTED = "inserted"
+REMOVED = "removed"
+MOVED = "moved"
+CHANGED = "changed"
+
+TEXT_KEY = "#text"
+# attributes identifying an element among its siblings, the first one found is used
+ID_ATTRIBUTES = ("android:id", "android:name", "name")
+
+
+def node_key(element):
+    """ bytes of what is compared on the element itself, attributes order does not matter """
+    attributes = sorted((key, repr(val)) for key, val in element.attributes.items())
+    return repr((element.tag, sorted(element.namespaces.items()), attributes, element.text)).encode()
+
+
+def tree_hashes(root):
+    """ hash of every subtree of `root`, by id of the element, without recursion """
+    hashes = {}
+    stack = [(root, False)]
+    while stack:
+        element, done = stack.pop()
+        if not done:
+            stack.append((element, True))
+            stack.extend((child, False) for child in element.childrens)
+            continue
+        digest = hashlib.blake2b(node_key(element), digest_size=16)
+        for child in element.childrens:
+            digest.update(hashes[id(child)])
+        hashes[id(element)] = digest.digest()
+    return hashes
+
+
+def node_details(old, new):
+    """ `(key, old value, new value)` of the namespaces, attributes and text that differ """
+    details = []
+    for old_values, new_values in ((old.namespaces, new.namespaces), (old.attributes, new.attributes)):
+        for key in {**old_values, **new_values}:
+            old_val, new_val = old_values.get(key), new_values.get(key)
+            if repr(old_val) != repr(new_val):
+                details.append((key, old_val, new_val))
+    if old.text != new.text:
+        details.append((TEXT_KEY, old.text, new.text))
+    return details
+
+
+def identity(element):
+    return element.tag, next((element.attributes[key] for key in ID_ATTRIBUTES if key in element.attributes), None)
+
+
+def child_paths(path, childrens):
+    """ path of every children, the position is added for the tags used by many siblings """
+    counts = collections.Counter(child.tag for child in childrens)
+    seen = collections.Counter()
+    paths = []
+    for child in childrens:
+        seen[child.tag] += 1
+        paths.append(f"{path}/{child.tag}[{seen[child.tag]}]" if counts[child.tag] > 1 else f"{path}/{child.tag}")
+    return paths
+
+
+def increasing(sequence):
+    """ indexes of a longest increasing subsequence of `sequence` """
+    tails, tails_pos, previous = [], [], [None] * len(sequence)
+    for pos, value in enumerate(sequence):
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if tails[mid] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        previous[pos] = tails_pos[lo - 1] if lo else None
+        if lo == len(tails):
+            tails.append(value)
+            tails_pos.append(pos)
+        else:
+            tails[lo], tails_pos[lo] = value, pos
+
+    result = set()
+    pos = tails_pos[-1] if tails_pos else None
+    while pos is not None:
+        result.add(pos)
+        pos = previous[pos]
+    return result
+
+
+def match_children(old, new, path, old_hashes, new_hashes):
+    """
+        pair the children of `old` and `new`: identical subtrees by hash, then by tag and id attribute, then by tag,
+        return the changes of this level and the `(old, new, path)` pairs to compare, in the order of the new children
+    """
+    olds, news = old.childrens, new.childrens
+    old_paths, new_paths = child_paths(path, olds), child_paths(path, news)
+
+    # new position -> old position
+    pairs = {}
+    used = set()
+    for key in (lambda child, hashes: hashes[id(child)], lambda child, hashes: identity(child), lambda child, hashes: child.tag):
+        available = {}
+        for pos, child in enumerate(olds):
+            if pos not in used:
+                available.setdefault(key(child, old_hashes), collections.deque()).append(pos)
+        for pos, child in enumerate(news):
+            if pos not in pairs:
+                positions = available.get(key(child, new_hashes))
+                if positions:
+                    pairs[pos] = positions.popleft()
+                    used.add(pairs[pos])
+        if len(pairs) == min(len(olds), len(news)):
+            break
+
+    matched = sorted(pairs)
+    in_order = {matched[pos] for pos in increasing([pairs[new_pos] for new_pos in matched])}
+
+    items = []
+    for pos, child in enumerate(news):
+        if pos not in pairs:
+            items.append(Change(INSERTED, new_paths[pos], None, child, []))
+            continue
+        old_child = olds[pairs[pos]]
+        if pos not in in_order:
+            items.append(Change(MOVED, new_paths[pos], old_child, child, []))
+        if old_hashes[id(old_child)] != new_hashes[id(child)]:
+            items.append((old_child, child, new_paths[pos]))
+
+    for pos, child in enumerate(olds):
+        if pos not in used:
+            items.append(Change(REMOVED, old_paths[pos], child, None, []))
+    return items
+
+
+def diff_trees(old, new):
+    """ yield the `Change` from the tree `old` to the tree `new`, in the order of the new document """
+    if old is None or new is None or old.tag != new.tag:
+        if old is not None:
+            yield Change(REMOVED, old.tag, old, None, [])
+        if new is not None:
+            yield Change(INSERTED, new.tag, None, new, [])
+        return
+
+    old_hashes, new_hashes = tree_hashes(old), tree_hashes(new)
+    stack = [iter([(old, new, new.tag)])]
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+        elif isinstance(item, Change):
+            yield item
+        else:
+            old_el, new_el, path = item
+            if old_hashes[id(old_el)] == new_hashes[id(new_el)]:
+                continue
+            details = node_details(old_el, new_el)
+            if details:
+                yield Change(CHANGED, path, old_el, new_el, details)
+            stack.append(iter(match_children(old_el, new_el, path, old_hashes, new_hashes)))
+
+
+def iter_documents(path):
+    """ yield `(name, data)` of the documents of `path` (a file, a directory or an apk), `data` is bytes """
+    if path != STDIO and os.path.isdir(path):
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                full_path = os.path.join(dirpath, filename)
+                with open(full_path, "rb") as f:
+                    yield os.path.relpath(full_path, path), f.read()
+    elif path != STDIO and zipfile.is_zipfile(path):
+        yield from axml.iter_apk_documents(path)
+    elif path == STDIO:
+        yield None, sys.stdin.buffer.read()
+    else:
+        with open(path, "rb") as f:
+            yield None, f.read()
+
+
+def parse_document(data, resources=None):
+    return parse_xml(data if axml.is_axml(data) else data.decode("utf-8"), resources)
+
+
+def diff_documents(old_path, new_path, resources=None):
+    """
+        yield `(name, changes)` for every document of `old_path` or `new_path` that differ,
+        two files are compared together, directories and apks by document name,
+        documents with the same bytes are not parsed
+    """
+    olds, news = dict(iter_documents(old_path)), dict(iter_documents(new_path))
+    if list(olds) == [None] and list(news) == [None]:
+        names = [None]
+    else:
+        olds.pop(None, None)
+        news.pop(None, None)
+        names = sorted(set(olds) | set(news))
+
+    for name in names:
+        old_data, new_data = olds.get(name), news.get(name)
+        if old_data == new_data:
+            continue
+        try:
+            old = None if old_data is None else parse_document(old_data, resources)
+            new = None if new_data is None else parse_document(new_data, resources)
+        except Exception as e:
+            raise ValueError(f"from '{name or new_path}': {e}") from e
+        changes = list(diff_trees(old, new))
+        if changes:
+            yield name, changes
+
+
+def line(element):
+    return element.extra.get("line") if element is not None else None
+
+
+def format_change(change):
+    """ lines of a `Change` """
+    old_line, new_line = line(change.old), line(change.new)
+    if change.kind == INSERTED:
+        where = f"line {new_line}"
+    elif change.kind == REMOVED:
+        where = f"line {old_line}"
+    else:
+        where = f"line {old_line} -> {new_line}"
+    lines = [f"{change.kind} {change.path} ({where})"]
+    for key, old_val, new_val in change.details:
+        lines.append(f"    {key}: {'(none)' if old_val is None else to_val(old_val)} -> {'(none)' if new_val is None else to_val(new_val)}")
+    return lines
+
+
+def make_diff_parser():
+    p = argparse.ArgumentParser("xmltree2xml diff", description="structural diff of xmltree documents, files, directories or apks, the exit status is 1 when they differ and 2 on error.")
+    p.add_argument("-r", "--resources", action="append", help="resource file for replace every hexa reference to human redable reference, repeat it to layer many files.", default=None)
+    p.add_argument("--cache-dir", help="directory of the parsed resources cache.", default=default_cache_dir())
+    p.add_argument("--no-cache", help="do not use the parsed resources cache.", action="store_true", default=False)
+    p.add_argument("old", help="old xmltree file, directory or apk, '-' read the standard input.")
+    p.add_argument("new", help="new xmltree file, directory or apk.")
+    return p
+
+
+def diff_main(argv=None):
+    flags = make_diff_parser().parse_args(argv)
+    resources = None
+    if flags.resources:
+        resources = ResourceTable.load_layers(flags.resources, None if flags.no_cache else flags.cache_dir)
+
+    differ = False
+    try:
+        for name, changes in diff_documents(flags.old, flags.new, resources):
+            differ = True
+            if name is not None:
+                print(f"--- {name}")
+            for change in changes:
+                for text in format_change(change):
+                    print(text)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(2)
+    if differ:
+        sys.exit(1)
@@ -0,0 +1,101 @@
+import json
+
+from .main import START, TEXT
+
+"""
+    json renderers of the events of `iter_events`, the output formats "json", "ndjson" and "ndjson-elements"
+
+    an element is an object with its tag, line, namespaces, typed attributes, raw values, text (without the quotes)
+    and children, the values keep their types (booleans and numbers are not strings)
+"""
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _json_text(text):
+    """ text without the quotes of the dump """
+    if len(text) >= 2 and text[0] == text[-1] == "'":
+        text = text[1:-1]
+    return _dumps(text)
+
+
+def _json_head(event):
+    """ start of the json object of a START event, without the text and the children """
+    _, tag, attrs, extra_attrs, namespaces, extra = event
+    raw = {key: val.get("Raw") for key, val in extra_attrs.items()}
+    return (f'{{"tag":{_dumps(tag)},"line":{_dumps(extra.get("line"))},"namespaces":{_dumps(dict(namespaces))},'
+            f'"attributes":{_dumps(attrs)},"raw":{_dumps(raw)}')
+
+
+def iter_json(events, document=None, many=False):
+    """
+        render events to json, yield chunks of string,
+        an element is an object with its tag, line, namespaces, typed attributes, raw values, text and children,
+        with a `document` the root is in `{"document": document, "root": root}`,
+        with `many` (elements selected without a root) the first level elements are written in an array
+    """
+    # open elements: [has_text, children]
+    stack = []
+    # elements selected without a root (see `Selector`) are written on their own line, or in the array
+    first = True
+    for event in events:
+        if event[0] == START:
+            if stack:
+                yield "," if stack[-1][1] else ',"text":null,"children":['
+                stack[-1][1] += 1
+            else:
+                if not first:
+                    yield "," if many else "\n"
+                elif many:
+                    yield "["
+                first = False
+                if document is not None:
+                    yield f'{{"document":{_dumps(document)},"root":'
+            yield _json_head(event)
+            stack.append([False, 0])
+
+        elif event[0] == TEXT:
+            stack[-1][0] = True
+            yield f',"text":{_json_text(event[1])}'
+
+        else:
+            has_text, children = stack.pop()
+            if children:
+                yield "]}"
+            elif has_text:
+                yield ',"children":[]}'
+            else:
+                yield ',"text":null,"children":[]}'
+            if not stack and document is not None:
+                yield "}"
+    if many and not first:
+        yield "]"
+
+
+def iter_ndjson_elements(events, document=None):
+    """ render events to one json line by element, with its `id` and the id of its `parent` (in the document) """
+    # ids of the open elements
+    stack = []
+    # line of the last element, waiting for its text
+    pending = None
+    count = 0
+    for event in events:
+        if event[0] == START:
+            if pending is not None:
+                yield pending + ',"text":null}\n'
+            parent = stack[-1] if stack else None
+            stack.append(count)
+            pending = f'{{"document":{_dumps(document)},"id":{count},"parent":{_dumps(parent)},' + _json_head(event)[1:]
+            count += 1
+
+        elif event[0] == TEXT:
+            yield pending + f',"text":{_json_text(event[1])}}}\n'
+            pending = None
+
+        else:
+            if pending is not None:
+                yield pending + ',"text":null}\n'
+                pending = None
+            stack.pop()
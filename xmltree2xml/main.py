@@ -1,77 +1,169 @@
 #!/usr/bin/env python3
 
 import argparse
+import contextlib
+import cProfile
+import io
+import itertools
 import os
 import re
-from functools import reduce
+import sys
+import tracemalloc
+from functools import lru_cache
+from types import MappingProxyType
+
+from . import axml
+from .archive import ARCHIVE_FORMATS, BUFFER_SIZE, OutputArchive
+from .manifest import Manifest, file_digest
+from .query import Selector
+from .resources import ResourceTable, cache_key, clear_cache, default_cache_dir, iter_lines
+from .stats import FileStats, Stats, measure
+
+XML_HEADER = '<?xml version="1.0" encoding="utf-8"?>\n'
+
+# input or output file for stdin/stdout
+STDIO = "-"
+
+
+# shared by every element without attributes, namespaces... (read only)
+EMPTY_DICT = MappingProxyType({})
+EMPTY_LIST = ()
 
 
 class XmlTreeElement:
-    """ xmltree implementation """
-    def __init__(self, tag, text=None, child=[], attrs={}, extra={}):
+    """
+        xmltree implementation, containers are only allocated when used,
+        `attributes`, `extra_attrs`, `extra`, `namespaces` (read only mappings) and `childrens` (a tuple) are read only views,
+        change them with the `add_*` methods or by assigning a new container
+    """
+    __slots__ = ("tag", "text", "parent", "_attributes", "_extra_attrs", "_extra", "_childrens", "_namespaces")
+
+    def __init__(self, tag, text=None, child=None, attrs=None, extra=None):
         self.tag = tag
-        self.extra = extra
-
         self.text = text
-
-        self.attributes = {**attrs}
-        self.extra_attrs = {}
-        self.extra = {**extra}
-        self.childrens = [*child]
-        self.namespaces = {}
         self.parent = None
 
+        self._attributes = {**attrs} if attrs else None
+        # only attributes with extra (Raw)
+        self._extra_attrs = None
+        self._extra = {**extra} if extra else None
+        self._childrens = [*child] if child else None
+        self._namespaces = None
+
+    @property
+    def attributes(self):
+        return MappingProxyType(self._attributes) if self._attributes else EMPTY_DICT
+
+    @attributes.setter
+    def attributes(self, value):
+        self._attributes = value
+
+    @property
+    def extra_attrs(self):
+        return MappingProxyType(self._extra_attrs) if self._extra_attrs else EMPTY_DICT
+
+    @extra_attrs.setter
+    def extra_attrs(self, value):
+        self._extra_attrs = value
+
+    @property
+    def extra(self):
+        return MappingProxyType(self._extra) if self._extra else EMPTY_DICT
+
+    @extra.setter
+    def extra(self, value):
+        self._extra = value
+
+    @property
+    def childrens(self):
+        return tuple(self._childrens) if self._childrens else EMPTY_LIST
+
+    @childrens.setter
+    def childrens(self, value):
+        self._childrens = value
+
+    @property
+    def namespaces(self):
+        return MappingProxyType(self._namespaces) if self._namespaces else EMPTY_DICT
+
+    @namespaces.setter
+    def namespaces(self, value):
+        self._namespaces = value
+
     def add_child(self, child):
         if self.text is not None:
             raise ValueError("can't add children text is set")
-        self.childrens.append(child)
+        if self._childrens is None:
+            self._childrens = []
+        self._childrens.append(child)
         child.parent = self
 
     def set_text(self, text):
-        if len(self.childrens) != 0:
+        if self._childrens:
             raise ValueError("can't set text with children")
         elif self.text:
             raise ValueError("text is already set")
         self.text = text
 
-    def add_attr(self, key, value, extra={}):
-        self.extra_attrs[key] = extra
-        self.attributes[key] = value
+    def add_attr(self, key, value, extra=None):
+        if self._attributes is None:
+            self._attributes = {}
+        self._attributes[key] = value
+        if extra:
+            if self._extra_attrs is None:
+                self._extra_attrs = {}
+            self._extra_attrs[key] = extra
 
     def add_namespace(self, key, value):
-        self.namespaces[f"xmlns:{key}"] = value
+        if self._namespaces is None:
+            self._namespaces = {}
+        self._namespaces[f"xmlns:{key}"] = value
 
     def add_namespaces(self, **namespaces):
         for key, val in namespaces.items():
             self.add_namespace(key, val)
 
     def add_attrs(self, **attrs):
-        self.attributes.update(attrs)
+        if self._attributes is None:
+            self._attributes = {}
+        self._attributes.update(attrs)
 
-    def to_str(self, depth=0, indentation=4):
-        spance_indentation = " " * (depth * indentation)
-
-        def to_val(val):
-            if isinstance(val, bool):
-                val = str(val).lower()
-            return f"\"{val}\""
+    def iter_events(self):
+        """ yield the events of the tree (see `iter_events`), without recursion """
+        yield START, self.tag, self._attributes or EMPTY_DICT, self._extra_attrs or EMPTY_DICT, self._namespaces or EMPTY_DICT, self._extra or EMPTY_DICT
+        if self.text:
+            yield TEXT, self.text
+            yield END, self.tag
+            return
+
+        stack = [(self, iter(self._childrens or EMPTY_LIST))]
+        while stack:
+            node, childrens = stack[-1]
+            child = next(childrens, None)
+            if child is None:
+                stack.pop()
+                yield END, node.tag
+                continue
+
+            yield START, child.tag, child._attributes or EMPTY_DICT, child._extra_attrs or EMPTY_DICT, child._namespaces or EMPTY_DICT, child._extra or EMPTY_DICT
+            if child.text:
+                yield TEXT, child.text
+                yield END, child.tag
+            else:
+                stack.append((child, iter(child._childrens or EMPTY_LIST)))
 
-        # convert attributes
-        attrs = reduce(lambda fi, d: f"{fi} {d[0]}={to_val(d[1])}", self.attributes.items(), "")
-        namespaces = reduce(lambda fi, d: f"{fi} {d[0]}={to_val(d[1])}", self.namespaces.items(), "")
-        child = reduce(lambda fi, child: f"{fi}\n" + child.to_str(depth + 1, indentation), self.childrens, "")
+    def iter_chunks(self, depth=0, indentation=4):
+        return iter_xml(self.iter_events(), depth, indentation)
 
-        start_tag = f"{spance_indentation}<{self.tag}{namespaces}{attrs}"
-        end_tag = f"</{self.tag}>"
+    def write_to(self, fp, indentation=4):
+        for chunk in self.iter_chunks(indentation=indentation):
+            fp.write(chunk)
 
-        if self.text:
-            return f"{start_tag}>{self.text}{end_tag}"
-        elif not self.childrens:
-            return f"{start_tag} />"
-        return f"{start_tag}>{child}\n{spance_indentation}{end_tag}"
+    def to_str(self, depth=0, indentation=4):
+        return "".join(self.iter_chunks(depth, indentation))
 
 
-def sanitize_value(val):
+def _sanitize_value(val):
     # convert string
     if val[0] == "\"" and val[-1] == "\"":
         # remove start and ending quote
@@ -99,17 +191,17 @@ attr_reg = re.compile(r"^(http://schemas\.android\.com/apk/res/)([a-zA-Z\.:_\-]+
 attr_reg2 = re.compile(r"^(http://schemas\.android\.com/apk/res-auto:)([a-zA-Z\.:_\-]+)\(0x[a-f0-9]+\)$")
 
 
-def sanitize_android_key(val, resources):
+def _sanitize_android_key(val):
     mat = attr_reg.match(val)
     if mat:
         # 0 = url
         # 1 = namespace ?
         # 2 = hexa ?
-        return mat.groups()[1]
+        return sys.intern(mat.groups()[1])
     mat = attr_reg2.match(val)
     if mat:
-        return "app:" + mat.groups()[1]
-    return val
+        return sys.intern("app:" + mat.groups()[1])
+    return sys.intern(val)
 
 
 """
@@ -122,20 +214,78 @@ def sanitize_android_key(val, resources):
 """
 
 
-def sanitize_android_value(val, resources):
+def _sanitize_android_value(val, resources):
     val = sanitize_value(val)
     if resources and isinstance(val, str):
+        # lookups are counted by `sanitize_android_value`, the cached ones too
         if val[0] == "@":
-            mat = re.search(r"\n\s{4}resource " + re.escape(val[1:]) + r" ([^\s\n]+)\n", resources)
-            if mat:
-                return "@" + mat.groups()[0]
+            name = resources.ids.get(val[1:])
+            if name:
+                return "@" + name
         elif val[0] == "?":
-            mat = re.search(r"\n\s{4}resource 0x[a-f0-9]+ (.+?)\n\s{6}\(\) \(style\) size=\d+ parent=" + re.escape(val[1:]), resources)
-            if mat:
-                return "?android:" + mat.groups()[0]
+            name = resources.styles.get(val[1:])
+            if name:
+                return "?android:" + name
     return val
 
 
+# entries of each memo cache
+MEMO_SIZE = 4096
+
+_memo = {}
+# resources of the cached references
+_memo_resources = None
+
+
+def configure_caches(size=MEMO_SIZE):
+    """ (re)create the memo caches of keys, values and resources references, with `size` entries each (0 disable them) """
+    global _memo_resources
+    _memo["keys"] = lru_cache(maxsize=size)(_sanitize_android_key)
+    _memo["values"] = lru_cache(maxsize=size)(_sanitize_value)
+    _memo["references"] = lru_cache(maxsize=size)(_sanitize_android_value)
+    _memo_resources = None
+
+
+def clear_caches():
+    global _memo_resources
+    for cache in _memo.values():
+        cache.cache_clear()
+    _memo_resources = None
+
+
+def cache_info():
+    """ hits and misses of every memo caches """
+    return {name: {"hits": info.hits, "misses": info.misses} for name, info in ((name, cache.cache_info()) for name, cache in _memo.items())}
+
+
+configure_caches()
+
+
+def sanitize_value(val):
+    return _memo["values"](val)
+
+
+def sanitize_android_key(val, resources):
+    return _memo["keys"](val)
+
+
+def sanitize_android_value(val, resources):
+    global _memo_resources
+    if not resources or (val[0] not in "@?" and (val[0] != "\"" or val[1:2] not in ("@", "?"))):
+        # nothing to resolve (a quoted reference is resolved once unquoted), don't fill the references cache
+        return _memo["values"](val)
+    if resources is not _memo_resources:
+        # references of an other resources file
+        _memo["references"].cache_clear()
+        _memo_resources = resources
+    result = _memo["references"](val, resources)
+    if resources.counters is not None:
+        plain = _memo["values"](val)
+        if isinstance(plain, str) and plain[:1] in ("@", "?"):
+            resources.counters["hit" if result != plain else "miss"] += 1
+    return result
+
+
 """
     E: Element
     A: Attribute
@@ -149,8 +299,37 @@ elements = {
     "N": re.compile(r"^(\s*)N: ([^\n\s=]+?)=(.+?) \(line=(\d+?)\)\s*$"),
 }
 
+# same patterns without the indentation and the record tag, "A" is split by hand in `parse_line`
+records = {
+    "E: ": re.compile(r"([a-zA-Z][a-zA-Z0-9\-_\.]+?) \(line=(\d+)\)\s*$"),
+    "T: ": re.compile(r"(.+?)$"),
+    "N: ": re.compile(r"([^\n\s=]+?)=(.+?) \(line=(\d+?)\)\s*$"),
+}
+
 
 def parse_line(line):
+    value = line.lstrip()
+    record = value[:3]
+
+    # lines come from a split, only a direct call can have a new line
+    if "\n" not in value:
+        if record == "A: ":
+            # same as the "A" pattern, split by hand without backtracking
+            pos = value.find("=", 4)
+            if pos != -1 and pos != len(value) - 1:
+                val = value[pos + 1:]
+                stripped = val.rstrip()
+                if stripped[-1:] == ")":
+                    raw = val.find(" (Raw: ", 1)
+                    if raw != -1 and raw + 7 < len(stripped) - 1:
+                        return len(line) - len(value), "A", (value[3:pos], val[:raw], stripped[raw + 7:-1])
+                return len(line) - len(value), "A", (value[3:pos], stripped or val[0], None)
+        elif record in records:
+            mat = records[record].match(value, 3)
+            if mat:
+                return len(line) - len(value), value[0], mat.groups()
+        raise ValueError("match nothing")
+
     for el_type, reg in elements.items():
         mat = reg.search(line)
         if mat:
@@ -159,18 +338,63 @@ def parse_line(line):
     raise ValueError("match nothing")
 
 
-def parse_xml(value, resources=None):
+"""
+    events yield by `iter_events`
+
+    (START, tag, attributes, extra_attrs, namespaces, extra)
+    (TEXT, text)
+    (END, tag)
+"""
+START = "start"
+TEXT = "text"
+END = "end"
+
+
+def iter_events(value, resources=None, start=1, stats=None, select=None):
+    """
+        parse xmltree `value` (a string or an iterable of lines) and yield events,
+        an element is yield as soon as its attributes are complete so the memory
+        used only depend of the depth of the document,
+        `stats` (a `FileStats`) count the records and time the resources resolution,
+        a bytes `value` is a compiled binary xml (see `iter_axml_events`),
+        with `select` (a `Selector`) only the selected elements are yield, the lines of the
+        elements that can't be selected (and of their subtree) are skipped without being parsed
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        events = iter_axml_events(value, resources, stats)
+        yield from (events if select is None else select_events(events, select))
+        return
+
+    # open elements: [tag, has_children, text, selection]
+    # selection is None for a yield element, else a `Selector` state (or `Selector.child` result before
+    # the attributes of the element are read) and False for a skipped element
     tree = []
-    root = None
+    root = False
     level = 0
 
     namespaces_number = 0
-    namespaces = {}
+    namespaces = EMPTY_DICT
+    # namespaces of the root, added to the selected elements
+    root_namespaces = EMPTY_DICT
+    # level of the skipped element, the lines of its subtree are ignored
+    skip = None
+
+    # element waiting for its attributes and text
+    pending = None
 
-    for pos, line in enumerate(value.split("\n"), start=1):
+    if select is not None and select.root is not None:
+        yield START, select.root, {}, {}, EMPTY_DICT, {}
+
+    for pos, line in enumerate(iter_lines(value), start=start):
         if not line:
             continue
 
+        if skip is not None:
+            stripped = line.lstrip(" ")
+            if not stripped.startswith("E: ") or (len(line) - len(stripped) - (namespaces_number % 2) * 2) // 4 > skip:
+                continue
+            skip = None
+
         try:
             lvl, el_type, groups = parse_line(line)
             lvl -= ((namespaces_number % 2) * 2)
@@ -179,6 +403,9 @@ def parse_xml(value, resources=None):
         except Exception as e:
             raise ValueError(f"{str(e)} in line {pos}")
 
+        if stats is not None:
+            stats.records[el_type] += 1
+
         # check formating
         if lvl > level + 1:
             raise ValueError(f"to many indentation in line {pos}")
@@ -194,44 +421,359 @@ def parse_xml(value, resources=None):
             raise ValueError(f"multiple root element in line {pos}")
 
         if el_type == "E":
-            xml_el = XmlTreeElement(groups[0], extra={"line": sanitize_value(groups[1])})
-
-            xml_el.add_namespaces(**namespaces)
-            namespaces = {}
+            if pending is not None:
+                if tree[-1][3] is not None:
+                    pending = _select_pending(select, tree[-1], pending, root_namespaces)
+                    if tree[-1][3] is False:
+                        skip = level
+                if pending is not None:
+                    yield pending
+                    if tree[-1][2]:
+                        yield TEXT, tree[-1][2]
+                pending = None
+                if skip is not None:
+                    if lvl > skip:
+                        continue
+                    skip = None
 
             if len(tree) > 1 and level >= lvl:
-                tree = tree[:lvl]
+                for closed in reversed(tree[lvl:]):
+                    if closed[3] is None:
+                        yield END, closed[0]
+                del tree[lvl:]
             level = lvl
-            if root is None:
-                root = xml_el
+            if tree:
+                if tree[-1][2] is not None:
+                    raise ValueError("can't add children text is set")
+                tree[-1][1] = True
+            root = True
+            tag = sys.intern(groups[0])
+
+            if select is None or (tree and tree[-1][3] is None):
+                tree.append([tag, False, None, None])
+                pending = (START, tag, {}, {}, namespaces, {"line": int(groups[1])})
             else:
-                tree[-1].add_child(xml_el)
-            tree.append(xml_el)
+                if not tree:
+                    root_namespaces = namespaces
+                child = select.child(tree[-1][3] if tree else select.ROOT_STATE, tag)
+                if child is None:
+                    tree.append([tag, False, None, False])
+                    skip = lvl
+                elif child[2]:
+                    # selected or not from its attributes
+                    tree.append([tag, False, None, child])
+                    pending = (START, tag, {}, {}, namespaces, {"line": int(groups[1])})
+                else:
+                    state, selected = select.resolve(child)
+                    if selected:
+                        tree.append([tag, False, None, None])
+                        pending = (START, tag, {}, {}, namespaces or root_namespaces, {"line": int(groups[1])})
+                    else:
+                        # attributes are not needed
+                        tree.append([tag, False, None, state])
+            namespaces = EMPTY_DICT
 
         elif el_type == "A":
-            extra = {}
+            if pending is None:
+                # element not selected
+                continue
+            if stats is None:
+                key = sanitize_android_key(groups[0], resources)
+                pending[2][key] = sanitize_android_value(groups[1], resources)
+            else:
+                with stats.phase("resolve"):
+                    key = sanitize_android_key(groups[0], resources)
+                    pending[2][key] = sanitize_android_value(groups[1], resources)
             if groups[2]:
-                extra["Raw"] = sanitize_value(groups[2])
-
-            tree[-1].add_attr(
-                sanitize_android_key(groups[0], resources),
-                sanitize_android_value(groups[1], resources),
-                extra=extra
-            )
+                pending[3][key] = {"Raw": sanitize_value(groups[2])}
 
         elif el_type == "T":
-            tree[-1].set_text(groups[0])
+            if tree[-1][1]:
+                raise ValueError("can't set text with children")
+            elif tree[-1][2]:
+                raise ValueError("text is already set")
+            tree[-1][2] = groups[0]
 
         elif el_type == "N":
             # WARNING namespace is only on top documents ?
             if root:
                 raise ValueError("N type is aleready create")
             namespaces_number += 1
-            namespaces[groups[0]] = sanitize_value(groups[1])
+            if namespaces is EMPTY_DICT:
+                namespaces = {}
+            namespaces[f"xmlns:{groups[0]}"] = sanitize_value(groups[1])
+
+    if pending is not None:
+        if tree[-1][3] is not None:
+            pending = _select_pending(select, tree[-1], pending, root_namespaces)
+        if pending is not None:
+            yield pending
+            if tree[-1][2]:
+                yield TEXT, tree[-1][2]
+    while tree:
+        closed = tree.pop()
+        if closed[3] is None:
+            yield END, closed[0]
+
+    if select is not None and select.root is not None:
+        yield END, select.root
+
+
+def _select_pending(select, entry, pending, root_namespaces):
+    """ select the element of the tree `entry` from its attributes, return its START event `pending` when it is selected """
+    resolved = select.resolve(entry[3], pending[2])
+    if resolved is None:
+        entry[3] = False
+        return None
+    state, selected = resolved
+    if not selected:
+        entry[3] = state
+        return None
+    entry[3] = None
+    if not pending[4] and root_namespaces:
+        pending = pending[:4] + (root_namespaces,) + pending[5:]
+    return pending
+
+
+def select_events(events, select):
+    """ events of the elements selected by `select` (a `Selector`), like `iter_events(..., select=select)` but without skipping the parsing """
+    if select.root is not None:
+        yield START, select.root, {}, {}, EMPTY_DICT, {}
+
+    # selection of the open elements (see `iter_events`)
+    stack = []
+    root_namespaces = EMPTY_DICT
+    for event in events:
+        if event[0] == START:
+            if stack and (stack[-1] is None or stack[-1] is False):
+                stack.append(stack[-1])
+                if stack[-1] is None:
+                    yield event
+                continue
+            if not stack:
+                root_namespaces = event[4]
+            child = select.child(stack[-1] if stack else select.ROOT_STATE, event[1])
+            resolved = child and select.resolve(child, event[2])
+            if not resolved:
+                stack.append(False)
+            elif resolved[1]:
+                stack.append(None)
+                yield event if event[4] or not root_namespaces else event[:4] + (root_namespaces,) + event[5:]
+            else:
+                stack.append(resolved[0])
+
+        elif event[0] == TEXT:
+            if stack[-1] is None:
+                yield event
+
+        elif stack.pop() is None:
+            yield event
+
+    if select.root is not None:
+        yield END, select.root
+
+
+def iter_axml_events(value, resources=None, stats=None):
+    """ same as `iter_events` for the compiled binary xml `value`, decoded without `aapt2 dump xmltree` """
+    # open elements: [tag, has_children, text]
+    tree = []
+    root = False
+    namespaces = EMPTY_DICT
+
+    for el_type, groups in axml.iter_records(value):
+        if stats is not None and el_type != "/":
+            stats.records[el_type] += 1
+            if el_type == "E":
+                stats.records["A"] += len(groups[2])
+
+        if el_type == "E":
+            if tree:
+                if tree[-1][2] is not None:
+                    raise ValueError(f"can't add children text is set in line {groups[1]}")
+                tree[-1][1] = True
+            elif root:
+                raise ValueError(f"multiple root element in line {groups[1]}")
+            root = True
+            tag = sys.intern(groups[0])
+            tree.append([tag, False, None])
+
+            attrs, extra_attrs = {}, {}
+            with measure(stats, "resolve"):
+                for key, val, raw in groups[2]:
+                    key = sanitize_android_key(key, resources)
+                    attrs[key] = sanitize_android_value(val, resources)
+                    if raw:
+                        extra_attrs[key] = {"Raw": sanitize_value(raw)}
+            yield START, tag, attrs, extra_attrs, namespaces, {"line": groups[1]}
+            namespaces = EMPTY_DICT
+
+        elif el_type == "/":
+            if not tree:
+                raise ValueError("end of an element not started")
+            yield END, tree.pop()[0]
+
+        elif el_type == "T":
+            # whitespaces between elements, removed by aapt2
+            if not tree or not groups[0][1:-1].strip():
+                continue
+            if tree[-1][1]:
+                raise ValueError("can't set text with children")
+            elif tree[-1][2]:
+                raise ValueError("text is already set")
+            tree[-1][2] = groups[0]
+            yield TEXT, groups[0]
+
+        elif el_type == "N":
+            if root:
+                raise ValueError(f"N type is aleready create in line {groups[2]}")
+            if namespaces is EMPTY_DICT:
+                namespaces = {}
+            namespaces[f"xmlns:{groups[0]}"] = sanitize_value(groups[1])
+
+    if tree:
+        raise ValueError("truncated file, elements are not closed")
+
+
+def parse_xml(value, resources=None, start=1, stats=None, index=None, document=None):
+    """ build the tree of xmltree `value`, every elements are added to `index` (a `TreeIndex`) as `document` """
+    tree = []
+    root = None
+
+    for event in iter_events(value, resources, start, stats):
+        if event[0] == START:
+            _, tag, attrs, extra_attrs, namespaces, extra = event
+            xml_el = XmlTreeElement(tag)
+            xml_el._attributes = attrs or None
+            xml_el._extra_attrs = extra_attrs or None
+            xml_el._extra = extra
+            xml_el._namespaces = namespaces or None
+
+            if root is None:
+                root = xml_el
+            else:
+                tree[-1].add_child(xml_el)
+            tree.append(xml_el)
+            if index is not None:
+                index.add(xml_el, document)
+
+        elif event[0] == TEXT:
+            tree[-1].set_text(event[1])
+
+        else:
+            tree.pop()
 
     return root
 
 
+def to_val(val):
+    if isinstance(val, bool):
+        val = str(val).lower()
+    return f"\"{val}\""
+
+
+def iter_xml(events, depth=0, indentation=4):
+    """ render events to xml, yield chunks of string """
+    # open elements: [tag, state]
+    stack = []
+    # elements selected without a root (see `Selector`) are written one after the other
+    first = True
+    for event in events:
+        if event[0] == START:
+            _, tag, attrs, _, namespaces, _ = event
+            if stack:
+                if stack[-1][1] == START:
+                    yield ">"
+                    stack[-1][1] = END
+                yield "\n"
+            elif not first:
+                yield "\n"
+            first = False
+            chunks = [" " * ((depth + len(stack)) * indentation), "<", tag]
+            for key, val in namespaces.items():
+                chunks.append(f" {key}={to_val(val)}")
+            for key, val in attrs.items():
+                chunks.append(f" {key}={to_val(val)}")
+            yield "".join(chunks)
+            stack.append([tag, START])
+
+        elif event[0] == TEXT:
+            stack[-1][1] = TEXT
+            yield f">{event[1]}"
+
+        else:
+            tag, state = stack.pop()
+            if state == START:
+                yield " />"
+            elif state == TEXT:
+                yield f"</{tag}>"
+            else:
+                yield f"\n{' ' * ((depth + len(stack)) * indentation)}</{tag}>"
+
+
+def stream_xml(value, fp, resources=None, no_header=False, indentation=4, *, start=1, stats=None, select=None, jobs=1):
+    """
+        convert xmltree `value` (a string or an iterable of lines) and write it to `fp`
+        without building the tree, return False when `value` has no element (or nothing is selected by `select`),
+        with `jobs` > 1 a large string is converted by a pool of processes (see `iter_xml_parallel`)
+    """
+    if jobs > 1 and select is None and isinstance(value, str):
+        # imported here, the pools are build on top of this module
+        from .parallel import iter_xml_parallel
+        chunks = iter_xml_parallel(value, jobs, resources, start, stats, indentation)
+    else:
+        chunks = iter_xml(iter_events(value, resources, start, stats, select), indentation=indentation)
+
+    empty = True
+    for chunk in chunks:
+        if empty:
+            empty = False
+            if not no_header:
+                fp.write(XML_HEADER)
+        fp.write(chunk)
+    return not empty
+
+
+# output format -> suffix of the output files
+FORMATS = {"xml": ".xml", "json": ".json", "ndjson": ".ndjson", "ndjson-elements": ".ndjson"}
+
+
+def stream_output(value, fp, fmt="xml", resources=None, no_header=False, *, start=1, stats=None, document=None, select=None, jobs=1):
+    """
+        `stream_xml` for every formats of `FORMATS`, json documents end with a new line,
+        "ndjson" write one line by document, "ndjson-elements" one line by element,
+        "json" write the elements selected without a root in an array,
+        json formats are always converted in one process (`jobs` is ignored)
+    """
+    if fmt == "xml":
+        return stream_xml(value, fp, resources, no_header, start=start, stats=stats, select=select, jobs=jobs)
+
+    # imported here, the json renderers are build on top of this module
+    from .formats import iter_json, iter_ndjson_elements
+
+    events = iter_events(value, resources, start, stats, select)
+    if fmt == "ndjson-elements":
+        chunks = iter_ndjson_elements(events, document)
+    else:
+        # a json file hold one value, the elements selected without a root are in an array
+        many = fmt == "json" and select is not None and select.root is None
+        chunks = iter_json(events, document if fmt == "ndjson" else None, many)
+
+    empty = True
+    for chunk in chunks:
+        empty = False
+        fp.write(chunk)
+    if not empty and fmt != "ndjson-elements":
+        fp.write("\n")
+    return not empty
+
+
+def output_path(path, fmt):
+    """ `path` of `generate_path` with the suffix of the format `fmt` """
+    if fmt == "xml" or path == STDIO:
+        return path
+    return path[:-len(".xml")] + FORMATS[fmt]
+
+
 def generate_path(output_dir, filename, resources=None):
 
     filename = os.path.basename(filename)
@@ -240,50 +782,471 @@ def generate_path(output_dir, filename, resources=None):
 
     # rename file wit resource name
     if resources:
-        mat = re.search(r"\n\s{4}resource 0x[a-f0-9]+ xml/([a-zA-Z][a-zA-Z_-]*)\n\s{6}\(\) \(file\) res/" + re.escape(filename) + " type=XML", resources)
-        if mat:
-            filename = mat.groups()[0] + ".xml"
+        name = resources.file(filename)
+        if name:
+            filename = name + ".xml"
 
     return os.path.normpath(output_dir + "/" + filename)
 
 
-def main():
+class ConversionError(ValueError):
+    """ conversion of `filename` failed, the original exception is chained as `__cause__` """
 
-    p = argparse.ArgumentParser("xmltree2xml", description="convert android xmltree to classic xml.")
-    p.add_argument("-n", "--no-header", help="do not add an xml header.", action="store_true", default=False)
-    p.add_argument("-r", "--resources", nargs=1, help="resource file for replace every hexa reference to human redable reference.", default=None)
-    p.add_argument("-o", "--output-dir", help="output directory.", default="output")
-    p.add_argument("-f", "--rename-file", help="rename output file with resource name.", action="store_true", default=False)
-    p.add_argument("file", nargs='+', help="xmltree file.")
-    flags = p.parse_args()
+    def __init__(self, filename, error):
+        super().__init__(f"from '{filename}': {error}")
+        self.filename = filename
+        self.error = str(error)
 
-    if not os.path.exists(flags.output_dir):
-        os.mkdir(flags.output_dir)
+    def __reduce__(self):
+        return type(self), (self.filename, self.error)
 
-    for filename in flags.file:
-        with open(filename, "r") as f:
-            value = f.read()
 
-        resources = None
-        if flags.resources:
-            with open(flags.resources[0], "r") as f:
-                resources = f.read()
+def open_input(filename, binary=False):
+    """ open the xmltree file `filename`, "-" is the standard input """
+    if filename == STDIO:
+        return contextlib.nullcontext(sys.stdin.buffer if binary else sys.stdin)
+    return open(filename, "rb" if binary else "r")
 
+
+def input_format(filename):
+    """ "apk", "axml" (compiled binary xml) or "xmltree" (text dump) from the first bytes of `filename` """
+    if filename == STDIO:
+        # a pipe can not seek, look ahead in the buffer
+        buffer = getattr(sys.stdin, "buffer", None)
+        magic = buffer.peek(4)[:4] if hasattr(buffer, "peek") else b""
+    else:
         try:
-            root_el = parse_xml(value, resources)
-            if not root_el:
+            with open(filename, "rb") as f:
+                magic = f.read(4)
+        except OSError:
+            # reported by the conversion
+            magic = b""
+
+    if magic == axml.ZIP_MAGIC:
+        return "apk"
+    elif axml.is_axml(magic):
+        return "axml"
+    return "xmltree"
+
+
+def write_file(path, value, resources=None, no_header=False, stream=False, *, start=1, stats=None, archive=None, fmt="xml", document=None, select=None, jobs=1):
+    """
+        convert xmltree `value` (a string or an iterable of lines) into the file `path`,
+        "-" is the standard output (always converted line by line),
+        `stats` (a `FileStats`) time the phases and count resources lookups,
+        with an `archive` (see `OutputArchive`) `path` is the name of the document in the archive,
+        `fmt` is one of `FORMATS` (json formats are always converted line by line), `document` the name in ndjson records,
+        only the elements selected by `select` (a `Selector`) are written (always converted line by line),
+        with `jobs` > 1 the children of the root of a large string are converted by a pool of processes (see `iter_xml_parallel`)
+    """
+    if stats is None:
+        return _write_file(path, value, resources, no_header, stream, start=start, stats=stats, archive=archive, fmt=fmt, document=document, select=select, jobs=jobs)
+
+    if resources is not None:
+        resources.counters = stats.lookups
+    caches = cache_info()
+    try:
+        _write_file(path, value, resources, no_header, stream, start=start, stats=stats, archive=archive, fmt=fmt, document=document, select=select, jobs=jobs)
+    finally:
+        stats.add_caches(caches, cache_info())
+        if resources is not None:
+            resources.counters = None
+
+
+def _write_file(path, value, resources, no_header, stream, *, start, stats, archive, fmt, document, select, jobs):
+    if archive is not None:
+        # rendered in memory, the archive get the whole document at once
+        buf = io.StringIO()
+        with measure(stats, "stream"):
+            if not stream_output(value, buf, fmt, resources, no_header, start=start, stats=stats, document=document, select=select, jobs=jobs):
                 raise ValueError("file is empty...")
-        except Exception as e:
-            raise ValueError(f"from '{filename}': {str(e)}")
+        with measure(stats, "write"):
+            size = archive.write(path, buf.getvalue().encode())
+        if stats is not None:
+            stats.phases["stream"] -= stats.phases["resolve"]
+            stats.output = path
+            stats.output_bytes = size
+        return
+
+    if path == STDIO or stream or fmt != "xml" or select is not None or jobs > 1:
+        with measure(stats, "stream"):
+            _stream_file(path, value, fmt, resources, no_header, start=start, stats=stats, document=document, select=select, jobs=jobs)
+        phase = "stream"
+    else:
+        with measure(stats, "parse"):
+            root_el = parse_xml(value, resources, start, stats)
+        if not root_el:
+            raise ValueError("file is empty...")
 
-        path = generate_path(flags.output_dir, filename, resources if flags.rename_file else None)
         with open(path, "w") as f:
-            if not flags.no_header:
-                f.write('<?xml version="1.0" encoding="utf-8"?>\n')
-            f.write(root_el.to_str())
+            if not no_header:
+                f.write(XML_HEADER)
+            if stats is None:
+                root_el.write_to(f)
+            else:
+                with stats.phase("serialize"):
+                    text = root_el.to_str()
+                with stats.phase("write"):
+                    f.write(text)
+        phase = "parse"
+
+    if stats is not None:
+        # resolution is timed apart
+        stats.phases[phase] -= stats.phases["resolve"]
+        stats.output = path
+        if path != STDIO:
+            stats.output_bytes = os.path.getsize(path)
+
+
+def _stream_file(path, value, fmt, resources, no_header, **options):
+    if path == STDIO:
+        if not stream_output(value, sys.stdout, fmt, resources, no_header, **options):
+            raise ValueError("file is empty...")
+        if fmt == "xml":
+            sys.stdout.write("\n")
+        sys.stdout.flush()
+        return
+
+    try:
+        with open(path, "w", buffering=BUFFER_SIZE) as f:
+            if not stream_output(value, f, fmt, resources, no_header, **options):
+                raise ValueError("file is empty...")
+    except Exception:
+        # do not keep a partial output
+        os.remove(path)
+        raise
+
+
+def convert_file(filename, output_dir, resources=None, no_header=False, rename_file=False, stream=False, *, stats=None, archive=None, fmt="xml", value=None, select=None, jobs=1):
+    """
+        convert the xmltree file `filename` into `output_dir`, return the output path,
+        with `stream` the file is read, converted and written line by line,
+        "-" read the standard input, an `output_dir` "-" write to the standard output,
+        with an `archive` the output path is the name of the document in the archive (relative to `output_dir`),
+        `value` is the content of `filename` when it is already read (see `read_input`),
+        only the elements selected by `select` (a `Selector`) are written,
+        `jobs` > 1 convert the children of the root with a pool of processes (for one large file, see `iter_xml_parallel`)
+    """
+    if output_dir == STDIO and archive is None:
+        path, stream = STDIO, True
+    else:
+        path = output_path(generate_path(output_dir, "stdin" if filename == STDIO else filename, resources if rename_file else None), fmt)
+
+    if value is None:
+        kind = input_format(filename)
+        if stream and kind == "xmltree":
+            with open_input(filename) as f:
+                _convert_value(filename, path, f, resources, no_header, stream, stats=stats, archive=archive, fmt=fmt, select=select, jobs=jobs)
+            return path
+        value = read_input(filename, stats, kind)
+
+    _convert_value(filename, path, value, resources, no_header, stream, stats=stats, archive=archive, fmt=fmt, select=select, jobs=jobs)
+    return path
+
+
+def read_input(filename, stats=None, kind=None):
+    """ content of the input `filename`, bytes for a compiled xml else a string, `kind` is its `input_format` """
+    kind = kind or input_format(filename)
+    if kind == "apk":
+        raise ConversionError(filename, "an apk contain multiple documents, use `convert_documents`")
+
+    with open_input(filename, kind == "axml") as f:
+        try:
+            with measure(stats, "read"):
+                return f.read()
+        except Exception as e:
+            raise ConversionError(filename, e) from e
 
-        print(f"writing '{path}' ...")
 
+def _convert_value(filename, path, value, resources, no_header, stream, **options):
+    try:
+        write_file(path, value, resources, no_header, stream, document=filename, **options)
+    except Exception as e:
+        raise ConversionError(filename, e) from e
+
+
+# per file header of `aapt2 dump xmltree` with multiple files (like "res/layout/main.xml:")
+document_reg = re.compile(r"^(?![ENAT]: )(\S.*?):\s*$")
+
+
+def split_documents(value, delimiter=document_reg):
+    """
+        split a dump of multiple xmltree documents on the lines matching `delimiter`,
+        yield `(name, start, lines)` where name is the first group of the delimiter (or None)
+        and start the line number of the first line of the document
+    """
+    name, start, lines = None, 1, []
+    for pos, line in enumerate(iter_lines(value), start=1):
+        mat = delimiter.match(line)
+        if not mat:
+            lines.append(line)
+            continue
+
+        if name is not None or any(lines):
+            yield name, start, lines
+        name = (mat.groups() or [None])[0]
+        start, lines = pos + 1, []
+
+    if name is not None or any(lines):
+        yield name, start, lines
+
+
+def generate_document_path(output_dir, name, resources=None):
+    """ output path of a document named from its header, keep the directory in "res/" """
+    name = os.path.normpath(name).lstrip("/")
+    if name.startswith("res/"):
+        name = name[len("res/"):]
+    if name.startswith(".."):
+        name = os.path.basename(name)
+    return generate_path(os.path.join(output_dir, os.path.dirname(name)), name, resources)
+
+
+def convert_documents(filename, output_dir, resources=None, no_header=False, rename_file=False, stream=False, delimiter=document_reg, *, stats=None, archive=None, fmt="xml", select=None):
+    """
+        convert every documents of the multiple xmltree dump `filename` into `output_dir`,
+        or every compiled xml of the apk `filename` (AndroidManifest.xml and res/**.xml),
+        yield `(path, error)` by document, a wrong document does not stop the others,
+        `stats` (a `Stats`) collect the stats of every documents
+    """
+    with contextlib.ExitStack() as stack:
+        if input_format(filename) == "apk":
+            # a zip need to seek, the standard input is read first
+            f = io.BytesIO(sys.stdin.buffer.read()) if filename == STDIO else filename
+            documents = ((name, 1, data) for name, data in axml.iter_apk_documents(f))
+        else:
+            documents = split_documents(stack.enter_context(open_input(filename)), delimiter)
+
+        for index, (name, start, value) in enumerate(documents, start=1):
+            if not name:
+                name = f"{'stdin' if filename == STDIO else os.path.basename(filename)}-{index}"
+            try:
+                if output_dir == STDIO and archive is None:
+                    path = STDIO
+                else:
+                    path = output_path(generate_document_path(output_dir, name, resources if rename_file else None), fmt)
+                    if archive is None:
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                file_stats = None if stats is None else FileStats(name)
+                write_file(path, value, resources, no_header, stream, start=start, stats=file_stats, archive=archive, fmt=fmt, document=name, select=select)
+                if stats is not None:
+                    stats.add(file_stats)
+            except Exception as e:
+                yield None, f"from '{name}' in '{filename}': {str(e)}"
+            else:
+                yield path, None
+
+
+def _convert_with_stats(filename, resources, stats, options):
+    if stats is None:
+        return convert_file(filename, resources=resources, **options)
+    file_stats = FileStats(filename)
+    path = convert_file(filename, resources=resources, stats=file_stats, **options)
+    stats.add(file_stats)
+    return path
+
+
+def make_parser():
+    p = argparse.ArgumentParser("xmltree2xml", description="convert android xmltree to classic xml.", epilog="`xmltree2xml serve` and `xmltree2xml client` run a conversion server, see `xmltree2xml serve -h`, `xmltree2xml diff` compare documents, see `xmltree2xml diff -h`.")
+    p.add_argument("-n", "--no-header", help="do not add an xml header.", action="store_true", default=False)
+    p.add_argument("-r", "--resources", action="append", help="resource file for replace every hexa reference to human redable reference (`aapt2 dump resources` output, resources.arsc or apk), repeat it to layer many files (like the framework then the app), a file override the ones before it.", default=None)
+    p.add_argument("-o", "--output-dir", help="output directory, '-' write to the standard output.", default="output")
+    p.add_argument("-f", "--rename-file", help="rename output file with resource name.", action="store_true", default=False)
+    p.add_argument("--cache-dir", help="directory of the parsed resources cache.", default=default_cache_dir())
+    p.add_argument("--no-cache", help="do not use the parsed resources cache.", action="store_true", default=False)
+    p.add_argument("--clear-cache", help="remove the parsed resources cache before converting.", action="store_true", default=False)
+    p.add_argument("-s", "--stream", help="convert files line by line without building the tree, use less memory.", action="store_true", default=False)
+    p.add_argument("-j", "--jobs", type=int, help="number of processes used to convert files, or the children of the root of a single large file.", default=1)
+    p.add_argument("-p", "--pipeline", type=int, metavar="DEPTH", help="read the next DEPTH files and write the outputs in background threads while converting (with one job).", default=0)
+    p.add_argument("-m", "--multi-document", help="files contain multiple xmltree documents, each one start with a header line.", action="store_true", default=False)
+    p.add_argument("--delimiter", type=re.compile, help="regex of the header line of documents, the first group is the document name.", default=document_reg)
+    p.add_argument("--format", choices=list(FORMATS), help="output format, json formats keep the types of the values, 'ndjson' write a line by document and 'ndjson-elements' a line by element.", default="xml")
+    p.add_argument("--select", metavar="PATH", help="keep only the elements matching PATH (like '/manifest/application/activity' or '//string[@name=title]'), the other elements are skipped while parsing.", default=None)
+    p.add_argument("--select-root", metavar="TAG", help="write the selected elements in a synthetic TAG root element.", default=None)
+    p.add_argument("-a", "--output-archive", metavar="FILE", help="write every outputs in one zip or tar archive (from the suffix), '-' write a tar to the standard output.", default=None)
+    p.add_argument("--archive-format", choices=sorted(set(ARCHIVE_FORMATS.values())), help="format of the output archive, instead of its suffix.", default=None)
+    p.add_argument("--compression-level", type=int, help="compression level of the output archive (0-9).", default=None)
+    p.add_argument("-i", "--incremental", help="skip files unchanged since the last conversion in the output directory.", action="store_true", default=False)
+    p.add_argument("--prune", help="with --incremental, remove outputs whose input does not exist anymore.", action="store_true", default=False)
+    p.add_argument("--memo-size", type=int, help="entries of each memo cache of keys, values and resources references (0 disable them).", default=MEMO_SIZE)
+    p.add_argument("--stats", help="print timing and counters by phase on stderr.", action="store_true", default=False)
+    p.add_argument("--stats-json", metavar="FILE", help="write the timing and counters by file as json in FILE.", default=None)
+    p.add_argument("--profile", metavar="FILE", help="profile the conversion with cProfile and write the pstats to FILE.", default=None)
+    p.add_argument("--trace-memory", help="report the peak memory (with tracemalloc, slower).", action="store_true", default=False)
+    p.add_argument("file", nargs='+', help="xmltree file, '-' read the standard input.")
+    return p
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in ("serve", "client"):
+        # imported here, the server is build on top of this module
+        from .server import client_main, serve_main
+        return (serve_main if argv[0] == "serve" else client_main)(argv[1:])
+    if argv and argv[0] == "diff":
+        from .diff import diff_main
+        return diff_main(argv[1:])
+
+    flags = make_parser().parse_args(argv)
+
+    stats = Stats() if flags.stats or flags.stats_json else None
+    profiler = cProfile.Profile() if flags.profile else None
+    if flags.trace_memory:
+        tracemalloc.start()
+
+    try:
+        if profiler is not None:
+            profiler.enable()
+        run(flags, stats)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(flags.profile)
+
+        if flags.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            if stats is None:
+                print(f"peak memory: {peak / 1e6:.1f} MB", file=sys.stderr)
+            else:
+                stats.peak_memory = peak
+
+        if flags.stats:
+            stats.report(sys.stderr)
+        if flags.stats_json:
+            stats.write_json(flags.stats_json)
+
+
+def run(flags, stats=None):
+    """ convert files from the command line `flags` """
+    # imported here, the pools are build on top of this module
+    from .parallel import convert_files_parallel, convert_files_pipelined
+
+    configure_caches(flags.memo_size)
+
+    if flags.output_archive and flags.incremental:
+        sys.exit("--incremental can not be used with --output-archive.")
+    if flags.pipeline and flags.stream:
+        sys.exit("--pipeline can not be used with --stream.")
+    select = None
+    if flags.select:
+        try:
+            select = Selector(flags.select, flags.select_root)
+        except ValueError as e:
+            sys.exit(f"--select: {e}")
+
+    if flags.output_dir != STDIO and not flags.output_archive and not os.path.exists(flags.output_dir):
+        os.mkdir(flags.output_dir)
+
+    if flags.clear_cache:
+        clear_cache(flags.cache_dir)
+
+    resources = None
+    if flags.resources:
+        resources = ResourceTable.load_layers(flags.resources, None if flags.no_cache else flags.cache_dir)
+
+    options = {"output_dir": flags.output_dir, "no_header": flags.no_header, "rename_file": flags.rename_file, "stream": flags.stream, "fmt": flags.format}
+    if select is not None:
+        options["select"] = select
+    archive = None
+    if flags.output_archive:
+        archive = OutputArchive(flags.output_archive, flags.archive_format, flags.compression_level)
+        # paths of the documents in the archive
+        options.update(output_dir=".", archive=archive)
+
+    filenames = flags.file
+    manifest = None
+    # input file -> hash of its content
+    digests = {}
+    if flags.incremental and flags.output_dir != STDIO:
+        manifest = Manifest.load(flags.output_dir)
+        manifest_options = {
+            "resources": [cache_key(filename) for filename in flags.resources or []],
+            "no_header": flags.no_header,
+            "rename_file": flags.rename_file,
+            "multi_document": flags.multi_document,
+            "delimiter": flags.delimiter.pattern,
+            "format": flags.format,
+            "select": [flags.select, flags.select_root],
+        }
+        if flags.prune:
+            for path in manifest.prune():
+                print(f"removing '{path}' ...")
+
+        filenames = []
+        for filename in flags.file:
+            if filename != STDIO:
+                digests[filename] = file_digest(filename)
+                if manifest.is_fresh(filename, digests[filename], manifest_options):
+                    continue
+            filenames.append(filename)
+
+    def documents(filenames):
+        return (
+            (filename, path, error)
+            for filename in filenames
+            for path, error in convert_documents(filename, resources=resources, delimiter=flags.delimiter, stats=stats, **options)
+        )
+
+    if flags.multi_document:
+        results = documents(filenames)
+    else:
+        # apks contain multiple documents
+        apks = [filename for filename in filenames if input_format(filename) == "apk"]
+        if apks:
+            filenames = [filename for filename in filenames if filename not in apks]
+
+        if flags.jobs > 1 and len(filenames) == 1:
+            # one large file, the children of its root are converted by the processes
+            results = ((filename, _convert_with_stats(filename, resources, stats, dict(options, jobs=flags.jobs)), None) for filename in filenames)
+        elif flags.jobs > 1 and (flags.output_dir != STDIO or archive is not None):
+            results = (
+                (filename, path, error)
+                for filename, (path, error) in zip(filenames, convert_files_parallel(filenames, flags.jobs, resources, stats, **options))
+            )
+        elif flags.pipeline > 0 and (flags.output_dir != STDIO or archive is not None):
+            # the first error stop the conversion
+            results = (
+                (filename, path, None)
+                for filename, path in zip(filenames, convert_files_pipelined(filenames, flags.pipeline, resources, stats, **options))
+            )
+        else:
+            # the first error stop the conversion
+            results = ((filename, _convert_with_stats(filename, resources, stats, options), None) for filename in filenames)
+        if apks:
+            results = itertools.chain(results, documents(apks))
+
+    errors = []
+    # input file -> outputs, None when an output failed
+    outputs = {}
+    try:
+        for filename, path, error in results:
+            if error:
+                errors.append(error)
+                outputs[filename] = None
+            else:
+                if filename not in outputs:
+                    outputs[filename] = []
+                if outputs[filename] is not None:
+                    outputs[filename].append(path)
+                if path != STDIO and archive is None:
+                    print(f"writing '{path}' ...")
+    finally:
+        if archive is not None:
+            archive.close()
+            if archive.path != STDIO:
+                print(f"writing '{archive.path}' ({archive.count} file(s)) ...")
+        if manifest is not None:
+            for filename, paths in outputs.items():
+                if filename not in digests:
+                    continue
+                if paths is None:
+                    manifest.discard(filename)
+                else:
+                    manifest.update(filename, digests[filename], manifest_options, paths)
+            manifest.save()
+
+    if errors:
+        for error in errors:
+            print(f"error: {error}", file=sys.stderr)
+        sys.exit(f"{len(errors)} file(s) failed.")
 
-if __name__ == "__main__":
-    main()
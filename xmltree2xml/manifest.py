@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".xmltree2xml-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_digest(filename):
+    h = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Manifest:
+    """
+        inputs already converted in an output directory,
+        with the hash of their content and the options used (resources, flags...)
+    """
+
+    def __init__(self, output_dir, entries=None):
+        self.output_dir = output_dir
+        # absolute input path -> {"hash", "options", "outputs"}
+        self.entries = entries if entries is not None else {}
+
+    @property
+    def path(self):
+        return os.path.join(self.output_dir, MANIFEST_NAME)
+
+    @classmethod
+    def load(cls, output_dir):
+        try:
+            with open(os.path.join(output_dir, MANIFEST_NAME), "r") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                return cls(output_dir, data["entries"])
+        except (OSError, ValueError, KeyError, AttributeError):
+            # missing or corrupted manifest, convert everything
+            pass
+        return cls(output_dir)
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, filename, digest, options):
+        """ True when `filename` was converted with the same content and options, and its outputs still exist """
+        entry = self.entries.get(os.path.abspath(filename))
+        if entry is None or entry["hash"] != digest or entry["options"] != options:
+            return False
+        return all(os.path.exists(os.path.join(self.output_dir, output)) for output in entry["outputs"])
+
+    def update(self, filename, digest, options, outputs):
+        self.entries[os.path.abspath(filename)] = {
+            "hash": digest,
+            "options": options,
+            "outputs": [os.path.relpath(output, self.output_dir) for output in outputs],
+        }
+
+    def discard(self, filename):
+        self.entries.pop(os.path.abspath(filename), None)
+
+    def prune(self):
+        """ remove outputs whose input does not exist anymore, return the removed paths """
+        removed = []
+        for filename in [filename for filename in self.entries if not os.path.exists(filename)]:
+            for output in self.entries.pop(filename)["outputs"]:
+                path = os.path.join(self.output_dir, output)
+                if os.path.exists(path):
+                    os.remove(path)
+                    removed.append(path)
+        return removed
@@ -0,0 +1,296 @@
+import collections
+import concurrent.futures
+import contextlib
+import itertools
+import multiprocessing
+import re
+
+from .archive import MemoryArchive
+from .main import END, START, STDIO, ConversionError, convert_file, iter_events, iter_xml, read_input
+from .stats import FileStats
+
+"""
+    conversions spread over processes and threads
+
+        convert_files_parallel   many files with a pool of processes (`--jobs`)
+        iter_xml_parallel        the children of the root of one large document with a pool of processes (`--jobs` with one file)
+        convert_files_pipelined  reads and writes of many files in background threads (`--pipeline`)
+"""
+
+# resources shared with the worker processes, inherited on fork
+_worker_resources = None
+
+
+def _init_worker(resources):
+    global _worker_resources
+    _worker_resources = resources
+
+
+@contextlib.contextmanager
+def _worker_pool(jobs, resources):
+    """ pool of `jobs` processes, the workers get `resources` in `_worker_resources` """
+    global _worker_resources
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        # workers inherit the resources, nothing is pickled
+        ctx = multiprocessing.get_context("fork")
+        _worker_resources = resources
+        pool_args = {}
+    else:
+        # resources are sent once by worker
+        ctx = multiprocessing.get_context()
+        pool_args = {"initializer": _init_worker, "initargs": (resources,)}
+
+    try:
+        with ctx.Pool(jobs, **pool_args) as pool:
+            yield pool
+            # every task is done, the workers exit on their own (the pool is only terminated on an early exit)
+            pool.close()
+            pool.join()
+    finally:
+        _worker_resources = None
+
+
+def _convert_task(task):
+    filename, value, options, with_stats, to_archive = task
+    if isinstance(value, Exception):
+        return None, str(value), None, None
+    file_stats = FileStats(filename) if with_stats else None
+    # documents are sent back to be written in the archive
+    archive = MemoryArchive() if to_archive else None
+    try:
+        path = convert_file(filename, resources=_worker_resources, stats=file_stats, archive=archive, value=value, **options)
+        return path, None, file_stats and file_stats.to_dict(), archive and archive.entries
+    except Exception as e:
+        return None, str(e), None, None
+
+
+def convert_files_parallel(filenames, jobs, resources=None, stats=None, **options):
+    """
+        convert `filenames` with a pool of `jobs` processes,
+        yield `(path, error)` in the same order than `filenames`,
+        `stats` (a `Stats`) collect the stats of every files,
+        an `archive` in `options` is written by this process
+    """
+    archive = options.pop("archive", None)
+
+    # the workers get /dev/null as standard input, "-" is read by this process
+    stdin = None
+    if STDIO in filenames:
+        try:
+            stdin = read_input(STDIO)
+        except Exception as e:
+            stdin = e
+    tasks = [(filename, stdin if filename == STDIO else None, options, stats is not None, archive is not None) for filename in filenames]
+    chunksize = max(1, len(tasks) // (jobs * 8))
+    with _worker_pool(jobs, resources) as pool:
+        for path, error, file_stats, entries in pool.imap(_convert_task, tasks, chunksize):
+            if file_stats is not None:
+                stats.add(file_stats)
+            for name, data in entries or ():
+                archive.write(name, data)
+            yield path, error
+
+
+# smaller documents are parsed in one piece by `iter_xml_parallel`, starting the processes cost more than they save
+PARALLEL_MIN_SIZE = 1 << 20
+
+root_reg = re.compile(r"^[^\S\n]*E: ", re.M)
+namespace_reg = re.compile(r"^[^\S\n]*N: ", re.M)
+
+
+def split_children(value, start=1):
+    """
+        split the xmltree string `value` at the elements of depth 1, return `(header, chunks, indent)`,
+        `header` is the text before the first child (namespaces, root and its attributes), `chunks` a list of
+        `(line number, offset)` by child and `indent` the indentation of the children lines,
+        None when there is no child or a line is not indented under the root (`value` is then parsed in one piece,
+        which report the error of the line)
+    """
+    root = root_reg.search(value)
+    if root is None:
+        return None
+    # like in `iter_events`, an odd number of namespaces shift the indentation by 2
+    shift = (len(namespace_reg.findall(value, 0, root.start())) % 2) * 2
+    if (len(root.group()) - 3 - shift) // 4 != 0:
+        # root not at the first level
+        return None
+    indent = shift + 4
+
+    # an element indented by 2 more spaces is still at depth 1
+    children = [mat.start() for mat in re.compile(rf"^ {{{indent}}}(?:  )?E: ", re.M).finditer(value, root.end())]
+    if not children:
+        return None
+    # every line after the first child is in the subtree of a child
+    if re.compile(rf"^(?! {{{indent}}}(?: |E: )|$)", re.M).search(value, children[0]):
+        return None
+
+    chunks = []
+    line, previous = start, 0
+    for offset in children:
+        line += value.count("\n", previous, offset)
+        chunks.append((line, offset))
+        previous = offset
+    return value[:children[0]], chunks, indent
+
+
+def iter_xml_parallel(value, jobs, resources=None, start=1, stats=None, indentation=4):
+    """
+        `iter_xml(iter_events(value))` for a large xmltree string `value`, the children of the root are parsed and rendered
+        by a pool of `jobs` processes and stitched in order, the output and the errors (with the line numbers of `value`)
+        are the same than the serial conversion, a document smaller than `PARALLEL_MIN_SIZE` is converted in one piece
+    """
+    split = split_children(value, start) if len(value) >= PARALLEL_MIN_SIZE and jobs > 1 else None
+    header = None
+    if split is not None:
+        try:
+            header = list(iter_events(split[0], resources, start, stats))
+        except ValueError:
+            # raised again by the serial conversion
+            pass
+    if header is None or [event[0] for event in header] != [START, END]:
+        # text of the root with children is an error, also reported by the serial conversion
+        yield from iter_xml(iter_events(value, resources, start, stats), indentation=indentation)
+        return
+
+    _, chunks, indent = split
+    # consecutive children by task, a few tasks by process to balance them
+    size = max(1, (len(value) - chunks[0][1]) // (jobs * 4))
+    tasks = []
+    for pos, (line, offset) in enumerate(chunks):
+        end = chunks[pos + 1][1] if pos + 1 < len(chunks) else len(value)
+        if tasks and offset - tasks[-1][1] < size:
+            tasks[-1][2] = end
+        else:
+            tasks.append([line, offset, end])
+
+    yield next(iter_xml(header[:1], indentation=indentation)) + ">"
+    tasks = [(line, value[offset:end], indent, indentation, stats is not None) for line, offset, end in tasks]
+    # first error in the order of the children, raised once the pool is closed
+    error = None
+    with _worker_pool(jobs, resources) as pool:
+        for xml, counters, message in pool.imap(_render_children, tasks):
+            if error is not None:
+                continue
+            if message is not None:
+                error = message
+                continue
+            if counters is not None:
+                records, lookups = counters
+                for key, count in records.items():
+                    stats.records[key] += count
+                for key, count in lookups.items():
+                    stats.lookups[key] += count
+            yield "\n"
+            yield xml
+    if error is not None:
+        raise ValueError(error)
+    yield f"\n</{header[0][1]}>"
+
+
+def _render_children(task):
+    """
+        xml of consecutive children of the root (see `split_children`) at depth 1, the records and lookups counters
+        and the error message, errors are returned (like `_convert_task`) so the pool is never left with pending tasks
+    """
+    start, text, indent, indentation, with_stats = task
+    file_stats = FileStats("children") if with_stats else None
+    if _worker_resources is not None:
+        _worker_resources.counters = file_stats and file_stats.lookups
+
+    # (line number, lines) by child, the lines are moved to the depth of a root
+    children = []
+    prefixes = (" " * indent + "E: ", " " * (indent + 2) + "E: ")
+    for pos, line in enumerate(text.split("\n"), start=start):
+        if line.startswith(prefixes):
+            children.append((pos, []))
+        children[-1][1].append(line[indent:])
+
+    events = itertools.chain.from_iterable(iter_events(lines, _worker_resources, pos, file_stats) for pos, lines in children)
+    try:
+        xml = "".join(iter_xml(events, 1, indentation))
+    except Exception as e:
+        return None, None, str(e)
+    return xml, file_stats and (file_stats.records, file_stats.lookups), None
+
+
+class PipelineWriter:
+    """ archive like writer of `convert_files_pipelined`, documents are written to their path by the threads of `executor` """
+
+    def __init__(self, executor):
+        self.executor = executor
+        # writes of the current file
+        self.futures = []
+
+    def write(self, path, data):
+        self.futures.append(self.executor.submit(_write_bytes, path, data))
+        return len(data)
+
+    def take(self):
+        """ writes submitted since the last call """
+        futures, self.futures = self.futures, []
+        return futures
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def convert_files_pipelined(filenames, depth, resources=None, stats=None, **options):
+    """
+        convert `filenames` one after the other like `convert_file`, yield the output path of every files in order,
+        the next `depth` files are read by a pool of threads and the outputs are written by another pool while the next files are converted
+        (at most `depth` files read ahead and `depth` outputs waiting to be written),
+        the first error is raised once the outputs of the files before it are yielded, like the sequential conversion,
+        an `archive` in `options` is written by this thread
+    """
+    archive = options.pop("archive", None)
+    readers = concurrent.futures.ThreadPoolExecutor(depth, "xmltree2xml-read")
+    writers = concurrent.futures.ThreadPoolExecutor(depth, "xmltree2xml-write")
+    writer = archive or PipelineWriter(writers)
+
+    def finish(filename, path, futures, file_stats):
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                raise ConversionError(filename, e) from e
+        if file_stats is not None:
+            stats.add(file_stats)
+        return path
+
+    names = iter(filenames)
+    # (filename, stats, read future)
+    reads = collections.deque()
+    # (filename, path, write futures, stats)
+    writes = collections.deque()
+
+    def read_next():
+        for filename in itertools.islice(names, 1):
+            file_stats = FileStats(filename) if stats is not None else None
+            reads.append((filename, file_stats, readers.submit(read_input, filename, file_stats)))
+
+    try:
+        for _ in range(depth):
+            read_next()
+        while reads:
+            filename, file_stats, future = reads.popleft()
+            read_next()
+            try:
+                path = convert_file(filename, resources=resources, stats=file_stats, archive=writer, value=future.result(), **options)
+            except Exception:
+                # outputs of the files before the error are still reported
+                while writes:
+                    yield finish(*writes.popleft())
+                raise
+            writes.append((filename, path, writer.take() if archive is None else [], file_stats))
+
+            while writes and (len(writes) > depth or all(future.done() for future in writes[0][2])):
+                yield finish(*writes.popleft())
+        while writes:
+            yield finish(*writes.popleft())
+    finally:
+        # reads not started are dropped
+        readers.shutdown(cancel_futures=True)
+        writers.shutdown()
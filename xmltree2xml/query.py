@@ -0,0 +1,278 @@
+import bisect
+import re
+
+"""
+    index of the elements of parsed trees (see `parse_xml(..., index=TreeIndex())`), one index can span many documents
+
+        index.find_all(tag="activity")
+        index.find_all(attr="android:name")
+        index.find_all(prefix="@drawable/")
+        index.select("manifest/application/activity[@android:exported=true]")
+        index.select("//intent-filter/action")
+
+    lookups start from the smallest bucket of the index and only check its elements,
+    they never walk the trees.
+"""
+
+# step of a path: separator, tag (or "*"), predicates
+step_reg = re.compile(r"(//|/)?([^/\[\]]+)((?:\[[^\]]*\])*)")
+predicate_reg = re.compile(r"\[@([^=\]]+)(?:=(?:\"([^\"]*)\"|'([^']*)'|([^\]]*)))?\]")
+
+
+def value_key(value):
+    """ `True` and `1` are equal for a dict, keep them apart """
+    return (value.__class__ is bool, value)
+
+
+def to_text(value):
+    """ value as written in the xml """
+    return str(value).lower() if isinstance(value, bool) else str(value)
+
+
+class TreeIndex:
+    """ elements of one or many trees by tag, attribute key, attribute value and line """
+
+    def __init__(self):
+        # tag -> [elements]
+        self.tags = {}
+        # attribute key -> [elements]
+        self.keys = {}
+        # value_key(attribute value) -> [elements]
+        self.values = {}
+        # (document, line) -> element
+        self.lines = {}
+        # document -> root element
+        self.documents = {}
+        # id(element) -> (position, document), to sort results in documents order
+        self.positions = {}
+        # sorted string values, build on the first prefix lookup
+        self._sorted_values = None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def add(self, element, document=None):
+        """ index `element` (its attributes must be set), elements must be added in document order """
+        self.positions[id(element)] = (len(self.positions), document)
+        if element.parent is None:
+            self.documents.setdefault(document, element)
+
+        self.tags.setdefault(element.tag, []).append(element)
+        for key, value in element.attributes.items():
+            self.keys.setdefault(key, []).append(element)
+            bucket = self.values.setdefault(value_key(value), [])
+            # the same value twice on the element
+            if not bucket or bucket[-1] is not element:
+                bucket.append(element)
+        self._sorted_values = None
+
+        line = element.extra.get("line")
+        if line is not None:
+            self.lines.setdefault((document, line), element)
+
+    def add_tree(self, root, document=None):
+        """ index every elements of the tree `root` """
+        stack = [root]
+        while stack:
+            element = stack.pop()
+            self.add(element, document)
+            stack.extend(reversed(element.childrens))
+        return root
+
+    def document(self, element):
+        return self.positions[id(element)][1]
+
+    def at_line(self, line, document=None):
+        """ element started at `line` of `document`, or None """
+        return self.lines.get((document, line))
+
+    def _sort(self, elements):
+        return sorted(elements, key=lambda element: self.positions[id(element)][0])
+
+    def _prefixed(self, prefix):
+        """ elements with a string value starting by `prefix` """
+        if self._sorted_values is None:
+            self._sorted_values = sorted(value for is_bool, value in self.values if not is_bool and isinstance(value, str))
+        values = self._sorted_values
+        elements = []
+        for pos in range(bisect.bisect_left(values, prefix), len(values)):
+            if not values[pos].startswith(prefix):
+                break
+            elements.extend(self.values[value_key(values[pos])])
+        # an element can have many values with the prefix
+        return self._sort({id(element): element for element in elements}.values())
+
+    def find_all(self, tag=None, attr=None, value=None, prefix=None, document=None):
+        """
+            elements matching every given filters, in documents order,
+            `value` is the value of `attr` (or of any attribute) and `prefix` the start of a string value
+        """
+        candidates = []
+        if tag is not None:
+            candidates.append(self.tags.get(tag, ()))
+        if attr is not None:
+            candidates.append(self.keys.get(attr, ()))
+        if value is not None:
+            candidates.append(self.values.get(value_key(value), ()))
+        if prefix is not None:
+            candidates.append(self._prefixed(prefix))
+        if not candidates:
+            candidates.append(self._sort(element for bucket in self.tags.values() for element in bucket))
+
+        results = []
+        for element in min(candidates, key=len):
+            if tag is not None and element.tag != tag:
+                continue
+            if document is not None and self.document(element) != document:
+                continue
+            attrs = element.attributes
+            if attr is not None:
+                if attr not in attrs:
+                    continue
+                if value is not None and value_key(attrs[attr]) != value_key(value):
+                    continue
+                if prefix is not None and not (isinstance(attrs[attr], str) and attrs[attr].startswith(prefix)):
+                    continue
+            else:
+                if value is not None and value_key(value) not in {value_key(val) for val in attrs.values()}:
+                    continue
+                if prefix is not None and not any(isinstance(val, str) and val.startswith(prefix) for val in attrs.values()):
+                    continue
+            results.append(element)
+        return results
+
+    def find(self, **filters):
+        """ first element of `find_all`, or None """
+        results = self.find_all(**filters)
+        return results[0] if results else None
+
+    def select(self, path, document=None):
+        """
+            elements matching a path of tags ("*" for any tag) separated by "/" (child) or "//" (descendant),
+            each one with optional predicates `[@key]` or `[@key=value]`,
+            a path starting by "/" start at the root of the documents
+        """
+        steps = parse_path(path)
+        tag, predicates = steps[-1][1], steps[-1][2]
+
+        filters = {"tag": None if tag == "*" else tag, "document": document}
+        if predicates:
+            # the attribute index is often smaller than the tag one
+            filters["attr"] = predicates[0][0]
+        candidates = self.find_all(**filters)
+        return [element for element in candidates if match_steps(element, steps, len(steps) - 1)]
+
+
+def parse_path(path):
+    """ [(separator, tag, [(key, value or None)])], the separator of the first step is None for a relative path """
+    steps = []
+    pos = 0
+    path = path.strip()
+    while pos < len(path):
+        mat = step_reg.match(path, pos)
+        if not mat or (steps and not mat.group(1)):
+            raise ValueError(f"wrong path '{path}' at {pos}")
+        separator, tag, raw_predicates = mat.groups()
+        predicates = []
+        for pred in predicate_reg.finditer(raw_predicates):
+            key, *values = pred.groups()
+            value = next((val for val in values if val is not None), None)
+            predicates.append((key.strip(), value))
+        if len(predicates) != raw_predicates.count("["):
+            raise ValueError(f"wrong predicate in path '{path}'")
+        steps.append((separator, tag.strip(), predicates))
+        pos = mat.end()
+    if not steps:
+        raise ValueError("empty path")
+    return steps
+
+
+def match_predicates(attrs, predicates):
+    for key, value in predicates:
+        if key not in attrs or (value is not None and to_text(attrs[key]) != value):
+            return False
+    return True
+
+
+def match_step(element, step):
+    _, tag, predicates = step
+    if tag != "*" and element.tag != tag:
+        return False
+    return match_predicates(element.attributes, predicates)
+
+
+def match_steps(element, steps, pos):
+    """ `element` match `steps[pos]` and its ancestors the steps before """
+    if not match_step(element, steps[pos]):
+        return False
+    separator = steps[pos][0]
+    if pos == 0:
+        # "/tag" is a root, "//tag" or "tag" anywhere
+        return separator != "/" or element.parent is None
+
+    parent = element.parent
+    if separator == "/":
+        return parent is not None and match_steps(parent, steps, pos - 1)
+    while parent is not None:
+        if match_steps(parent, steps, pos - 1):
+            return True
+        parent = parent.parent
+    return False
+
+
+class Selector:
+    """
+        path of `TreeIndex.select` evaluated while parsing (see `iter_events(..., select=Selector(path))`),
+        only the matching elements are kept with their subtree, optionally under a synthetic `root` element
+
+        the state of an element is `(matched, ancestors)`: the steps matched by the element and by its ancestors,
+        an element whose subtree can't match is skipped without reading its attributes
+    """
+
+    # state of the parent of the root element
+    ROOT_STATE = (frozenset([-1]), frozenset())
+
+    def __init__(self, path, root=None):
+        self.path = path
+        self.steps = parse_path(path)
+        self.root = root
+        self.last = len(self.steps) - 1
+        # steps matching in the descendants of an element matching the step before them
+        self._descendant_steps = [pos for pos, step in enumerate(self.steps) if step[0] != "/"]
+        # (parent state, tag) -> `child` result
+        self._children = {}
+
+    def _alive(self, ancestors):
+        """ a descendant can still match """
+        return any(pos - 1 in ancestors for pos in self._descendant_steps)
+
+    def child(self, state, tag):
+        """
+            `(candidates, ancestors, need_attributes)` of a child `tag` of an element in `state`,
+            candidates are the steps the child match if its attributes match the predicates,
+            None when nothing can match in the subtree of the child
+        """
+        key = (state, tag)
+        if key in self._children:
+            return self._children[key]
+
+        matched, ancestors = state
+        ancestors = ancestors | matched
+        candidates = frozenset(
+            pos for pos, (separator, step_tag, _) in enumerate(self.steps)
+            if (step_tag == "*" or step_tag == tag) and pos - 1 in (matched if separator == "/" else ancestors)
+        )
+        result = None
+        if candidates or self._alive(ancestors):
+            result = (candidates, ancestors, any(self.steps[pos][2] for pos in candidates))
+        self._children[key] = result
+        return result
+
+    def resolve(self, child, attrs=None):
+        """ `(state, selected)` of an element from its `child` result and its attributes, None when its subtree is skipped """
+        candidates, ancestors, need_attributes = child
+        if need_attributes:
+            candidates = frozenset(pos for pos in candidates if match_predicates(attrs, self.steps[pos][2]))
+        if not candidates and not self._alive(ancestors):
+            return None
+        return (candidates, ancestors), self.last in candidates
@@ -0,0 +1,218 @@
+import hashlib
+import marshal
+import os
+import re
+import zipfile
+
+from . import arsc
+from .axml import ZIP_MAGIC
+
+"""
+    `aapt2 dump resources` file look like this
+
+    Package name=com.android.dialer id=7f
+      type xml id=18 entryCount=2
+        resource 0x7f180012 xml/file_final
+          () (file) res/file.xml type=XML
+      type style id=19 entryCount=1
+        resource 0x7f190000 style/Theme
+          () (style) size=3 parent=0x01030005
+
+    only the `resource` line and the first value line below are used.
+"""
+RESOURCE_PREFIX = "    resource "
+STYLE_PREFIX = "      () (style) size="
+FILE_PREFIX = "      () (file) res/"
+FILE_SUFFIX = " type=XML"
+
+xml_name_reg = re.compile(r"^xml/([a-zA-Z][a-zA-Z_-]*)$")
+
+# bump when the cached tables layout change
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".restable"
+
+
+def iter_lines(value):
+    """ iterate over lines of a string or an iterable of lines (like a file object) """
+    if isinstance(value, str):
+        yield from value.split("\n")
+    else:
+        for line in value:
+            yield line.rstrip("\n")
+
+
+class ResourceTable:
+    """ lookup tables build in one pass from an `aapt2 dump resources` file """
+
+    def __init__(self, ids=None, styles=None, files=None):
+        # hexa id -> "type/name"
+        self.ids = ids if ids is not None else {}
+        # style parent -> "type/name"
+        self.styles = styles if styles is not None else {}
+        # file path (after "res/") -> xml name
+        self.files = files if files is not None else {}
+        # {"hit": 0, "miss": 0} to count the lookups (see `Stats`)
+        self.counters = None
+
+    @classmethod
+    def parse(cls, value):
+        table = cls()
+        ids, styles, files = table.ids, table.styles, table.files
+
+        # last "resource" line, only valid for the line just after it
+        current = None
+        for line in iter_lines(value):
+            if line.startswith(RESOURCE_PREFIX):
+                parts = line.split()
+                if len(parts) >= 3 and parts[1].startswith("0x"):
+                    current = parts[1], parts[2]
+                    ids.setdefault(*current)
+                    continue
+
+            elif current is not None:
+                name = current[1]
+                if line.startswith(STYLE_PREFIX):
+                    _, _, parent = line.partition(" parent=")
+                    if parent:
+                        styles.setdefault(parent.split()[0], name)
+                elif line.startswith(FILE_PREFIX) and line.endswith(FILE_SUFFIX):
+                    mat = xml_name_reg.match(name)
+                    if mat:
+                        files.setdefault(line[len(FILE_PREFIX):-len(FILE_SUFFIX)], mat.groups()[0])
+
+            current = None
+        return table
+
+    @classmethod
+    def from_arsc(cls, value):
+        """ tables of a compiled `resources.arsc` (bytes-like), decoded without `aapt2 dump resources` """
+        ids, styles, files = arsc.parse(value)
+        # same names as the dump
+        files = {path: mat.groups()[0] for path, mat in ((path, xml_name_reg.match(name)) for path, name in files.items()) if mat}
+        return cls(ids, styles, files)
+
+    @classmethod
+    def from_file(cls, path):
+        """ tables of an `aapt2 dump resources` file, a `resources.arsc` or an apk """
+        with open(path, "rb") as f:
+            magic = f.read(4)
+            if arsc.is_arsc(magic):
+                f.seek(0)
+                return cls.from_arsc(f.read())
+
+        if magic == ZIP_MAGIC:
+            with zipfile.ZipFile(path) as apk:
+                try:
+                    return cls.from_arsc(apk.read("resources.arsc"))
+                except KeyError:
+                    raise ValueError(f"no resources.arsc in '{path}'")
+
+        with open(path, "r") as f:
+            return cls.parse(f)
+
+    @classmethod
+    def load(cls, path, cache_dir=None):
+        """ like `from_file` but reuse (or create) a cached copy in `cache_dir` """
+        if cache_dir is None:
+            return cls.from_file(path)
+
+        cache_path = os.path.join(cache_dir, cache_key(path) + CACHE_SUFFIX)
+        try:
+            with open(cache_path, "rb") as f:
+                version, ids, styles, files = marshal.load(f)
+            if version == CACHE_VERSION:
+                return cls(ids, styles, files)
+        except (OSError, EOFError, ValueError, TypeError):
+            # missing or corrupted cache
+            pass
+
+        table = cls.from_file(path)
+        table.save(cache_path)
+        return table
+
+    @classmethod
+    def merge(cls, tables):
+        """
+            one table of the layers `tables` (like the framework, then the app and its splits),
+            the entries of a table override the ones of the tables before it
+        """
+        if len(tables) == 1:
+            return tables[0]
+        merged = cls()
+        for table in tables:
+            merged.ids.update(table.ids)
+            merged.styles.update(table.styles)
+            merged.files.update(table.files)
+        return merged
+
+    @classmethod
+    def load_layers(cls, paths, cache_dir=None, loaded=None):
+        """
+            `load` every file of `paths` and `merge` them in this order,
+            `loaded` (a dict) keep the tables by `cache_key` to share a layer (like the framework) between many calls
+        """
+        tables = []
+        for path in paths:
+            if loaded is None:
+                tables.append(cls.load(path, cache_dir))
+                continue
+            key = cache_key(path)
+            if key not in loaded:
+                loaded[key] = cls.load(path, cache_dir)
+            tables.append(loaded[key])
+        return cls.merge(tables) if tables else None
+
+    def save(self, cache_path):
+        """ write tables to `cache_path`, errors are ignored (the cache is optional) """
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                marshal.dump((CACHE_VERSION, self.ids, self.styles, self.files), f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _count(self, name):
+        if self.counters is not None:
+            self.counters["hit" if name else "miss"] += 1
+        return name
+
+    def reference(self, res_id):
+        """ "0x7f08013f" -> "drawable/ic_shortcut" """
+        return self._count(self.ids.get(res_id))
+
+    def style(self, parent):
+        """ style parent -> name of the style """
+        return self._count(self.styles.get(parent))
+
+    def file(self, path):
+        """ "file.xml" (path after "res/") -> xml resource name """
+        return self._count(self.files.get(path))
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "xmltree2xml")
+
+
+def cache_key(path):
+    """ identify a resources file by its path, size and modification time """
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}\0{st.st_size}\0{st.st_mtime_ns}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def clear_cache(cache_dir):
+    """ remove every cached tables from `cache_dir`, return the number of removed files """
+    removed = 0
+    if not os.path.isdir(cache_dir):
+        return removed
+    for name in os.listdir(cache_dir):
+        if name.endswith(CACHE_SUFFIX):
+            os.remove(os.path.join(cache_dir, name))
+            removed += 1
+    return removed
@@ -0,0 +1,274 @@
+import argparse
+import collections
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+
+from .api import convert
+from .main import STDIO, generate_path
+from .resources import ResourceTable, cache_key, default_cache_dir
+
+"""
+    `xmltree2xml serve` keep the parsed resources in memory between conversions,
+    `xmltree2xml client` send files to it, without the interpreter startup and the resources loading by file.
+
+    the protocol is one json object by line in both ways, over a unix socket or a localhost tcp port
+
+        -> {"value": "E: div (line=1)\\n...", "resources": "/abs/path/resources.txt", "no_header": false}
+        <- {"xml": "<?xml ...>\\n<div ... />"}  or  {"error": "..."}
+
+    `resources` (optional) is the resource set id, the absolute path of the resource file on the server side,
+    or a list of them merged in this order (a file override the ones before it), every file is kept and shared between the lists.
+"""
+
+DEFAULT_HOST = "127.0.0.1"
+# memory of the resources kept in memory by the server
+DEFAULT_MAX_MEMORY = 256 * 1024 * 1024
+
+
+def table_size(table):
+    """ approximate memory used by a `ResourceTable` in bytes """
+    size = 0
+    for mapping in (table.ids, table.styles, table.files):
+        size += sys.getsizeof(mapping)
+        for key, value in mapping.items():
+            size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+class ResourceCache:
+    """ parsed resources by file, the least recently used are dropped when they use more than `max_bytes` """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_MEMORY, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        # cache_key(path) -> (table, size), the most recently used at the end
+        self.tables = collections.OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        # a modified file has a new key, the old table end up dropped
+        key = cache_key(path)
+        # loaded without the lock, concurrent conversions with other resources are not blocked
+        return self._lookup(key) or self._store(key, ResourceTable.load(path, self.cache_dir))
+
+    def get_layers(self, paths):
+        """ table of the layers `paths` merged (see `ResourceTable.merge`), every layer is kept on its own and shared """
+        if len(paths) == 1:
+            return self.get(paths[0])
+        key = "+".join(cache_key(path) for path in paths)
+        return self._lookup(key) or self._store(key, ResourceTable.merge([self.get(path) for path in paths]))
+
+    def _lookup(self, key):
+        with self.lock:
+            if key in self.tables:
+                self.tables.move_to_end(key)
+                return self.tables[key][0]
+        return None
+
+    def _store(self, key, table):
+        size = table_size(table)
+        with self.lock:
+            if key in self.tables:
+                self.tables.move_to_end(key)
+                return self.tables[key][0]
+            self.tables[key] = (table, size)
+            self.size += size
+            # always keep the last one, even when it is bigger than max_bytes
+            while self.size > self.max_bytes and len(self.tables) > 1:
+                _, (_, dropped) = self.tables.popitem(last=False)
+                self.size -= dropped
+        return table
+
+
+def handle_request(request, resources):
+    """ convert a request (see the module description), `resources` is a `ResourceCache` """
+    if not isinstance(request, dict) or not isinstance(request.get("value"), str):
+        raise ValueError("request must be an object with a 'value' string")
+    paths = request.get("resources")
+    table = resources.get_layers([paths] if isinstance(paths, str) else paths) if paths else None
+    return {"xml": convert(request["value"], table, bool(request.get("no_header")))}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """ answer every request line of a connection """
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = handle_request(json.loads(line), self.server.resources)
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, resources):
+        self.resources = resources
+        if os.path.lexists(path):
+            if not stat.S_ISSOCK(os.lstat(path).st_mode):
+                raise FileExistsError(f"'{path}' exists and is not a socket")
+            if is_listening(path):
+                raise FileExistsError(f"a server is already listening on '{path}'")
+            # socket left by a previous server
+            os.remove(path)
+        super().__init__(path, RequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+
+def is_listening(path):
+    """ True when a server accept connections on the unix socket `path` """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+class TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, resources):
+        self.resources = resources
+        super().__init__(address, RequestHandler)
+
+
+def make_server(socket_path=None, port=None, host=DEFAULT_HOST, max_bytes=DEFAULT_MAX_MEMORY, cache_dir=None):
+    """ server on the unix socket `socket_path` or on `host`:`port` (0 pick a free port) """
+    resources = ResourceCache(max_bytes, cache_dir)
+    if socket_path is not None:
+        return UnixServer(socket_path, resources)
+    return TCPServer((host, port), resources)
+
+
+class Client:
+    """ connection to a `xmltree2xml serve` server, reused for every conversion """
+
+    def __init__(self, socket_path=None, port=None, host=DEFAULT_HOST, timeout=None):
+        if socket_path is not None:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            address = socket_path
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            address = (host, port)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(address)
+        except OSError:
+            self.sock.close()
+            raise
+        self.rfile = self.sock.makefile("rb")
+
+    def convert(self, value, resources=None, no_header=False):
+        """ xml of xmltree `value`, `resources` is the path of a resource file (or a list of layers), raise `ValueError` on error """
+        if isinstance(resources, str):
+            resources = os.path.abspath(resources)
+        elif resources:
+            resources = [os.path.abspath(path) for path in resources]
+        request = {"value": value, "resources": resources, "no_header": no_header}
+        self.sock.sendall(json.dumps(request).encode() + b"\n")
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("connection closed by the server")
+        response = json.loads(line)
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["xml"]
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def add_address_arguments(p):
+    group = p.add_mutually_exclusive_group(required=True)
+    group.add_argument("--socket", help="path of the unix socket.", default=None)
+    group.add_argument("--port", type=int, help=f"tcp port on {DEFAULT_HOST}.", default=None)
+
+
+def make_serve_parser():
+    p = argparse.ArgumentParser("xmltree2xml serve", description="convert xmltree sent by `xmltree2xml client`, keep the resources in memory.")
+    add_address_arguments(p)
+    p.add_argument("--max-memory", type=int, help="memory in MB of the resources kept in memory.", default=DEFAULT_MAX_MEMORY // (1024 * 1024))
+    p.add_argument("--cache-dir", help="directory of the parsed resources cache.", default=default_cache_dir())
+    p.add_argument("--no-cache", help="do not use the parsed resources cache.", action="store_true", default=False)
+    return p
+
+
+def make_client_parser():
+    p = argparse.ArgumentParser("xmltree2xml client", description="convert android xmltree with a running `xmltree2xml serve`.")
+    add_address_arguments(p)
+    p.add_argument("-n", "--no-header", help="do not add an xml header.", action="store_true", default=False)
+    p.add_argument("-r", "--resources", action="append", help="resource file for replace every hexa reference to human redable reference, repeat it to layer many files.", default=None)
+    p.add_argument("-o", "--output-dir", help="output directory, '-' write to the standard output.", default="output")
+    p.add_argument("file", nargs='+', help="xmltree file, '-' read the standard input.")
+    return p
+
+
+def serve_main(argv=None):
+    flags = make_serve_parser().parse_args(argv)
+    try:
+        server = make_server(flags.socket, flags.port, max_bytes=flags.max_memory * 1024 * 1024, cache_dir=None if flags.no_cache else flags.cache_dir)
+    except OSError as e:
+        sys.exit(f"error: {e}")
+    print(f"listening on {flags.socket or f'{DEFAULT_HOST}:{server.server_address[1]}'} ...", file=sys.stderr)
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def client_main(argv=None):
+    flags = make_client_parser().parse_args(argv)
+
+    if flags.output_dir != STDIO and not os.path.exists(flags.output_dir):
+        os.mkdir(flags.output_dir)
+
+    errors = []
+    with Client(flags.socket, flags.port) as client:
+        for filename in flags.file:
+            try:
+                if filename == STDIO:
+                    value = sys.stdin.read()
+                else:
+                    with open(filename, "r") as f:
+                        value = f.read()
+                xml = client.convert(value, flags.resources, flags.no_header)
+            except (OSError, ValueError) as e:
+                errors.append(f"from '{filename}': {str(e)}")
+                continue
+
+            if flags.output_dir == STDIO:
+                sys.stdout.write(xml + "\n")
+                continue
+            path = generate_path(flags.output_dir, "stdin" if filename == STDIO else filename)
+            with open(path, "w") as f:
+                f.write(xml)
+            print(f"writing '{path}' ...")
+
+    if errors:
+        for error in errors:
+            print(f"error: {error}", file=sys.stderr)
+        sys.exit(f"{len(errors)} file(s) failed.")
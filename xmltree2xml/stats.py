@@ -0,0 +1,115 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+PHASES = ("read", "parse", "resolve", "serialize", "write", "stream")
+RECORDS = ("E", "A", "T", "N")
+
+
+class FileStats:
+    """ timing and counters of the conversion of one file (or document) """
+
+    def __init__(self, name):
+        self.name = name
+        self.output = None
+        # wall time by phase, "parse" does not include "resolve"
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        # lines by record type
+        self.records = dict.fromkeys(RECORDS, 0)
+        # resources lookups
+        self.lookups = {"hit": 0, "miss": 0}
+        # memo caches -> {"hits", "misses"}
+        self.caches = {}
+        self.output_bytes = 0
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - start
+
+    def add_caches(self, before, after):
+        """ add the memo caches usage between two `cache_info()` """
+        for name, info in after.items():
+            counters = self.caches.setdefault(name, {"hits": 0, "misses": 0})
+            for key, value in info.items():
+                counters[key] += value - before.get(name, {}).get(key, 0)
+
+    def to_dict(self):
+        return {
+            "file": self.name,
+            "output": self.output,
+            "phases": self.phases,
+            "records": self.records,
+            "lookups": self.lookups,
+            "caches": self.caches,
+            "output_bytes": self.output_bytes,
+        }
+
+
+class Stats:
+    """ stats of every converted files """
+
+    def __init__(self):
+        self.files = []
+        self.peak_memory = None
+
+    def add(self, file_stats):
+        """ add a `FileStats` or its dict (from a worker process) """
+        self.files.append(file_stats if isinstance(file_stats, dict) else file_stats.to_dict())
+
+    def total(self):
+        total = {
+            "files": len(self.files),
+            "phases": dict.fromkeys(PHASES, 0.0),
+            "records": dict.fromkeys(RECORDS, 0),
+            "lookups": {"hit": 0, "miss": 0},
+            "caches": {},
+            "output_bytes": 0,
+        }
+        for file_stats in self.files:
+            for key in ("phases", "records", "lookups"):
+                for name, value in file_stats[key].items():
+                    total[key][name] += value
+            for name, info in file_stats["caches"].items():
+                counters = total["caches"].setdefault(name, {"hits": 0, "misses": 0})
+                for key, value in info.items():
+                    counters[key] += value
+            total["output_bytes"] += file_stats["output_bytes"]
+        if self.peak_memory is not None:
+            total["peak_memory"] = self.peak_memory
+        return total
+
+    def to_dict(self):
+        return {"files": self.files, "total": self.total()}
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+    def report(self, fp):
+        total = self.total()
+        phases = ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in total["phases"].items() if seconds)
+        records = ", ".join(f"{name} {count}" for name, count in total["records"].items())
+        lookups = total["lookups"]
+        fp.write(f"files: {total['files']}\n")
+        fp.write(f"phases: {phases or '-'}\n")
+        fp.write(f"lines: {records}\n")
+        fp.write(f"resources lookups: {lookups['hit'] + lookups['miss']} ({lookups['hit']} hit, {lookups['miss']} miss)\n")
+        for name, info in total["caches"].items():
+            calls = info["hits"] + info["misses"]
+            rate = info["hits"] * 100 / calls if calls else 0
+            fp.write(f"memo {name}: {calls} calls ({rate:.1f}% hit)\n")
+        fp.write(f"output: {total['output_bytes']} bytes\n")
+        if self.peak_memory is not None:
+            fp.write(f"peak memory: {self.peak_memory / 1e6:.1f} MB\n")
+
+
+def measure(stats, name):
+    """ time the phase `name` of `stats` (a `FileStats`), do nothing when `stats` is None """
+    if stats is None:
+        return nullcontext()
+    return stats.phase(name)